@@ -0,0 +1,248 @@
+"""
+Time the hot paths on a dataset made by benchmarks.synth and print the results as JSON.
+
+    python -m benchmarks.synth /tmp/bench --count 100000
+    python -m benchmarks.run /tmp/bench --repeat 5 -o before.json
+
+GUI benchmarks run on the offscreen Qt platform. Thumbnail / session caches go to a temporary
+folder (--cache-dir to keep them), so every run starts cold and does not touch the user's cache.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def summarize(samples, **extra):
+    """Seconds per run -> min / median / mean / max (ms)"""
+    ms = [s * 1000 for s in samples]
+    result = {"runs": len(ms), "min_ms": min(ms), "median_ms": statistics.median(ms),
+              "mean_ms": statistics.fmean(ms), "max_ms": max(ms)}
+    if len(ms) >= 20:
+        result["p99_ms"] = sorted(ms)[min(len(ms) - 1, int(len(ms) * 0.99))]
+    result.update(extra)
+    return result
+
+
+def timed(function, repeat):
+    samples, value = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        samples.append(time.perf_counter() - start)
+    return samples, value
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def bench_core(images, labels, repeat, work_dir):
+    """find_all_images, read_labels + import, export_txt, .npz save, label comparison and image export (no Qt)"""
+    from core import find_all_images, normalize_path
+    from dataset import DatasetIndex
+    from landmarks import LandmarkStore
+
+    results = {}
+    samples, paths = timed(lambda: find_all_images(images), repeat)
+    results["find_all_images"] = summarize(samples, images=len(paths))
+
+    dataset = DatasetIndex(paths)
+    dataset_root = normalize_path(os.path.realpath(images))
+
+    def import_labels():
+        from core import read_labels
+        store = LandmarkStore()
+        labels_read, unmatched, errors = read_labels(labels, images, dataset)
+        store.update(labels_read)
+        return store
+
+    samples, store = timed(import_labels, repeat)
+    results["import_labels"] = summarize(samples, labeled=len(store))
+
+    output = os.path.join(work_dir, "export")
+    samples, written = timed(lambda: store.export_txt(output, dataset, dataset_root), repeat)
+    results["export_txt"] = summarize(samples, files=written)
+
+    # 편집된 일부 이미지만 다시 쓰는 경우 (같은 폴더로 다시 내보내기)
+    changed = list(store.ids())[::100]
+    samples, written = timed(lambda: store.export_txt(output, dataset, dataset_root, changed), repeat)
+    results["export_txt_incremental"] = summarize(samples, files=written)
+
+    npz_path = os.path.join(work_dir, "landmarks.npz")
+    samples, _ = timed(lambda: store.save(npz_path, dataset, dataset_root), repeat)
+    results["save_npz"] = summarize(samples, bytes=os.path.getsize(npz_path))
+
+    # 두 라벨 세트 비교 (.npz 로 저장했다가 다시 읽은 세트와)
+    from compare import compare
+    other = LandmarkStore()
+    other.load(npz_path, dataset, dataset_root)
+    samples, comparison = timed(lambda: compare(store, other, dataset.ids()), repeat)
+    results["compare_labels"] = summarize(samples, images=len(comparison))
+
+    # 이미지 트리 내보내기 (auto: 같은 파일 시스템이면 hard link) 와 split 목록
+    from export import export_dataset
+    samples = []
+    for _ in range(repeat):
+        output = os.path.join(work_dir, "export_images")
+        shutil.rmtree(output, ignore_errors=True)
+        start = time.perf_counter()
+        summary = export_dataset(list(dataset), dataset_root, output, ratios=(0.8, 0.1, 0.1))
+        samples.append(time.perf_counter() - start)
+    results["export_images"] = summarize(samples, images=summary["images"], methods=summary["methods"])
+    return results
+
+
+def wait_until(app, condition, timeout):
+    """Spin the event loop until condition() holds; returns False on timeout"""
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def bench_gui(images, repeat, steps, timeout):
+    """Folder scan in the viewer (full and from the manifest), grid build / first page, single-view next and prev"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtCore import Qt
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    from gui import ImageViewer
+    from journal import session_folder
+    from manifest import ScanManifest
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    # 벤치마크 중에는 대화상자가 뜨지 않도록
+    for name in ("warning", "information", "critical"):
+        setattr(QMessageBox, name, staticmethod(lambda *args, **kwargs: QMessageBox.Ok))
+
+    results = {}
+    viewer = ImageViewer()
+    viewer.resize(1280, 800)
+    viewer.show()
+    app.processEvents()
+
+    def open_folder(manifest):
+        if not manifest:
+            # 전체 스캔을 재도록 이전 데이터셋의 manifest 를 남기지 않고 지움
+            viewer.scan_mtimes = None
+            if viewer.dataset_root:
+                path = ScanManifest(session_folder(viewer.dataset_root), viewer.dataset_root).path
+                if os.path.exists(path):
+                    os.remove(path)
+        start = time.perf_counter()
+        viewer.load_folder(images)
+        if not wait_until(app, lambda: viewer.scan_worker is None, timeout):
+            raise RuntimeError("folder scan timed out")
+        return time.perf_counter() - start
+
+    samples = [open_folder(manifest=False) for _ in range(repeat)]
+    results["viewer_scan"] = summarize(samples, images=len(viewer.dataset))
+    # 마지막 전체 스캔이 저장한 manifest 로 다시 열기 (폴더 mtime 만 확인)
+    samples = [open_folder(manifest=True) for _ in range(repeat)]
+    results["viewer_reopen"] = summarize(samples, images=len(viewer.dataset))
+
+    # 그리드 화면 구성 (update_right_view) 과 첫 화면의 썸네일이 모두 도착할 때까지
+    def first_page_shown():
+        visible = viewer.grid_view.visible_range()
+        model = viewer.grid_model
+        if visible is None or model._in_flight:
+            return False
+        return all(model.data(model.index(row), Qt.DecorationRole) is not None
+                   for row in range(visible[0], visible[1] + 1))
+
+    build, first_page = [], []
+    for _ in range(repeat):
+        viewer.grid_mode = False
+        viewer.current_index = 0
+        viewer.update_right_view()
+        viewer.grid_model.reset()
+        viewer.grid_model.loader.cache.clear_memory()
+        app.processEvents()
+
+        start = time.perf_counter()
+        viewer.toggle_grid_mode()
+        app.processEvents()
+        build.append(time.perf_counter() - start)
+        if not wait_until(app, first_page_shown, timeout):
+            raise RuntimeError("grid thumbnails timed out")
+        first_page.append(time.perf_counter() - start)
+    results["grid_build"] = summarize(build)
+    results["grid_first_page"] = summarize(first_page, note="disk thumbnail cache warm after the first run")
+
+    # 단일 모드 이동: 버튼 한 번 -> 화면 갱신까지
+    viewer.toggle_grid_mode()
+    viewer.current_index = 0
+    viewer.update_right_view()
+    app.processEvents()
+    steps = min(steps, len(viewer.dataset) - 1)
+    next_samples, prev_samples = [], []
+    for samples, move in ((next_samples, viewer.next_clicked), (prev_samples, viewer.prev_clicked)):
+        for _ in range(steps):
+            # 키 반복으로 묶이지 않도록 (묶이면 미리보기만 그림) 매번 단일 입력으로 취급
+            viewer.last_nav_time = 0.0
+            start = time.perf_counter()
+            move()
+            viewer.repaint()
+            app.processEvents()
+            samples.append(time.perf_counter() - start)
+    results["single_next"] = summarize(next_samples)
+    results["single_prev"] = summarize(prev_samples)
+
+    viewer.close()
+    app.processEvents()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="run the EasyBase benchmarks on a synthetic dataset")
+    parser.add_argument("root", help="folder written by benchmarks.synth (images/ and labels/)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--steps", type=int, default=50, help="single-view next/prev steps")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--skip-gui", action="store_true")
+    parser.add_argument("--cache-dir", help="thumbnail / session cache folder (default: temporary)")
+    parser.add_argument("-o", "--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    images = os.path.join(args.root, "images")
+    labels = os.path.join(args.root, "labels")
+    work_dir = tempfile.mkdtemp(prefix="easybase-bench-")
+    # static.config 가 import 되기 전에 캐시 위치를 바꿔야 함
+    os.environ["XDG_CACHE_HOME"] = args.cache_dir or os.path.join(work_dir, "cache")
+
+    try:
+        report = {"meta": {"revision": git_revision(), "python": platform.python_version(),
+                           "platform": platform.platform(), "cpus": os.cpu_count(),
+                           "root": os.path.abspath(args.root), "repeat": args.repeat,
+                           "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+                  "results": {}}
+        report["results"].update(bench_core(images, labels, args.repeat, work_dir))
+        if not args.skip_gui:
+            report["results"].update(bench_gui(images, args.repeat, args.steps, args.timeout))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        json.dump(report, out, indent=1)
+        out.write("\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Synthetic dataset generator for the benchmarks.
+
+    python -m benchmarks.synth OUT_DIR --count 100000 --depth 3 --fanout 8
+
+One template file is written per (format, resolution) and every image is hard-linked to its
+template (use --copy for independent files), so even 1M-image trees are cheap to create.
+A matching label tree with 7-point .txt files is written next to the images.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import struct
+import sys
+import zlib
+
+from static import max_landmarks
+
+
+def write_png(path, width, height, seed):
+    # 가로 그라데이션 한 줄을 모든 행에 반복 (압축이 잘 되어 템플릿 생성이 빠름)
+    row = bytes((seed * 37 + x) % 256 for x in range(width * 3))
+    raw = b"".join(b"\x00" + row for _ in range(height))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw, 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def write_bmp(path, width, height, seed):
+    stride = (width * 3 + 3) & ~3
+    row = bytes((seed * 53 + x) % 256 for x in range(width * 3)).ljust(stride, b"\x00")
+    with open(path, "wb") as f:
+        f.write(b"BM" + struct.pack("<IHHI", 54 + stride * height, 0, 0, 54))
+        f.write(struct.pack("<IiiHHIIiiII", 40, width, height, 1, 24, 0, stride * height, 2835, 2835, 0, 0))
+        f.write(row * height)
+
+
+def write_with_qt(path, width, height, seed, fmt):
+    """JPEG / GIF need an encoder; use Qt if it is installed"""
+    try:
+        from PyQt5.QtGui import QImage, QColor
+    except ImportError:
+        return False
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor((seed * 71) % 256, (seed * 13) % 256, 128))
+    return image.save(path, fmt.upper())
+
+
+def write_template(path, fmt, width, height, seed):
+    if fmt == "png":
+        write_png(path, width, height, seed)
+        return True
+    if fmt == "bmp":
+        write_bmp(path, width, height, seed)
+        return True
+    return write_with_qt(path, width, height, seed, fmt)
+
+
+def leaf_dir(index, per_leaf, depth, fanout):
+    """Nested directory (depth levels, fanout sub directories each) for the index-th image"""
+    leaf = index // per_leaf
+    parts = []
+    for _ in range(depth):
+        parts.append(f"d{leaf % fanout:03d}")
+        leaf //= fanout
+    return os.path.join(*reversed(parts)) if parts else ""
+
+
+def generate(root, count, depth=2, fanout=8, formats=("png", "jpg", "bmp"),
+             resolutions=((640, 480), (1920, 1080)), per_leaf=500, copy=False, seed=0):
+    """Create root/images and root/labels; returns a summary dict"""
+    rng = random.Random(seed)
+    image_root = os.path.join(root, "images")
+    label_root = os.path.join(root, "labels")
+    template_root = os.path.join(root, "templates")
+    os.makedirs(template_root, exist_ok=True)
+
+    templates = []
+    for fmt in formats:
+        for n, (width, height) in enumerate(resolutions):
+            path = os.path.join(template_root, f"t{n}.{fmt}")
+            if os.path.exists(path) or write_template(path, fmt, width, height, seed + n):
+                templates.append((path, fmt, width, height))
+            else:
+                print(f"skipping {fmt}: no encoder available", file=sys.stderr)
+    if not templates:
+        raise RuntimeError("no image format could be written")
+
+    link = not copy
+    for index in range(count):
+        template, fmt, width, height = templates[index % len(templates)]
+        relative_dir = leaf_dir(index, per_leaf, depth, fanout)
+        name = f"img{index:07d}"
+        image_dir = os.path.join(image_root, relative_dir)
+        label_dir = os.path.join(label_root, relative_dir)
+        if index % per_leaf == 0:
+            os.makedirs(image_dir, exist_ok=True)
+            os.makedirs(label_dir, exist_ok=True)
+
+        image_path = os.path.join(image_dir, f"{name}.{fmt}")
+        if not os.path.exists(image_path):
+            if link:
+                try:
+                    os.link(template, image_path)
+                except OSError:
+                    link = False
+            if not link:
+                shutil.copyfile(template, image_path)
+
+        points = [(rng.randrange(width), rng.randrange(height)) for _ in range(max_landmarks)]
+        with open(os.path.join(label_dir, f"{name}.txt"), "w", encoding="utf-8") as f:
+            f.write(" ".join(f"{x} {y}" for x, y in points) + "\n")
+
+    return {"root": root, "images": image_root, "labels": label_root, "count": count, "depth": depth,
+            "fanout": fanout, "formats": sorted({t[1] for t in templates}),
+            "resolutions": [list(r) for r in resolutions], "hardlinked": link}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="generate a synthetic EasyBase dataset")
+    parser.add_argument("root")
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--fanout", type=int, default=8)
+    parser.add_argument("--per-leaf", type=int, default=500, help="images per leaf directory")
+    parser.add_argument("--formats", default="png,jpg,bmp")
+    parser.add_argument("--resolutions", default="640x480,1920x1080")
+    parser.add_argument("--copy", action="store_true", help="write independent files instead of hard links")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    resolutions = [tuple(map(int, r.split("x"))) for r in args.resolutions.split(",")]
+    summary = generate(args.root, args.count, args.depth, args.fanout, tuple(args.formats.split(",")),
+                       resolutions, args.per_leaf, args.copy, args.seed)
+    json.dump(summary, sys.stdout, indent=1)
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
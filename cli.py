@@ -0,0 +1,312 @@
+"""
+Headless batch jobs on datasets and label folders (no Qt import):
+
+    python main.py scan DATASET [-o images.txt]
+    python main.py validate DATASET LABELS [--workers N] [--json]
+    python main.py convert DATASET SOURCE TARGET
+    python main.py merge-checked OUTPUT LIST [LIST ...] [--dataset DATASET]
+    python main.py export DATASET LIST OUTPUT [--mode auto] [--split 0.8,0.1,0.1] [--labels SOURCE]
+    python main.py compare DATASET A B [-o report.tsv] [--json]
+    python main.py queue create QUEUE DATASET [--shard-size 500]
+    python main.py queue status QUEUE
+    python main.py queue merge QUEUE DATASET TARGET
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from core import find_all_images, normalize_path, image_size, scan_files, label_image_id, read_labels
+from compare import compare, load_label_sets
+from dataset import DatasetIndex
+from export import export_dataset, export_modes, parse_splits
+from landmarks import LandmarkStore
+from selection import read_check_list
+from static import max_landmarks, export_mode, export_seed, export_workers, compare_agree_px, queue_shard_size
+from workqueue import WorkQueue, create_queue, merge_queue
+
+
+def load_dataset(folder):
+    """(DatasetIndex, normalized dataset root) for a dataset folder"""
+    return DatasetIndex(find_all_images(folder)), normalize_path(str(Path(folder).resolve()))
+
+
+def cmd_scan(args):
+    images = find_all_images(args.dataset)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for path in images:
+            out.write(path + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(images)} images", file=sys.stderr)
+    return 0
+
+
+def validate_labels(pairs):
+    """
+    Check (label file, image path or None) pairs.
+    Returns [(label file, kind, detail)] for: unreadable, orphan, odd-count, point-count, image-unreadable, out-of-bounds.
+    """
+    issues = []
+    for label_file, image_path in pairs:
+        try:
+            with open(label_file, "r", encoding="utf-8") as f:
+                numbers = list(map(int, f.read().split()))
+        except Exception as e:
+            issues.append((label_file, "unreadable", str(e)))
+            continue
+        if image_path is None:
+            issues.append((label_file, "orphan", "no matching image"))
+            continue
+        if len(numbers) % 2:
+            issues.append((label_file, "odd-count", f"{len(numbers)} numbers"))
+        xs, ys = numbers[0:len(numbers) // 2 * 2:2], numbers[1::2]
+        if len(xs) != max_landmarks:
+            issues.append((label_file, "point-count", f"{len(xs)} points (expected {max_landmarks})"))
+        size = image_size(image_path)
+        if size is None:
+            issues.append((label_file, "image-unreadable", image_path))
+            continue
+        width, height = size
+        outside = [i + 1 for i, (x, y) in enumerate(zip(xs, ys)) if not (0 <= x < width and 0 <= y < height)]
+        if outside:
+            issues.append((label_file, "out-of-bounds", f"points {outside} outside {width}x{height}"))
+    return issues
+
+
+def cmd_validate(args):
+    dataset, dataset_root = load_dataset(args.dataset)
+    label_root = normalize_path(str(Path(args.labels).resolve()))
+    pairs = []
+    for batch in scan_files(label_root, (".txt",)):
+        for label_file in batch:
+            image_id = label_image_id(label_file, label_root, dataset_root, dataset)
+            pairs.append((label_file, None if image_id is None else dataset.path_of_id(image_id)))
+    pairs.sort()
+
+    chunks = [pairs[i:i + args.chunk_size] for i in range(0, len(pairs), args.chunk_size)]
+    issues = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for result in executor.map(validate_labels, chunks):
+            issues.extend(result)
+
+    if args.json:
+        json.dump({"labels": len(pairs), "issues": [{"label": label, "kind": kind, "detail": detail}
+                                                    for label, kind, detail in issues]}, sys.stdout, indent=1)
+        sys.stdout.write("\n")
+    else:
+        for label, kind, detail in issues:
+            print(f"{kind}\t{label}\t{detail}")
+    print(f"{len(pairs)} label files, {len(issues)} issues", file=sys.stderr)
+    return 1 if issues else 0
+
+
+def cmd_convert(args):
+    """.txt label folder -> .npz, or .npz -> .txt label folder"""
+    dataset, dataset_root = load_dataset(args.dataset)
+    store = LandmarkStore()
+    if args.source.endswith(".npz"):
+        unmatched = store.load(args.source, dataset, dataset_root)
+        problems = [f"not in dataset: {path}" for path in unmatched]
+    else:
+        labels, unmatched, errors = read_labels(args.source, args.dataset, dataset, workers=args.workers)
+        rejected = store.update(labels)
+        problems = [f"no image: {path}" for path in unmatched]
+        problems += [f"read error: {path} ({error})" for path, error in errors]
+        problems += [f"more than {max_landmarks} landmarks: {dataset.path_of_id(i)}" for i in rejected]
+
+    if args.target.endswith(".npz"):
+        store.save(args.target, dataset, dataset_root)
+        written = len(store)
+    else:
+        written = store.export_txt(args.target, dataset, dataset_root)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    print(f"{written} images written, {len(problems)} problems", file=sys.stderr)
+    return 1 if problems else 0
+
+
+def cmd_merge_checked(args):
+    """Union of check lists in first-seen order, optionally restricted to a dataset"""
+    dataset = load_dataset(args.dataset)[0] if args.dataset else None
+    merged, dropped = {}, 0
+    for list_path in args.lists:
+        with open(list_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                path = normalize_path(line)
+                if dataset is not None and path not in dataset:
+                    dropped += 1
+                    continue
+                merged.setdefault(path, None)
+    with open(args.output, "w", encoding="utf-8") as f:
+        for path in merged:
+            f.write(path + "\n")
+    print(f"{len(merged)} paths written, {dropped} not in dataset", file=sys.stderr)
+    return 0
+
+
+def cmd_export(args):
+    """Materialize the images of a check list (with their landmarks and split lists) in an output tree"""
+    dataset, dataset_root = load_dataset(args.dataset)
+    ids, unmatched = read_check_list(args.list, dataset)
+    labels = None
+    if args.labels:
+        store = LandmarkStore()
+        if args.labels.endswith(".npz"):
+            store.load(args.labels, dataset, dataset_root)
+        else:
+            store.update(read_labels(args.labels, args.dataset, dataset, workers=args.workers)[0])
+        labels = (store, dataset)
+    paths = sorted({dataset.path_of_id(image_id) for image_id in ids})
+    summary = export_dataset(paths, dataset_root, args.output, args.mode, args.split, args.seed, labels,
+                             workers=args.workers)
+    for path, error in summary["errors"]:
+        print(f"export error: {path} ({error})", file=sys.stderr)
+    methods = ", ".join(f"{count} {method}" for method, count in sorted(summary["methods"].items()))
+    print(f"{summary['images']} images ({methods or 'none'}), {summary['labels']} label files, "
+          f"{unmatched} list entries not in dataset", file=sys.stderr)
+    if summary["splits"]:
+        print("split: " + ", ".join(f"{name} {count}" for name, count in summary["splits"].items()), file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+def cmd_compare(args):
+    """Per-image disagreement of two label sets (.txt folders or .npz), most disagreeing first"""
+    dataset, dataset_root = load_dataset(args.dataset)
+    (store_a, problems_a), (store_b, problems_b) = load_label_sets([args.a, args.b], args.dataset, dataset,
+                                                                   dataset_root)
+    comparison = compare(store_a, store_b, dataset.ids(), args.agree_px)
+    for problem in problems_a:
+        print(f"A {problem}", file=sys.stderr)
+    for problem in problems_b:
+        print(f"B {problem}", file=sys.stderr)
+
+    rows = zip(comparison.ids.tolist(), comparison.counts_a.tolist(), comparison.counts_b.tolist(),
+               comparison.worst.tolist(), comparison.mean.tolist(), comparison.paired.tolist())
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        if args.json:
+            json.dump({"summary": comparison.summary(), "images": [
+                {"path": dataset.path_of_id(image_id), "points_a": a, "points_b": b,
+                 "max_px": worst if paired else None, "mean_px": mean if paired else None}
+                for image_id, a, b, worst, mean, paired in rows]}, out, indent=1)
+            out.write("\n")
+        else:
+            for image_id, a, b, worst, mean, paired in rows:
+                distances = f"{worst:.2f}\t{mean:.2f}" if paired else "\t"
+                out.write(f"{distances}\t{a}/{b}\t{dataset.path_of_id(image_id)}\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(comparison.summary(), file=sys.stderr)
+    return 0
+
+
+def cmd_queue(args):
+    """Create a work queue, show who works on which shard, or merge every shard's landmarks"""
+    if args.action == "create":
+        dataset, dataset_root = load_dataset(args.dataset)
+        shards = create_queue(args.queue, dataset, dataset_root, args.shard_size)
+        print(f"{shards} shards of up to {args.shard_size} images ({len(dataset)} images)", file=sys.stderr)
+        return 0
+    if args.action == "status":
+        status = WorkQueue(args.queue).status()
+        for shard, state, session in status:
+            print(f"{shard + 1}\t{state}\t{session or ''}")
+        states = [state for _, state, _ in status]
+        print(", ".join(f"{states.count(state)} {state}" for state in ("done", "leased", "expired", "open")),
+              file=sys.stderr)
+        return 0
+    dataset, dataset_root = load_dataset(args.dataset)
+    store, unmatched = merge_queue(args.queue, dataset, dataset_root)
+    if args.target.endswith(".npz"):
+        store.save(args.target, dataset, dataset_root)
+        written = len(store)
+    else:
+        written = store.export_txt(args.target, dataset, dataset_root)
+    for path in unmatched:
+        print(f"not in dataset: {path}", file=sys.stderr)
+    print(f"{written} images written, {len(unmatched)} not in dataset", file=sys.stderr)
+    return 1 if unmatched else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="easybase", description="EasyBase batch tools (no GUI)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("scan", help="list all images of a dataset")
+    p.add_argument("dataset")
+    p.add_argument("-o", "--output", help="write the sorted list here instead of stdout")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("validate", help="check label files (point count, bounds, orphans)")
+    p.add_argument("dataset")
+    p.add_argument("labels")
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.add_argument("--chunk-size", type=int, default=512)
+    p.add_argument("--json", action="store_true", help="print the report as JSON")
+    p.set_defaults(func=cmd_validate)
+
+    p = sub.add_parser("convert", help="convert between a .txt label folder and a single .npz")
+    p.add_argument("dataset")
+    p.add_argument("source", help=".txt label folder or .npz file")
+    p.add_argument("target", help=".npz file or output label folder")
+    p.add_argument("--workers", type=int, default=8)
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("merge-checked", help="merge check list files")
+    p.add_argument("output")
+    p.add_argument("lists", nargs="+")
+    p.add_argument("--dataset", help="drop paths that are not in this dataset")
+    p.set_defaults(func=cmd_merge_checked)
+
+    p = sub.add_parser("export", help="link / copy the images of a check list into an output tree")
+    p.add_argument("dataset")
+    p.add_argument("list", help="check list file (one image path per line)")
+    p.add_argument("output")
+    p.add_argument("--mode", choices=export_modes, default=export_mode)
+    p.add_argument("--split", type=parse_splits, help="train,val,test ratios, e.g. 0.8,0.1,0.1 (default: no split lists)")
+    p.add_argument("--seed", type=int, default=export_seed)
+    p.add_argument("--labels", help=".txt label folder or .npz to export with the images")
+    p.add_argument("--workers", type=int, default=export_workers)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("compare", help="compare two label sets (.txt folders or .npz), most disagreeing first")
+    p.add_argument("dataset")
+    p.add_argument("a", help="label set A (.txt label folder or .npz)")
+    p.add_argument("b", help="label set B (.txt label folder or .npz)")
+    p.add_argument("-o", "--output", help="write the per-image report here instead of stdout")
+    p.add_argument("--json", action="store_true", help="write the report as JSON")
+    p.add_argument("--agree-px", type=float, default=compare_agree_px, help="distance counted as agreement")
+    p.set_defaults(func=cmd_compare)
+
+    p = sub.add_parser("queue", help="shard a dataset for several annotators (see workqueue.py)")
+    queue_sub = p.add_subparsers(dest="action", required=True)
+    q = queue_sub.add_parser("create", help="split the dataset into shards in a shared queue folder")
+    q.add_argument("queue")
+    q.add_argument("dataset")
+    q.add_argument("--shard-size", type=int, default=queue_shard_size)
+    q = queue_sub.add_parser("status", help="state and session of every shard")
+    q.add_argument("queue")
+    q = queue_sub.add_parser("merge", help="merge the landmarks of all shards into one .npz or .txt label folder")
+    q.add_argument("queue")
+    q.add_argument("dataset")
+    q.add_argument("target", help=".npz file or output label folder")
+    p.set_defaults(func=cmd_queue)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Agreement between two landmark sets of the same dataset, e.g. two annotators or a model and a human
+(no Qt import). Both sets are LandmarkStores indexed by image id, so the comparison is a few array
+operations over all images at once.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core import read_labels
+from landmarks import LandmarkStore
+from static import compare_agree_px, max_landmarks
+
+
+def load_label_set(source, dataset_folder, dataset, dataset_root, cancel=None, workers=8):
+    """LandmarkStore from a .txt label folder or a .npz; returns (store, [problem])"""
+    store = LandmarkStore(len(dataset.directory_ids()))
+    if source.endswith(".npz"):
+        return store, [f"not in dataset: {path}" for path in store.load(source, dataset, dataset_root)]
+    labels, unmatched, errors = read_labels(source, dataset_folder, dataset, cancel=cancel, workers=workers)
+    rejected = store.update(labels)
+    problems = [f"no image: {path}" for path in unmatched]
+    problems += [f"read error: {path} ({error})" for path, error in errors]
+    problems += [f"more than {max_landmarks} landmarks: {dataset.path_of_id(i)}" for i in rejected]
+    return store, problems
+
+
+def load_label_sets(sources, dataset_folder, dataset, dataset_root, cancel=None):
+    """Load several label sets at the same time; returns [(store, problems)] in the order of sources"""
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        return list(executor.map(
+            lambda source: load_label_set(source, dataset_folder, dataset, dataset_root, cancel), sources))
+
+
+def _gather(store, ids):
+    """(points, counts) of the given ids, zero for ids beyond the store's capacity"""
+    points = np.zeros((len(ids), max_landmarks, 2), np.int32)
+    counts = np.zeros(len(ids), np.int64)
+    inside = ids < len(store.counts)
+    points[inside] = store.points[ids[inside]]
+    counts[inside] = store.counts[ids[inside]]
+    return points, counts
+
+
+class LabelComparison:
+    """
+    Result of `compare`, most disagreeing image first: images whose point counts differ (including images
+    labeled in one set only), then by the largest point distance.
+    ids / counts_a / counts_b / worst / mean are parallel arrays; distance is (n x max_landmarks) pixels,
+    nan where either set lacks the point.
+    """
+
+    def __init__(self, ids, counts_a, counts_b, distance, agree_px):
+        self.ids = ids
+        self.counts_a = counts_a
+        self.counts_b = counts_b
+        self.distance = distance
+        self.agree_px = agree_px
+        paired = ~np.isnan(distance)
+        self.paired = paired.sum(axis=1)
+        self.worst = np.where(paired, distance, -1).max(axis=1) if len(ids) else np.zeros(0)
+        self.mean = np.where(paired, distance, 0).sum(axis=1) / np.maximum(self.paired, 1)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def mismatched(self):
+        return self.counts_a != self.counts_b
+
+    def point_stats(self):
+        """Per point (mean, median, 95th percentile) distance in pixels over the images where both sets have it"""
+        stats = []
+        for point in range(max_landmarks):
+            values = self.distance[:, point]
+            values = values[~np.isnan(values)]
+            stats.append((values.mean(), np.median(values), np.percentile(values, 95)) if len(values)
+                         else (np.nan, np.nan, np.nan))
+        return stats
+
+    def summary(self):
+        both = int(((self.counts_a > 0) & (self.counts_b > 0)).sum())
+        only_a = int(((self.counts_a > 0) & (self.counts_b == 0)).sum())
+        only_b = int(((self.counts_a == 0) & (self.counts_b > 0)).sum())
+        values = self.distance[~np.isnan(self.distance)]
+        agree = (values <= self.agree_px).mean() if len(values) else 0.0
+        text = (f"{both} images in both sets ({only_a} only in A, {only_b} only in B, "
+                f"{int(self.mismatched().sum())} with different point counts); "
+                f"{agree:.1%} of {len(values)} points within {self.agree_px} px")
+        if len(values):
+            text += "; mean / median / p95 px per point: " + " ".join(
+                f"{point + 1}:{mean:.1f}/{median:.1f}/{p95:.1f}"
+                for point, (mean, median, p95) in enumerate(self.point_stats()) if not np.isnan(mean))
+        return text
+
+
+def compare(store_a, store_b, ids=None, agree_px=compare_agree_px):
+    """
+    Compare two LandmarkStores over the images labeled in either (restricted to `ids` if given,
+    e.g. the images listed in the dataset).
+    """
+    labeled = np.zeros(max(len(store_a.counts), len(store_b.counts)), bool)
+    labeled[:len(store_a.counts)] |= store_a.counts > 0
+    labeled[:len(store_b.counts)] |= store_b.counts > 0
+    if ids is not None:
+        ids = np.asarray(ids, np.int64)
+        ids = ids[ids < len(labeled)]
+        ids = np.sort(ids[labeled[ids]])
+    else:
+        ids = np.flatnonzero(labeled)
+    points_a, counts_a = _gather(store_a, ids)
+    points_b, counts_b = _gather(store_b, ids)
+    point = np.arange(max_landmarks)[None, :]
+    paired = (point < counts_a[:, None]) & (point < counts_b[:, None])
+    distance = np.hypot(*(points_a - points_b).astype(np.float64).transpose(2, 0, 1))
+    distance[~paired] = np.nan
+    # 점 개수가 다른 이미지를 먼저, 그다음 가장 먼 점의 거리 순서
+    worst = np.where(paired, distance, -1).max(axis=1) if len(ids) else np.zeros(0)
+    order = np.lexsort((ids, -worst, counts_a == counts_b))
+    return LabelComparison(ids[order], counts_a[order], counts_b[order], distance[order], agree_px)
@@ -0,0 +1,48 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class LabelComparisonModel(QAbstractTableModel):
+    """Rows of a compare.LabelComparison (most disagreeing first); Qt.UserRole gives the image id"""
+    headers = ("max px", "mean px", "points A/B", "path")
+
+    def __init__(self, viewer, parent=None):
+        super().__init__(parent)
+        self.viewer = viewer
+        self.comparison = None
+
+    def set_comparison(self, comparison):
+        self.beginResetModel()
+        self.comparison = comparison
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.comparison is None:
+            return 0
+        return len(self.comparison)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        comparison = self.comparison
+        image_id = int(comparison.ids[row])
+        if role == Qt.UserRole:
+            return image_id
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        column = index.column()
+        if column in (0, 1):
+            if not comparison.paired[row]:
+                return ""
+            return f"{(comparison.worst if column == 0 else comparison.mean)[row]:.1f}"
+        if column == 2:
+            return f"{comparison.counts_a[row]}/{comparison.counts_b[row]}"
+        return self.viewer.dataset.path_of_id(image_id)
@@ -0,0 +1,276 @@
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+
+image_exts = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+
+
+def find_all_images(folder):
+    """
+    주어진 폴더(및 하위 폴더)에서 이미지 파일을 재귀적으로 검색하고,
+    중복을 제거한 후 정렬된 리스트로 반환합니다.
+    """
+    images = set()
+    for batch in scan_images(folder):
+        images.update(batch)
+    return sorted(images)
+
+
+def file_identity(stat_result):
+    """(device, inode, size, mtime in ns): equal only for the same file, also after a rename or move"""
+    return stat_result.st_dev, stat_result.st_ino, stat_result.st_size, stat_result.st_mtime_ns
+
+
+def _scan_dir(path, exts, identities=None):
+    """
+    List one directory: (matching file paths, sub directories, mtime in ns or None).
+    If `identities` is a dict, the file_identity of every listed file is stored in it by path.
+    """
+    files, subdirs, mtime = [], [], None
+    try:
+        # 목록을 읽기 전에 mtime 을 기록해야 그 사이의 변경이 다음 검증에서 빠지지 않음
+        mtime = os.stat(path).st_mtime_ns
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                    elif entry.name.lower().endswith(exts):
+                        file_path = os.path.normcase(entry.path)
+                        if identities is not None:
+                            identities[file_path] = file_identity(entry.stat(follow_symlinks=False))
+                        files.append(file_path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, subdirs, mtime
+
+
+def directory_identities(directory, exts=image_exts):
+    """{path: file_identity} of the matching files of one directory (not recursive)"""
+    identities = {}
+    _scan_dir(directory, exts, identities)
+    return identities
+
+
+def scan_files(folder, exts, batch_size=2000, cancel=None, workers=8, interval=0.25, mtimes=None):
+    """
+    Walk the folder with several os.scandir workers and yield unsorted batches of normalized paths
+    whose (lower-cased) name ends with one of exts.
+    A batch is yielded every `batch_size` files or `interval` seconds, whichever comes first.
+    The root is resolved once; files are not resolved individually.
+    Set the `cancel` threading.Event to stop early. If `mtimes` is a dict, every listed directory
+    (normalized) is stored in it with its mtime (see manifest.py).
+    """
+    root = normalize_path(str(Path(folder).resolve()))
+    batch = []
+    last_yield = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(_scan_dir, root, exts): root}
+        while pending:
+            if cancel is not None and cancel.is_set():
+                for future in pending:
+                    future.cancel()
+                return
+            done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                directory = pending.pop(future)
+                files, subdirs, mtime = future.result()
+                batch.extend(files)
+                if mtimes is not None and mtime is not None:
+                    mtimes[directory] = mtime
+                for subdir in subdirs:
+                    subdir = os.path.normcase(subdir)
+                    pending[executor.submit(_scan_dir, subdir, exts)] = subdir
+            if batch and (len(batch) >= batch_size or not pending or time.monotonic() - last_yield >= interval):
+                yield batch
+                batch = []
+                last_yield = time.monotonic()
+    if batch:
+        yield batch
+
+
+def directory_mtimes(dirs, workers=16):
+    """{directory: mtime in ns, or None if it is gone}, stat'ed in parallel"""
+    def mtime(directory):
+        try:
+            return os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return dict(zip(dirs, executor.map(mtime, dirs, chunksize=256)))
+
+
+def scan_images(folder, **kwargs):
+    """Streaming image scan, see scan_files"""
+    return scan_files(folder, image_exts, **kwargs)
+
+
+def scan_delta(dirs, known, watched, exts=image_exts, mtimes=None, identities=None):
+    """
+    Re-list only the given (changed) directories and compare them with what the dataset knows.
+    known: {directory: set of listed file names}; watched: set of directories already tracked.
+    Sub directories that are not tracked yet are scanned recursively.
+    Returns (added paths, removed paths, new directories, gone directories); the images inside
+    gone directories are left to the caller. `mtimes` is filled as in scan_files, `identities` with the
+    file_identity of every listed file.
+    """
+    added, removed, new_dirs, gone_dirs = [], [], [], []
+    for directory in dirs:
+        if not os.path.isdir(directory):
+            gone_dirs.append(directory)
+            continue
+        files, subdirs, mtime = _scan_dir(directory, exts, identities)
+        if mtimes is not None and mtime is not None:
+            mtimes[directory] = mtime
+        names = known.get(directory, set())
+        on_disk = {os.path.basename(f) for f in files}
+        added.extend(f for f in files if os.path.basename(f) not in names)
+        removed.extend(os.path.join(directory, name) for name in names - on_disk)
+
+        subdirs = {os.path.normcase(d) for d in subdirs}
+        gone_dirs.extend(d for d in watched if os.path.dirname(d) == directory and d not in subdirs)
+        # 새로 생긴 (또는 옮겨 온) 폴더는 하위까지 통째로 스캔
+        stack = [d for d in subdirs if d not in watched]
+        while stack:
+            sub = stack.pop()
+            new_dirs.append(sub)
+            files, children, mtime = _scan_dir(sub, exts, identities)
+            if mtimes is not None and mtime is not None:
+                mtimes[sub] = mtime
+            added.extend(files)
+            stack.extend(os.path.normcase(d) for d in children)
+    return added, removed, new_dirs, gone_dirs
+
+
+def match_renames(removed, added, old_identity, new_identity):
+    """
+    Pair removed and added paths that are the same file renamed or moved: the file_identity the removed
+    path had (old_identity(path), None if unknown) equals that of the added path (new_identity(path)).
+    Anything else, including several added paths with one identity (hard links), stays a removal and an addition.
+    Returns ([(old, new)], remaining removed, remaining added).
+    """
+    by_identity = {}
+    for path in added:
+        identity = new_identity(path)
+        if identity is not None:
+            by_identity.setdefault(identity, []).append(path)
+    renames = []
+    for old in removed:
+        candidates = by_identity.get(old_identity(old))
+        if candidates is not None and len(candidates) == 1 and candidates[0] != old:
+            renames.append((old, candidates.pop()))
+    moved_old = {old for old, _ in renames}
+    moved_new = {new for _, new in renames}
+    return renames, [p for p in removed if p not in moved_old], [p for p in added if p not in moved_new]
+
+
+def normalize_path(path):
+    """
+    경로를 os.path.normpath와 os.path.normcase를 사용하여 정규화합니다.
+    """
+    return os.path.normcase(os.path.normpath(path))
+
+
+def parse_label(file):
+    """Read one label file: "x1 y1 x2 y2 ..." -> [(x1, y1), (x2, y2), ...]"""
+    with open(file, "r", encoding="utf-8") as f:
+        # 공백으로 구분된 숫자들을 리스트로 변환
+        numbers = list(map(int, f.read().split()))
+    return list(zip(numbers[::2], numbers[1::2]))
+
+
+def _parse_label_chunk(files):
+    results = []
+    for file in files:
+        try:
+            results.append((file, parse_label(file), None))
+        except Exception as e:
+            results.append((file, None, str(e)))
+    return results
+
+
+def label_image_id(label_file, label_root, dataset_root, dataset):
+    """Image id of the dataset image with the same relative path as the label (any image extension), or None"""
+    stem = os.path.join(dataset_root, os.path.splitext(os.path.relpath(label_file, label_root))[0])
+    for ext in image_exts + tuple(ext.upper() for ext in image_exts):
+        image_id = dataset.id_of(stem + ext)
+        if image_id is not None:
+            return image_id
+    return None
+
+
+def read_labels(root, dataset_path, dataset, cancel=None, progress=None, workers=8, chunk_size=256):
+    """
+    Read every .txt label under root (in parallel) and match it to the dataset image with the
+    same relative path under dataset_path (any image extension).
+    `progress(done, total)` is called after each chunk; set the `cancel` threading.Event to stop early.
+    Returns ({image id: [(x, y), ...]}, [label files without a matching image], [(label file, error)]).
+    """
+    label_root = normalize_path(str(Path(root).resolve()))
+    dataset_root = normalize_path(str(Path(dataset_path).resolve()))
+    files = [file for batch in scan_files(label_root, (".txt",), cancel=cancel) for file in batch]
+    file_data, unmatched, errors = {}, [], []
+
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_parse_label_chunk, files[i:i + chunk_size])
+                   for i in range(0, len(files), chunk_size)]
+        for future in futures:
+            if cancel is not None and cancel.is_set():
+                for f in futures:
+                    f.cancel()
+                break
+            results = future.result()
+            for file, numbers, error in results:
+                if error is not None:
+                    errors.append((file, error))
+                    continue
+                # 데이터셋 인덱스에서 같은 상대 경로의 이미지를 찾음 (확장자별 dict 조회)
+                image_id = label_image_id(file, label_root, dataset_root, dataset)
+                if image_id is None:
+                    unmatched.append(file)
+                else:
+                    file_data[image_id] = numbers
+            done += len(results)
+            if progress is not None:
+                progress(done, len(files))
+
+    return file_data, unmatched, errors
+
+
+def image_size(path):
+    """
+    (width, height) read from the image header without decoding (PNG, JPEG, BMP, GIF), or None.
+    """
+    try:
+        with open(path, "rb") as f:
+            head = f.read(26)
+            if head[:8] == b"\x89PNG\r\n\x1a\n":
+                return struct.unpack(">II", head[16:24])
+            if head[:6] in (b"GIF87a", b"GIF89a"):
+                return struct.unpack("<HH", head[6:10])
+            if head[:2] == b"BM":
+                width, height = struct.unpack("<ii", head[18:26])
+                return width, abs(height)
+            if head[:2] == b"\xff\xd8":
+                # SOFn 마커를 찾을 때까지 세그먼트 단위로 건너뜀
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    if len(marker) < 2 or marker[0] != 0xFF:
+                        return None
+                    if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                        continue
+                    length = struct.unpack(">H", f.read(2))[0]
+                    if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                        height, width = struct.unpack(">xHH", f.read(5))
+                        return width, height
+                    f.seek(length - 2, os.SEEK_CUR)
+    except (OSError, struct.error):
+        pass
+    return None
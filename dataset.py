@@ -0,0 +1,227 @@
+import os
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+from core import normalize_path
+
+
+class DatasetIndex:
+    """
+    Ordered list of normalized image paths with O(1) path -> index lookups.
+
+    Paths are stored as (directory id, file name): each directory string is kept once and the
+    per-image data lives in flat arrays. Every image gets a stable integer id when it is added;
+    ids survive re-sorting, so data keyed by id (landmarks, selections) stays attached to its file.
+    Removed images keep their id and get it back if the same path is added again; renamed images keep theirs.
+    """
+
+    def __init__(self, paths=()):
+        self._dirs = []  # dir id -> 디렉토리 경로
+        self._dir_ids = {}  # 디렉토리 경로 -> dir id
+        self._by_dir = []  # dir id -> {파일명: image id}
+        self._dir_of = array('I')  # image id -> dir id
+        self._names = []  # image id -> 파일명
+        self._order = array('I')  # index -> image id
+        self._index_of = None  # image id -> index, 필요할 때 다시 계산
+        self._removed = set()  # 목록에서 빠진 image id (같은 경로가 다시 생기면 재사용)
+        self.extend(paths)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __bool__(self):
+        return len(self._order) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.path_of_id(image_id) for image_id in self._order[index]]
+        return self.path_of_id(self._order[index])
+
+    def __iter__(self):
+        for image_id in self._order:
+            yield self.path_of_id(image_id)
+
+    def __contains__(self, path):
+        return self.id_of(path) is not None
+
+    def extend(self, paths):
+        """Append normalized paths (already known paths are skipped); returns the number added"""
+        added = 0
+        for path in paths:
+            image_id = self._add(path)
+            if image_id is not None:
+                self._order.append(image_id)
+                added += 1
+        if added:
+            self._index_of = None
+        return added
+
+    def insert(self, paths):
+        """Add normalized paths at their sorted position (the index must be sorted); returns the number added"""
+        paths = sorted(paths)
+        if len(paths) > len(self._order) // 8:
+            # 많이 추가될 때는 한 번에 다시 정렬하는 편이 빠름
+            added = self.extend(paths)
+            self.sort()
+            return added
+        added = 0
+        for path in paths:
+            image_id = self._add(path)
+            if image_id is not None:
+                self._order.insert(bisect_left(self, path), image_id)
+                added += 1
+        if added:
+            self._index_of = None
+        return added
+
+    def remove(self, ids):
+        """Drop images from the list; their ids stay reserved for the same path"""
+        ids = set(ids) - self._removed
+        if ids:
+            self._order = array('I', (i for i in self._order if i not in ids))
+            self._removed |= ids
+            self._index_of = None
+
+    def rename(self, image_id, path):
+        """Move an image to a new normalized path at its sorted position, keeping its id"""
+        old = self.id_of(path)
+        if old is not None and old != image_id:
+            # 덮어쓴 경우: 원래 그 경로에 있던 이미지는 목록에서 제외
+            self.remove([old])
+        del self._by_dir[self._dir_of[image_id]][self._names[image_id]]
+        directory, name = os.path.split(path)
+        dir_id = self._intern(directory)
+        self._by_dir[dir_id][name] = image_id
+        self._dir_of[image_id] = dir_id
+        self._names[image_id] = name
+        if image_id not in self._removed:
+            self._order.remove(image_id)
+            self._order.insert(bisect_left(self, path), image_id)
+            self._index_of = None
+
+    def state(self):
+        """(directories, file name of every id, directory id of every id, display order) for `from_state`"""
+        return list(self._dirs), list(self._names), array('I', self._dir_of), array('I', self._order)
+
+    @classmethod
+    def from_state(cls, dirs, names, dir_of, order):
+        """Rebuild an index saved with `state` (ids are kept; ids not in order count as removed)"""
+        index = cls()
+        index._dirs = list(dirs)
+        index._dir_ids = {directory: dir_id for dir_id, directory in enumerate(index._dirs)}
+        index._dir_of = array('I', dir_of)
+        index._names = list(names)
+        # 폴더별 {파일명: id} 는 id 를 폴더 순으로 묶어서 dict(zip(...)) 로 한 번에 만듦
+        dir_ids = np.frombuffer(index._dir_of, np.uint32) if len(index._dir_of) else np.zeros(0, np.uint32)
+        grouped = np.argsort(dir_ids, kind="stable")
+        bounds = np.searchsorted(dir_ids[grouped], np.arange(len(index._dirs) + 1)).tolist()
+        grouped = grouped.tolist()
+        get_name = index._names.__getitem__
+        index._by_dir = []
+        for dir_id in range(len(index._dirs)):
+            ids = grouped[bounds[dir_id]:bounds[dir_id + 1]]
+            index._by_dir.append(dict(zip(map(get_name, ids), ids)))
+        index._order = array('I', order)
+        if len(index._order) != len(index._names):
+            index._removed = set(range(len(index._names))).difference(index._order)
+        return index
+
+    def _intern(self, directory):
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            dir_id = len(self._dirs)
+            self._dirs.append(directory)
+            self._dir_ids[directory] = dir_id
+            self._by_dir.append({})
+        return dir_id
+
+    def _add(self, path):
+        """Id for a new (or previously removed) path, or None if it is already listed"""
+        directory, name = os.path.split(path)
+        names = self._by_dir[self._intern(directory)]
+        image_id = names.get(name)
+        if image_id is not None:
+            if image_id not in self._removed:
+                return None
+            self._removed.discard(image_id)
+            return image_id
+        image_id = len(self._names)
+        names[name] = image_id
+        self._names.append(name)
+        self._dir_of.append(self._dir_ids[directory])
+        return image_id
+
+    def sort(self):
+        """Sort by path; ids are unchanged, indexes follow the new order"""
+        self._order = array('I', sorted(self._order, key=self.path_of_id))
+        self._index_of = None
+
+    def path_of_id(self, image_id):
+        return os.path.join(self._dirs[self._dir_of[image_id]], self._names[image_id])
+
+    def paths_of_ids(self, ids):
+        """Paths of many image ids (one os.path.join per directory instead of per image)"""
+        prefixes = [os.path.join(directory, "") for directory in self._dirs]
+        dir_of, names = self._dir_of, self._names
+        return [prefixes[dir_of[i]] + names[i] for i in ids]
+
+    def id_of(self, path):
+        """Image id of a normalized path, or None"""
+        directory, name = os.path.split(path)
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            return None
+        image_id = self._by_dir[dir_id].get(name)
+        return None if image_id in self._removed else image_id
+
+    def id_at(self, index):
+        return self._order[index]
+
+    def index_of_id(self, image_id):
+        if self._index_of is None:
+            self._index_of = array('i', [-1]) * len(self._names)
+            for index, i in enumerate(self._order):
+                self._index_of[i] = index
+        return self._index_of[image_id]
+
+    def find(self, path):
+        """Index of a path (normalized here), or -1"""
+        image_id = self.id_of(normalize_path(path))
+        return -1 if image_id is None else self.index_of_id(image_id)
+
+    def index(self, path):
+        """Index of a normalized path; raises ValueError like list.index"""
+        image_id = self.id_of(path)
+        if image_id is None:
+            raise ValueError(f"{path} is not in the dataset")
+        return self.index_of_id(image_id)
+
+    def ids(self):
+        """Image ids in display order"""
+        return self._order
+
+    def directory_ids(self):
+        """Directory id of every image id (index into `directories()`)"""
+        return self._dir_of
+
+    def directories(self):
+        """Directories that contain (or contained) listed images"""
+        return list(self._dirs)
+
+    def names_in(self, directory):
+        """File names currently listed in one directory"""
+        dir_id = self._dir_ids.get(directory)
+        if dir_id is None:
+            return set()
+        return {name for name, i in self._by_dir[dir_id].items() if i not in self._removed}
+
+    def ids_under(self, directory):
+        """Listed image ids inside directory or any of its sub directories"""
+        prefix = os.path.join(directory, "")
+        ids = []
+        for dir_id, path in enumerate(self._dirs):
+            if path == directory or path.startswith(prefix):
+                ids.extend(i for i in self._by_dir[dir_id].values() if i not in self._removed)
+        return ids
@@ -0,0 +1,323 @@
+"""
+Perceptual hashes and near-duplicate clusters (no Qt import in this process).
+
+Every image is decoded at 32x32 (JPEG is scaled while decoding) in a process pool and reduced to three
+64-bit hashes: aHash (8x8 mean), dHash (horizontal gradient) and pHash (8x8 low-frequency DCT).
+Hashes are cached by (path, mtime, size) in hashes.npz, so only new or edited images are decoded again.
+
+Clusters are found with multi-index hashing instead of comparing all pairs: the 64 bits are split into
+4 chunks of 16 bits and two hashes within d bits must agree on some chunk up to d // 4 bits, so only
+images sharing a (nearly) equal chunk are compared. Chunks are searched up to 2 bits, so the search is
+exact up to max_search_distance = 11 bits; larger distances are rejected rather than silently missing pairs.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from manifest import pack_strings, unpack_strings
+from static import dedup_decode_size, dedup_hash, dedup_max_distance, dedup_workers
+
+hash_kinds = ("ahash", "dhash", "phash")
+max_search_distance = 11  # 4 chunk 를 2 bit 까지 찾으면 빠짐없이 찾는 최대 거리 (4 * 3 - 1)
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    matrix = np.cos(np.pi * (2 * np.arange(n)[None, :] + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+_dct = _dct_matrix(dedup_decode_size)
+
+
+def _bits(mask):
+    """64 bools -> uint64 (first element is the highest bit)"""
+    return int.from_bytes(np.packbits(mask.ravel()).tobytes(), "big")
+
+
+def image_hashes(gray):
+    """(aHash, dHash, pHash) of a square gray image (dedup_decode_size, float)"""
+    size = gray.shape[0]
+    block = size // 8
+    small = gray.reshape(8, block, 8, block).mean(axis=(1, 3))
+    ahash = _bits(small > small.mean())
+    # 8 행 x 9 열로 줄인 뒤 이웃한 열끼리 비교
+    rows = gray.reshape(8, block, size).mean(axis=1)
+    bounds = np.linspace(0, size, 10).astype(int)
+    columns = np.add.reduceat(rows, bounds[:-1], axis=1) / np.diff(bounds)
+    dhash = _bits(columns[:, 1:] > columns[:, :-1])
+    low = (_dct @ gray @ _dct.T)[:8, :8]
+    phash = _bits(low > np.median(low.ravel()[1:]))
+    return ahash, dhash, phash
+
+
+def _decode_gray(path, size=dedup_decode_size):
+    """(size x size) float gray image decoded at that size, or None"""
+    from PyQt5.QtCore import QSize
+    from PyQt5.QtGui import QImage, QImageReader
+
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    reader.setScaledSize(QSize(size, size))
+    image = reader.read()
+    if image.isNull():
+        return None
+    image = image.convertToFormat(QImage.Format_Grayscale8)
+    bits = image.constBits()
+    bits.setsize(image.bytesPerLine() * size)
+    return np.frombuffer(bits, np.uint8).reshape(size, image.bytesPerLine())[:, :size].astype(np.float64)
+
+
+def _hash_chunk(paths):
+    """Process pool job: [(aHash, dHash, pHash) or None] for image paths"""
+    results = []
+    for path in paths:
+        try:
+            gray = _decode_gray(path)
+        except Exception:
+            gray = None
+        results.append(None if gray is None else image_hashes(gray))
+    return results
+
+
+class HashCache:
+    """hashes.npz: perceptual hashes of every image hashed so far, keyed by (path, mtime, size)"""
+
+    def __init__(self, path):
+        self.path = path
+        self._entries = None  # 경로 -> (mtime_ns, size, (aHash, dHash, pHash))
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with np.load(self.path) as data:
+                stats = data["stats"].tolist()
+                hashes = data["hashes"].astype(np.uint64).tolist()
+                self._entries = {path: (stat[0], stat[1], tuple(h)) for path, stat, h in
+                                 zip(unpack_strings(data["paths"]), stats, hashes)}
+        except (OSError, KeyError, ValueError):
+            pass
+
+    def get(self, path, stat):
+        self._load()
+        entry = self._entries.get(path)
+        if entry is None or (entry[0], entry[1]) != stat:
+            return None
+        return entry[2]
+
+    def put(self, path, stat, hashes):
+        self._load()
+        self._entries[path] = (stat[0], stat[1], hashes)
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+        paths = list(self._entries)
+        stats = np.array([entry[:2] for entry in self._entries.values()], np.int64).reshape(-1, 2)
+        hashes = np.array([entry[2] for entry in self._entries.values()], np.uint64).reshape(-1, 3)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, paths=pack_strings(paths), stats=stats, hashes=hashes)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def compute_hashes(paths, cache, workers=dedup_workers, cancel=None, progress=None, chunk_size=64):
+    """
+    (n x 3) uint64 array of (aHash, dHash, pHash) and a bool array of the images that could be hashed.
+    Cached hashes are reused; the rest are decoded on a process pool and added to the cache.
+    `progress(done, total)` is called as chunks finish; set the `cancel` threading.Event to stop early.
+    """
+    hashes = np.zeros((len(paths), 3), np.uint64)
+    valid = np.zeros(len(paths), bool)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        stats = list(executor.map(_stat, paths, chunksize=256))
+    todo = []
+    for row, (path, stat) in enumerate(zip(paths, stats)):
+        cached = cache.get(path, stat) if stat is not None else None
+        if cached is not None:
+            hashes[row] = cached
+            valid[row] = True
+        elif stat is not None:
+            todo.append(row)
+    done = len(paths) - len(todo)
+    if progress is not None:
+        progress(done, len(paths))
+    if not todo:
+        return hashes, valid
+
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    # Qt 를 쓰는 프로세스에서 fork 하지 않도록 spawn 으로 시작
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [executor.submit(_hash_chunk, [paths[row] for row in chunk]) for chunk in chunks]
+        for chunk, future in zip(chunks, futures):
+            if cancel is not None and cancel.is_set():
+                for f in futures:
+                    f.cancel()
+                break
+            for row, result in zip(chunk, future.result()):
+                if result is not None:
+                    hashes[row] = result
+                    valid[row] = True
+                    cache.put(paths[row], stats[row], result)
+            done += len(chunk)
+            if progress is not None:
+                progress(done, len(paths))
+    return hashes, valid
+
+
+def popcount(values):
+    """Number of set bits of every uint64"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+    table = np.array([bin(i).count("1") for i in range(256)], np.uint8)
+    return table[values.view(np.uint8).reshape(-1, 8)].sum(axis=1)
+
+
+def _blocks(counts, limit):
+    """Split query rows into ranges whose candidate counts add up to about `limit`"""
+    cumulative = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        base = cumulative[start - 1] if start else 0
+        stop = max(start + 1, int(np.searchsorted(cumulative, base + limit, side="right")))
+        yield start, stop
+        start = stop
+
+
+def near_pairs(hashes, max_distance, limit=1 << 22):
+    """
+    (i, j) index arrays (i < j) of the distinct 64-bit hashes within max_distance bits (multi-index hashing).
+    Raises ValueError above max_search_distance.
+    """
+    if max_distance > max_search_distance:
+        raise ValueError(f"near-duplicate search is exact up to {max_search_distance} bits, not {max_distance}")
+    hashes = np.asarray(hashes, np.uint64)
+    radius = max_distance // 4
+    flips = [0] + [1 << b for b in range(16)] * (radius >= 1) + \
+        [(1 << a) | (1 << b) for a in range(16) for b in range(a + 1, 16)] * (radius >= 2)
+    found = []
+    for chunk in range(4):
+        keys = ((hashes >> np.uint64(16 * chunk)) & np.uint64(0xffff)).astype(np.int64)
+        order = np.argsort(keys, kind="stable")
+        # chunk 값 (16 bit) 마다 정렬된 배열에서의 시작 위치와 개수 (binary search 대신 직접 조회)
+        bucket_size = np.bincount(keys, minlength=1 << 16)
+        bucket_start = np.cumsum(bucket_size) - bucket_size
+        for flip in flips:
+            query = keys ^ flip
+            lo = bucket_start[query]
+            counts = bucket_size[query]
+            # 같은 chunk 를 가진 이미지가 많아도 메모리가 넘치지 않도록 나눠서 비교
+            for start, stop in _blocks(counts, limit):
+                block = counts[start:stop]
+                total = int(block.sum())
+                if not total:
+                    continue
+                i = np.repeat(np.arange(start, stop), block)
+                offsets = np.arange(total) - np.repeat(np.cumsum(block) - block, block)
+                j = order[np.repeat(lo[start:stop], block) + offsets]
+                keep = i < j
+                i, j = i[keep], j[keep]
+                close = popcount(hashes[i] ^ hashes[j]) <= max_distance
+                found.append(i[close] * len(hashes) + j[close])
+    if not found:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64)
+    # 여러 chunk 에서 같은 쌍이 나올 수 있으므로 한 번만
+    pairs = np.unique(np.concatenate(found))
+    return pairs // len(hashes), pairs % len(hashes)
+
+
+def components(n, i, j):
+    """Connected component label (smallest member) of n nodes joined by the edges (i, j)"""
+    labels = np.arange(n)
+    while len(i):
+        low = np.minimum(labels[i], labels[j])
+        np.minimum.at(labels, i, low)
+        np.minimum.at(labels, j, low)
+        labels = labels[labels]
+        if (labels[i] == labels[j]).all():
+            break
+    return labels
+
+
+class DuplicateReport:
+    """
+    Result of `find_duplicates`: images in clusters of near-duplicates, largest cluster first.
+    ids / cluster / distance are parallel arrays; inside a cluster images keep the order they were given
+    in (display order), and the first one is the frame to keep. distance is the number of differing hash
+    bits to that first image.
+    """
+
+    def __init__(self, ids, cluster, distance, hashed, failed, kind, max_distance):
+        self.ids = ids
+        self.cluster = cluster
+        self.distance = distance
+        self.hashed = hashed
+        self.failed = failed
+        self.kind = kind
+        self.max_distance = max_distance
+
+    def __len__(self):
+        return len(self.ids)
+
+    def keep(self):
+        """bool per row: first image of its cluster"""
+        first = np.ones(len(self.ids), bool)
+        first[1:] = self.cluster[1:] != self.cluster[:-1]
+        return first
+
+    def redundant(self):
+        """Image ids of all but the first image of every cluster"""
+        return self.ids[~self.keep()]
+
+    def redundant_mask(self, capacity):
+        """bool array indexed by image id (at least `capacity` long), True for redundant images"""
+        redundant = self.redundant()
+        mask = np.zeros(max(capacity, int(redundant.max()) + 1 if len(redundant) else 0), bool)
+        mask[redundant] = True
+        return mask
+
+    def summary(self):
+        clusters = int(self.cluster[-1]) + 1 if len(self) else 0
+        return (f"{self.hashed} images hashed ({self.failed} unreadable), {clusters} clusters of near-duplicates "
+                f"({self.kind} within {self.max_distance} bits), {len(self.redundant())} redundant images")
+
+
+def find_duplicates(ids, hashes, valid, max_distance=dedup_max_distance, kind=dedup_hash):
+    """Cluster images whose `kind` hash differs in at most max_distance bits; ids in display order"""
+    ids = np.asarray(ids)
+    rows = np.flatnonzero(valid)
+    values = hashes[rows, hash_kinds.index(kind)]
+    # 완전히 같은 hash 는 먼저 하나로 묶어서 비교 횟수를 줄임
+    unique, inverse = np.unique(values, return_inverse=True)
+    i, j = near_pairs(unique, max_distance)
+    labels = components(len(unique), i, j)[inverse]
+
+    sizes = np.bincount(labels, minlength=len(unique))
+    first_row = np.full(len(unique), len(labels))
+    np.minimum.at(first_row, labels, np.arange(len(labels)))
+    member = np.flatnonzero(sizes[labels] > 1)
+    # 큰 cluster 먼저, 같은 크기면 첫 이미지가 먼저 나오는 순서로; cluster 안에서는 주어진 순서
+    member = member[np.lexsort((member, first_row[labels[member]], -sizes[labels[member]]))]
+    first = np.ones(len(member), bool)
+    first[1:] = labels[member][1:] != labels[member][:-1]
+    cluster = np.cumsum(first) - 1
+    leaders = values[member[first]][cluster]
+    distance = popcount(values[member] ^ leaders)
+    return DuplicateReport(ids[rows[member]], cluster, distance, len(rows), len(ids) - len(rows), kind, max_distance)
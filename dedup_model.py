@@ -0,0 +1,52 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QFont
+
+
+class DuplicateReportModel(QAbstractTableModel):
+    """Rows of a dedup.DuplicateReport (cluster by cluster); the kept frame of each cluster is bold"""
+    headers = ("cluster", "bits", "path")
+
+    def __init__(self, viewer, parent=None):
+        super().__init__(parent)
+        self.viewer = viewer
+        self.report = None
+        self.keep = None
+        self._bold = QFont()
+        self._bold.setBold(True)
+
+    def set_report(self, report):
+        self.beginResetModel()
+        self.report = report
+        self.keep = report.keep() if report is not None else None
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.report is None:
+            return 0
+        return len(self.report)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        image_id = int(self.report.ids[row])
+        if role == Qt.UserRole:
+            return image_id
+        if role == Qt.FontRole:
+            return self._bold if self.keep[row] else None
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        column = index.column()
+        if column == 0:
+            return str(int(self.report.cluster[row]) + 1)
+        if column == 1:
+            return "keep" if self.keep[row] else str(int(self.report.distance[row]))
+        return self.viewer.dataset.path_of_id(image_id)
@@ -0,0 +1,209 @@
+"""
+Export of a set of dataset images into an output tree (no Qt import):
+
+    OUTPUT/images/<path relative to the dataset root>
+    OUTPUT/labels/<same>.txt               (optional, LandmarkStore.export_txt)
+    OUTPUT/train.txt, val.txt, test.txt    (optional, one "images/..." path per line)
+    OUTPUT/export.json                     (how the tree was made)
+
+Files are hard-linked, reflinked (FICLONE, then copy_file_range) or copied on a thread pool, so
+an export on the same file system costs almost no disk space (a hard-linked file *is* the dataset
+file: edit it in place only after a copy / reflink export). The split of an image depends only on
+its relative path and the seed, so re-exporting a grown dataset keeps every image in its split.
+"""
+import errno
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from static import export_seed, export_workers
+
+export_modes = ("auto", "hardlink", "reflink", "copy")
+split_names = ("train", "val", "test")
+
+FICLONE = 0x40049409  # linux/fs.h, _IOW(0x94, 9, int)
+# 링크 / reflink 를 지원하지 않는 경우의 errno (이때만 다음 방법으로 넘어감)
+_unsupported = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.ENOSYS,
+                errno.EMLINK}
+
+
+def parse_splits(text):
+    """"0.8,0.1,0.1" (or "80/10/10") -> normalized (train, val, test) ratios; raises ValueError"""
+    parts = [float(part) for part in text.replace("/", ",").split(",") if part.strip()]
+    if not 1 <= len(parts) <= len(split_names) or any(part < 0 for part in parts) or not sum(parts):
+        raise ValueError(f"invalid split ratios: {text!r}")
+    parts += [0.0] * (len(split_names) - len(parts))
+    return tuple(part / sum(parts) for part in parts)
+
+
+def split_of(relative, ratios, seed=export_seed):
+    """Split number of a relative image path: a seeded hash of the path mapped onto the cumulative ratios"""
+    digest = hashlib.blake2b(relative.replace(os.sep, "/").encode("utf-8"), digest_size=8,
+                             salt=str(seed).encode("utf-8")[:16]).digest()
+    value = int.from_bytes(digest, "big") / 2 ** 64
+    total = 0.0
+    for number, ratio in enumerate(ratios):
+        total += ratio
+        if value < total:
+            return number
+    return len(ratios) - 1
+
+
+def reflink(source, target):
+    """Clone source into target sharing its blocks (btrfs, xfs, ...); falls back to an in-kernel copy_file_range"""
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        try:
+            import fcntl
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except (ImportError, OSError) as e:
+            if isinstance(e, OSError) and e.errno not in _unsupported:
+                raise
+        if not hasattr(os, "copy_file_range"):
+            raise OSError(errno.EOPNOTSUPP, "copy_file_range is not available")
+        # copy_file_range 는 파일 시스템이 지원하면 블록을 공유하고, 아니면 커널 안에서 복사
+        size = os.fstat(src.fileno()).st_size
+        offset = 0
+        while offset < size:
+            copied = os.copy_file_range(src.fileno(), dst.fileno(), size - offset, offset, offset)
+            if copied == 0:
+                break
+            offset += copied
+    return "copy_file_range"
+
+
+class Exporter:
+    """
+    Materialize images under output/images with one of export_modes.
+    "auto" tries a hard link, then a reflink, then a plain copy, and stops trying a method for the
+    whole export once the file system has rejected it.
+    """
+
+    def __init__(self, dataset_root, output, mode="auto", workers=export_workers):
+        if mode not in export_modes:
+            raise ValueError(f"unknown export mode: {mode!r}")
+        self.dataset_root = dataset_root
+        self._prefix = os.path.join(dataset_root, "")
+        self.output = output
+        self.image_root = os.path.join(output, "images")
+        self.mode = mode
+        self.workers = workers
+        self._methods = ("hardlink", "reflink", "copy") if mode == "auto" else (mode,)
+        self._failed = set()  # 이 파일 시스템에서 지원하지 않는 방법 (모든 스레드가 공유)
+
+    def relative(self, path):
+        # 데이터셋 경로는 모두 root 아래의 정규화된 경로이므로 relpath 대신 앞부분만 잘라냄
+        return path[len(self._prefix):] if path.startswith(self._prefix) else os.path.relpath(path, self.dataset_root)
+
+    def target_of(self, path):
+        return os.path.join(self.image_root, self.relative(path))
+
+    def _place(self, source, target):
+        """Write one file (through a .part file, replacing an older export); returns the method used"""
+        part = target + ".part"
+        for method in self._methods:
+            if method in self._failed:
+                continue
+            try:
+                try:
+                    used = self._write(method, source, part)
+                except FileExistsError:
+                    # 중단된 이전 내보내기의 .part 파일
+                    os.remove(part)
+                    used = self._write(method, source, part)
+                os.replace(part, target)
+                if os.path.lexists(part):
+                    # target 이 이미 같은 inode 의 hard link 이면 rename 이 아무것도 하지 않음
+                    os.remove(part)
+                return used
+            except OSError as e:
+                if method == "copy" or e.errno not in _unsupported or self.mode != "auto":
+                    raise
+                # 이 파일 시스템에서는 안 되는 방법이므로 이후 파일에서는 건너뜀
+                self._failed.add(method)
+        raise OSError(errno.EOPNOTSUPP, "no export method left")
+
+    @staticmethod
+    def _write(method, source, part):
+        if method == "hardlink":
+            os.link(source, part)
+            return method
+        if method == "reflink":
+            return reflink(source, part)
+        shutil.copy2(source, part)
+        return method
+
+    def export(self, paths, cancel=None, progress=None, chunk_size=256):
+        """
+        Place every image path on the pool. `progress(done, total)` is called after each chunk.
+        Returns ({method: count}, [(path, error)]).
+        """
+        targets = [self.target_of(path) for path in paths]
+        for directory in sorted({os.path.dirname(target) for target in targets}):
+            os.makedirs(directory, exist_ok=True)
+
+        def place_chunk(pairs):
+            methods, errors = {}, []
+            for source, target in pairs:
+                if cancel is not None and cancel.is_set():
+                    break
+                try:
+                    method = self._place(source, target)
+                    methods[method] = methods.get(method, 0) + 1
+                except OSError as e:
+                    errors.append((source, str(e)))
+            return methods, errors, len(pairs)
+
+        pairs = list(zip(paths, targets))
+        counts, errors, done = {}, [], 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for methods, chunk_errors, size in executor.map(
+                    place_chunk, [pairs[i:i + chunk_size] for i in range(0, len(pairs), chunk_size)]):
+                for method, count in methods.items():
+                    counts[method] = counts.get(method, 0) + count
+                errors.extend(chunk_errors)
+                done += size
+                if progress is not None:
+                    progress(done, len(pairs))
+        return counts, errors
+
+    def write_splits(self, paths, ratios, seed=export_seed):
+        """Write train.txt / val.txt / test.txt (paths relative to output, sorted); returns the count per split"""
+        splits = [[] for _ in ratios]
+        for path in paths:
+            relative = self.relative(path).replace(os.sep, "/")
+            splits[split_of(relative, ratios, seed)].append("images/" + relative)
+        for name, lines in zip(split_names, splits):
+            with open(os.path.join(self.output, f"{name}.txt"), "w", encoding="utf-8") as f:
+                f.writelines(line + "\n" for line in sorted(lines))
+        return [len(lines) for lines in splits]
+
+    def write_info(self, **info):
+        with open(os.path.join(self.output, "export.json"), "w", encoding="utf-8") as f:
+            json.dump({"dataset_root": self.dataset_root, "mode": self.mode, **info}, f, indent=1, ensure_ascii=False)
+
+
+def export_dataset(paths, dataset_root, output, mode="auto", ratios=None, seed=export_seed, labels=None,
+                   workers=export_workers, cancel=None, progress=None):
+    """
+    Export image paths (and optionally their landmarks: labels = (LandmarkStore, DatasetIndex)) to output.
+    Returns a summary dict: {"images", "methods", "errors", "labels", "splits"}.
+    """
+    exporter = Exporter(dataset_root, output, mode, workers)
+    methods, errors = exporter.export(paths, cancel, progress)
+    summary = {"images": sum(methods.values()), "methods": methods, "errors": errors, "labels": 0, "splits": None}
+    if cancel is not None and cancel.is_set():
+        return summary
+    placed = set(paths) - {path for path, _ in errors}
+    placed = [path for path in paths if path in placed]
+    if labels is not None:
+        store, dataset = labels
+        ids = [image_id for image_id in map(dataset.id_of, placed) if image_id is not None and store.get(image_id)]
+        summary["labels"] = store.export_txt(os.path.join(output, "labels"), dataset, dataset_root, ids)
+    if ratios is not None:
+        summary["splits"] = dict(zip(split_names, exporter.write_splits(placed, ratios, seed)))
+    exporter.write_info(images=summary["images"], methods=methods, labels=summary["labels"],
+                        ratios=ratios, seed=seed, splits=summary["splits"])
+    return summary
@@ -0,0 +1,70 @@
+from PyQt5.QtWidgets import (
+    QDialog, QFormLayout, QHBoxLayout, QLineEdit, QPushButton, QComboBox, QCheckBox, QDialogButtonBox,
+    QFileDialog, QMessageBox
+)
+
+from export import export_modes, parse_splits
+from static import export_mode, export_splits
+
+
+class ExportDialog(QDialog):
+    """Options of "export checked images": output folder, link / copy mode, split ratios, landmarks"""
+
+    def __init__(self, start_folder="", has_labels=False, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Export checked images")
+        self.start_folder = start_folder
+        self.ratios = None
+
+        self.output_edit = QLineEdit()
+        browse_button = QPushButton("...")
+        browse_button.clicked.connect(self.browse)
+        output_row = QHBoxLayout()
+        output_row.addWidget(self.output_edit)
+        output_row.addWidget(browse_button)
+
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(export_modes)
+        self.mode_combo.setCurrentText(export_mode)
+        self.mode_combo.setToolTip("auto: hard link, then reflink, then copy (whichever the file system supports)")
+
+        # 비워 두면 split 목록을 만들지 않음
+        self.split_edit = QLineEdit(",".join(f"{ratio:g}" for ratio in export_splits))
+        self.split_edit.setPlaceholderText("train,val,test (empty: no split lists)")
+
+        self.labels_check = QCheckBox("write landmark .txt files")
+        self.labels_check.setChecked(has_labels)
+        self.labels_check.setEnabled(has_labels)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QFormLayout(self)
+        layout.addRow("output folder", output_row)
+        layout.addRow("mode", self.mode_combo)
+        layout.addRow("split", self.split_edit)
+        layout.addRow("", self.labels_check)
+        layout.addRow(buttons)
+
+    def browse(self):
+        folder = QFileDialog.getExistingDirectory(self, "select output folder", self.output_edit.text() or self.start_folder)
+        if folder:
+            self.output_edit.setText(folder)
+
+    def accept(self):
+        if not self.output_edit.text().strip():
+            QMessageBox.warning(self, "Export", "Select an output folder.")
+            return
+        try:
+            text = self.split_edit.text().strip()
+            self.ratios = parse_splits(text) if text else None
+        except ValueError as e:
+            QMessageBox.warning(self, "Export", str(e))
+            return
+        super().accept()
+
+    def options(self):
+        """(output folder, mode, split ratios or None, write landmarks)"""
+        return (self.output_edit.text().strip(), self.mode_combo.currentText(), self.ratios,
+                self.labels_check.isChecked())
@@ -0,0 +1,256 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QPoint, QRect, QSize, QTimer, QEvent
+from PyQt5.QtGui import QPixmap, QColor
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QStyle, QStyleOptionButton, QApplication, QAbstractItemView
+
+from thumbnail import ThumbnailLoader
+from static import thumbnail_size
+
+
+class ThumbnailModel(QAbstractListModel):
+    """
+    List model over the viewer's dataset index, or over a sorted subset of its indexes (`set_rows`).
+    Thumbnails are only decoded for the row range the view asks for (see `request_rows`).
+    """
+    pixmap_cache_limit = 1024
+
+    def __init__(self, viewer, parent=None):
+        super().__init__(parent)
+        self.viewer = viewer
+        self.loader = ThumbnailLoader(self)
+        self.loader.loaded.connect(self.on_thumbnail_loaded)
+        self._pixmaps = OrderedDict()  # 경로 -> 썸네일 QPixmap (최근 사용 순)
+        self._in_flight = {}  # 로더에 넘겨진 경로 -> row
+        self._anchor = None  # shift-click 범위 선택의 시작 row
+        self.rows = None  # 보여줄 dataset index (오름차순 numpy 배열), None 이면 전체
+
+    def reset(self):
+        """Call when the viewer's dataset has been replaced or re-sorted"""
+        self.beginResetModel()
+        self.loader.cancel()
+        self._pixmaps.clear()
+        self._in_flight.clear()
+        self._anchor = None
+        self.endResetModel()
+
+    def set_rows(self, rows):
+        """Show only the given dataset indexes (sorted), or every image with None"""
+        self.rows = rows
+        self.reset()
+
+    def position(self, row):
+        """Dataset index shown in a row"""
+        return row if self.rows is None else int(self.rows[row])
+
+    def row_of(self, position):
+        """Row showing a dataset index, or the nearest row after it when it is filtered out"""
+        if self.rows is None:
+            return position
+        return min(int(np.searchsorted(self.rows, position)), len(self.rows) - 1)
+
+    def ids(self, first, last):
+        """Image ids of rows first..last"""
+        dataset = self.viewer.dataset
+        if self.rows is None:
+            return dataset.ids()[first:last + 1]
+        return [dataset.id_at(i) for i in self.rows[first:last + 1].tolist()]
+
+    def append_rows(self, paths):
+        """Extend the viewer's dataset (e.g. with a scan batch) and announce the new rows"""
+        if not paths:
+            return
+        if self.rows is not None:
+            # 필터로 보이는 행은 그대로 두고 목록만 늘림
+            self.viewer.dataset.extend(paths)
+            return
+        first = len(self.viewer.dataset)
+        self.beginInsertRows(QModelIndex(), first, first + len(paths) - 1)
+        self.viewer.dataset.extend(paths)
+        self.endInsertRows()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.viewer.dataset) if self.rows is None else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        position = self.position(index.row())
+        path = self.viewer.dataset[position]
+        if role == Qt.DisplayRole:
+            return os.path.basename(path)
+        if role == Qt.ToolTipRole:
+            return path
+        if role == Qt.DecorationRole:
+            pixmap = self._pixmaps.get(path)
+            if pixmap is not None:
+                self._pixmaps.move_to_end(path)
+            return pixmap
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.viewer.dataset.id_at(position) in self.viewer.checked else Qt.Unchecked
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        self.viewer.set_checked([self.viewer.dataset.id_at(self.position(index.row()))], value == Qt.Checked)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        return True
+
+    def toggle_check(self, row, extend=False):
+        """
+        Toggle a row's check box.
+        With extend (shift-click) the new state is applied to every row between the previous toggle and this one.
+        """
+        state = self.viewer.dataset.id_at(self.position(row)) not in self.viewer.checked
+        first, last = (row, row) if not extend or self._anchor is None else sorted((self._anchor, row))
+        self.viewer.set_checked(self.ids(first, last), state)
+        self._anchor = row
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+
+    def request_rows(self, first, last):
+        """Decode thumbnails for rows first..last; anything requested earlier is cancelled"""
+        dataset = self.viewer.dataset
+        last = min(last, self.rowCount() - 1)
+        if self.rows is None:
+            paths = dataset[first:last + 1]
+        else:
+            paths = [dataset[i] for i in self.rows[first:last + 1].tolist()]
+        self._in_flight = {path: row for row, path in enumerate(paths, first) if path not in self._pixmaps}
+        self.loader.request(list(self._in_flight))
+
+    def on_thumbnail_loaded(self, generation, path, image):
+        row = self._in_flight.pop(path, None)
+        if row is None or image.isNull():
+            return
+        self._pixmaps[path] = QPixmap.fromImage(image)
+        while len(self._pixmaps) > self.pixmap_cache_limit:
+            self._pixmaps.popitem(last=False)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+
+class ThumbnailDelegate(QStyledItemDelegate):
+    """Paint a thumbnail cell (image + check box in the top-right corner) without creating widgets"""
+    margin = 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.thumb_size = QSize(*thumbnail_size)
+
+    def sizeHint(self, option, index):
+        return self.thumb_size + QSize(self.margin * 2, self.margin * 2)
+
+    def check_rect(self, option):
+        style = option.widget.style() if option.widget else QApplication.style()
+        indicator = style.subElementRect(QStyle.SE_CheckBoxIndicator, QStyleOptionButton(), option.widget)
+        cell = option.rect.adjusted(self.margin, self.margin, -self.margin, -self.margin)
+        return QRect(cell.right() - indicator.width() - 2, cell.top() + 2, indicator.width(), indicator.height())
+
+    def paint(self, painter, option, index):
+        painter.save()
+        cell = option.rect.adjusted(self.margin, self.margin, -self.margin, -self.margin)
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is None:
+            # 썸네일이 도착하기 전까지 placeholder
+            painter.fillRect(cell, QColor("#e0e0e0"))
+        else:
+            x = cell.x() + (cell.width() - pixmap.width()) // 2
+            y = cell.y() + (cell.height() - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+
+        # 체크박스 (흰 배경 위에)
+        check = QStyleOptionButton()
+        check.rect = self.check_rect(option)
+        check.state = QStyle.State_Enabled
+        check.state |= QStyle.State_On if index.data(Qt.CheckStateRole) == Qt.Checked else QStyle.State_Off
+        painter.fillRect(check.rect, Qt.white)
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_IndicatorCheckBox, check, painter, option.widget)
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton \
+                and self.check_rect(option).contains(event.pos()):
+            model.toggle_check(index.row(), bool(event.modifiers() & Qt.ShiftModifier))
+            return True
+        return super().editorEvent(event, model, option, index)
+
+
+class ThumbnailGridView(QListView):
+    """Icon-mode list view for grid mode; only visible rows are painted and decoded"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(1000)
+        self.setSpacing(0)
+        self.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setItemDelegate(ThumbnailDelegate(self))
+
+        # 스크롤이 멈춘 뒤 보이는 영역만 썸네일 요청
+        self._request_timer = QTimer(self)
+        self._request_timer.setSingleShot(True)
+        self._request_timer.setInterval(30)
+        self._request_timer.timeout.connect(self.request_visible)
+        self.verticalScrollBar().valueChanged.connect(self._request_timer.start)
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.modelReset.connect(self._request_timer.start)
+        self._request_timer.start()
+
+    def request_visible(self):
+        visible = self.visible_range()
+        if visible is not None and hasattr(self.model(), "request_rows"):
+            first, last = visible
+            # 다음 한 화면 분량도 미리 요청
+            self.model().request_rows(first, last + (last - first + 1))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._request_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._request_timer.start()
+
+    def visible_range(self):
+        """(first, last) visible rows, or None if nothing is shown"""
+        count = self.model().rowCount() if self.model() is not None else 0
+        if count == 0:
+            return None
+        cell = self.itemDelegate().sizeHint(None, QModelIndex())
+        first = self.indexAt(QPoint(cell.width() // 2, cell.height() // 2))
+        first_row = first.row() if first.isValid() else 0
+        columns = max(1, self.viewport().width() // max(1, cell.width()))
+        lines = -(-self.viewport().height() // max(1, cell.height()))
+        return first_row, min(count - 1, first_row + columns * lines - 1)
+
+    def scroll_to_row(self, row):
+        if self.model() is None or not 0 <= row < self.model().rowCount():
+            return
+        index = self.model().index(row)
+        self.setCurrentIndex(index)
+        self.scrollTo(index, QAbstractItemView.PositionAtTop)
+
+    def scroll_page(self, direction):
+        """Scroll one viewport height up (-1) or down (+1)"""
+        bar = self.verticalScrollBar()
+        bar.setValue(bar.value() + direction * bar.pageStep())
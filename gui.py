@@ -1,14 +1,38 @@
 # gui.py
 import os
+import time
+from pathlib import Path
+import numpy as np
 from PyQt5.QtWidgets import (
-    QMainWindow, QAction, QFileDialog, QLabel, QTreeView, QListWidget,
-    QFileSystemModel, QWidget, QHBoxLayout, QVBoxLayout, QMessageBox,
-    QSizePolicy, QSplitter, QPushButton, QScrollArea, QGridLayout, QCheckBox, QListWidgetItem,
-    QMenu, QShortcut
+    QMainWindow, QAction, QFileDialog, QLabel, QTreeView, QListView, QAbstractItemView,
+    QWidget, QHBoxLayout, QVBoxLayout, QMessageBox,
+    QSizePolicy, QSplitter, QPushButton, QCheckBox,
+    QMenu, QShortcut, QProgressDialog, QInputDialog, QDockWidget, QTableView, QHeaderView
 )
 from PyQt5.QtGui import QPixmap, QKeySequence
-from PyQt5.QtCore import Qt, QDir
-from utils import find_all_images, normalize_path, ClickableLabel, ClickableLabelBeta, read_labels
+from PyQt5.QtCore import Qt, QTimer
+from core import normalize_path, match_renames
+from utils import ClickableLabel
+from grid_view import ThumbnailModel, ThumbnailGridView
+from image_cache import DecodedImageCache
+from image_view import ZoomableImageView
+from dataset import DatasetIndex
+from landmarks import LandmarkStore
+from journal import AnnotationJournal, session_folder
+from manifest import ScanManifest, last_folder, remember_folder
+from selection import Selection, read_check_list, write_check_list
+from selection_model import CheckedListModel
+from tree_model import DatasetTreeModel
+from query import QueryIndex
+from qa_model import LandmarkReportModel
+from dedup import max_search_distance
+from dedup_model import DuplicateReportModel
+from compare_model import LabelComparisonModel
+from workers import ScanWorker, LabelImportWorker, LandmarkQAWorker, CompareWorker, DuplicateWorker, ExportWorker
+from export_dialog import ExportDialog
+from workqueue import WorkQueue, create_queue
+from watcher import DatasetWatcher
+from profiler import profiler, traced
 from static import *
 
 class ImageViewer(QMainWindow):
@@ -18,23 +42,72 @@ class ImageViewer(QMainWindow):
         self.setWindowTitle("이미지 뷰어")
         self.setGeometry(100, 100, 800, 600)
         self.dataset_folder = ""
-        self.image_list = []  # 현재 폴더 내 모든 이미지 경로 목록
-
-        # 현재 선택된 이미지 인덱스 (단일 모드)
+        self.dataset_root = ""  # 스캔에 사용된 (resolve 된) 정규화 경로
+        self.dataset = DatasetIndex()  # 현재 폴더 내 모든 이미지 경로 목록 (경로 <-> 인덱스/id)
+        self.scan_worker = None  # 진행 중인 폴더 스캔
+        self.label_import_worker = None  # 진행 중인 랜드마크 불러오기
+        self.qa_worker = None  # 진행 중인 랜드마크 검사
+        self.dedup_worker = None  # 진행 중인 중복 이미지 찾기
+        self.compare_worker = None  # 진행 중인 라벨 세트 비교
+        self.comparison = None  # 비교 중인 (A, B) LandmarkStore, 단일 모드에 함께 그림
+        self.redundant = None  # image id -> 중복 이미지 여부 (bool array, 찾기 전이면 None)
+        self.export_worker = None  # 진행 중인 체크 이미지 내보내기
+        self.work_queue = None  # 참여 중인 작업 큐 (workqueue.WorkQueue)
+        self.shard = None  # 작업 큐에서 lease 한 shard 번호
+        self.shard_ids = []  # 그 shard 의 image id
+        self.shard_mask = None  # image id -> shard 포함 여부 (bool array, shard 가 없으면 None)
+        self.watcher = None  # 스캔이 끝난 데이터셋 폴더의 변경 감지
+        self.scan_mtimes = None  # 끝까지 스캔한 폴더 -> mtime (manifest 저장용, 스캔이 완료되지 않았으면 None)
+
+        # 현재 선택된 이미지 인덱스 (단일 모드, 그리드 모드에서는 현재 선택된 썸네일)
         self.current_index = 0
-        # 현재 페이지 (그리드 모드, 한 페이지에 최대 64개)
-        self.current_page = 0
         # 모드: False - 단일 이미지 모드, True - 그리드 모드
         self.grid_mode = False
 
         self.pixmap = None
 
-        self.checked = []
-        self.landmark = {}
+        self.checked = Selection()  # 체크된 image id (순서 유지)
+        self.landmark = LandmarkStore()  # image id 로 인덱싱되는 (N x 7 x 2) 배열
+        # 랜드마크 편집 저널 (자동 저장 / 복구 / undo, redo)
+        self.journal = None
+        self.session_restored = False
+        # 다음/이전 일치 이미지 조건 (필터 모드에서는 일치하는 이미지만 이동/표시)
+        self.query = QueryIndex(self, default_query)
+        self.filter_mode = False
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.timeout.connect(self.autosave)
+        self.autosave_timer.start(autosave_interval_ms)
+        # 작업 중인 shard 의 라벨 저장 + lease 갱신 (만료 시간의 1/3 마다)
+        self.lease_timer = QTimer(self)
+        self.lease_timer.timeout.connect(self.renew_shard)
+
+        # 단일 모드 이미지 tile 캐시 (보이는 영역만 디코딩, 이동 방향으로 미리 디코딩)
+        self.image_cache = DecodedImageCache(self)
+        self.nav_direction = 1
+        self.grid_top = None  # manifest 에서 읽은 그리드 맨 위 이미지 (상대 경로)
+
+        # 키 반복 입력은 한 프레임에 한 번만 그리고 (중간 이미지는 미리보기), 입력이 멈추면 원래 화질로 그림
+        self.last_nav_time = 0.0
+        self.nav_preview = False  # 미리보기로 그려진 상태
+        self.nav_frame_timer = QTimer(self)
+        self.nav_frame_timer.setSingleShot(True)
+        self.nav_frame_timer.setInterval(nav_frame_ms)
+        self.nav_frame_timer.timeout.connect(lambda: self.show_current_image(preview=True))
+        self.nav_settle_timer = QTimer(self)
+        self.nav_settle_timer.setSingleShot(True)
+        self.nav_settle_timer.setInterval(nav_settle_ms)
+        self.nav_settle_timer.timeout.connect(self.on_navigation_settled)
 
         self._init_ui()
         self._init_shortcut()
 
+        # 성능 측정 HUD (profile 메뉴 또는 EASYBASE_PROFILE 로 켰을 때만 갱신)
+        self.profile_label = QLabel()
+        self.statusBar().addPermanentWidget(self.profile_label)
+        self.profile_timer = QTimer(self)
+        self.profile_timer.timeout.connect(self.update_profile_hud)
+        self.enable_profiling(profiler.enabled)
+
     def _init_ui(self):
         # 중앙 위젯 및 메인 레이아웃 (QSplitter 사용)
         self.central_widget = QWidget()
@@ -55,31 +128,53 @@ class ImageViewer(QMainWindow):
         self.tree_view.hide()  # 폴더 불러오기 전에는 숨김
         self.tree_view.setHeaderHidden(True)
 
-        # 0번 컬럼(파일명)만 보이도록 나머지 컬럼 숨김
-        for i in range(1, 4):
-            self.tree_view.setColumnHidden(i, True)
-        self.model = QFileSystemModel()
-        # 디렉토리, 파일, 숨김 파일 모두 표시; 파일 이름 필터는 파일에만 적용 (디렉토리는 항상 보임)
-        self.model.setFilter(QDir.Dirs | QDir.NoDotAndDotDot | QDir.Files | QDir.Hidden)
-        self.model.setNameFilters(["*.png", "*.jpg", "*.jpeg", "*.bmp", "*.gif"])
-        self.model.setNameFilterDisables(True)
-        self.tree_view.setModel(self.model)
+        # 스캔한 데이터셋 인덱스로 만든 폴더 트리 (파일 시스템을 다시 읽지 않음, 펼칠 때 파일 추가)
+        self.tree_model = DatasetTreeModel(self)
+        self.tree_view.setModel(self.tree_model)
+        self.tree_view.setUniformRowHeights(True)
         self.tree_view.clicked.connect(self.display_selected_image)
         self.tree_view.setMinimumWidth(200)
         self.tree_view.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Expanding)
         # self.splitter.addWidget(self.tree_view)
         self.left_layout.addWidget(self.tree_view)
 
-        # 왼쪽 하단: check 된 이미지 표시 영역
-        self.checked_list_widget = QListWidget()
-        self.checked_list_widget.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.checked_list_widget.customContextMenuRequested.connect(self.show_checked_list_menu)
-        self.checked_list_widget.itemDoubleClicked.connect(self.select_image)
-        self.left_layout.addWidget(self.checked_list_widget)
+        # 왼쪽 하단: check 된 이미지 표시 영역 (Selection 을 보여주는 모델 기반 리스트)
+        self.checked_model = CheckedListModel(self)
+        self.checked_list_view = QListView()
+        self.checked_list_view.setModel(self.checked_model)
+        self.checked_list_view.setUniformItemSizes(True)
+        self.checked_list_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.checked_list_view.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.checked_list_view.customContextMenuRequested.connect(self.show_checked_list_menu)
+        self.checked_list_view.doubleClicked.connect(self.select_image)
+        self.left_layout.addWidget(self.checked_list_view)
 
         # QSplitter에 왼쪽 패널 추가 (트리 뷰 + 체크 리스트 포함)
         self.splitter.addWidget(self.left_widget)
 
+        # 랜드마크 검사 결과 (의심스러운 순서, 더블클릭하면 단일 모드로 열기)
+        self.qa_model = LandmarkReportModel(self)
+        self.qa_view, self.qa_summary, self.qa_dock = self._report_dock("landmark QA", self.qa_model)
+
+        # 중복 이미지 cluster 목록 (cluster 마다 남길 첫 이미지는 굵게)
+        self.dedup_model = DuplicateReportModel(self)
+        check_redundant_btn = QPushButton("check redundant")
+        check_redundant_btn.setToolTip("Add all but the first image of every cluster to the check list")
+        check_redundant_btn.clicked.connect(self.check_redundant)
+        skip_redundant_btn = QPushButton("skip redundant")
+        skip_redundant_btn.setToolTip("Add \"!duplicate\" to the query so next / previous match skips them")
+        skip_redundant_btn.clicked.connect(self.skip_redundant)
+        self.dedup_view, self.dedup_summary, self.dedup_dock = self._report_dock(
+            "near-duplicates", self.dedup_model, (check_redundant_btn, skip_redundant_btn))
+
+        # 두 라벨 세트 비교 결과 (차이가 큰 이미지 먼저)
+        self.compare_model = LabelComparisonModel(self)
+        clear_compare_btn = QPushButton("clear")
+        clear_compare_btn.setToolTip("Stop drawing the compared label sets")
+        clear_compare_btn.clicked.connect(self.clear_comparison)
+        self.compare_view, self.compare_summary, self.compare_dock = self._report_dock(
+            "label comparison", self.compare_model, (clear_compare_btn,))
+
         # 오른쪽: 단일 이미지 또는 그리드 뷰 영역 (세로 레이아웃)
         self.right_widget = QWidget()
         self.right_layout = QVBoxLayout()
@@ -112,6 +207,13 @@ class ImageViewer(QMainWindow):
         self.nav_layout.addWidget(self.next_btn)
         self.nav_widget.hide()  # 폴더 불러오기 전에는 숨김
 
+        # 그리드 모드용 썸네일 뷰 (보이는 영역만 그리고 디코딩)
+        self.grid_model = ThumbnailModel(self)
+        self.grid_view = ThumbnailGridView()
+        self.grid_view.setModel(self.grid_model)
+        self.grid_view.doubleClicked.connect(self.open_grid_item)
+        self.grid_view.verticalScrollBar().valueChanged.connect(self.update_nav_indicator)
+
         # 초기 오른쪽 영역 구성 (아직 이미지 없음)
         self.update_right_view()
 
@@ -128,16 +230,29 @@ class ImageViewer(QMainWindow):
         open_action.triggered.connect(self.open_folder)
         file_menu.addAction(open_action)
 
+        self.cancel_scan_action = QAction("cancel scan", self)
+        self.cancel_scan_action.triggered.connect(self.cancel_scan)
+        self.cancel_scan_action.setEnabled(False)
+        file_menu.addAction(self.cancel_scan_action)
+
         # Export
         export_menu = file_menu.addMenu("Export")
         export_selected_action = QAction("Selected Images", self)
         export_selected_action.triggered.connect(self.export_selected_images)
         export_menu.addAction(export_selected_action)
 
+        self.export_images_action = QAction("Selected Images (files, splits)...", self)
+        self.export_images_action.triggered.connect(self.export_checked_images)
+        export_menu.addAction(self.export_images_action)
+
         export_landmark_action = QAction("landmarks", self)
         export_landmark_action.triggered.connect(self.export_landmark)
         export_menu.addAction(export_landmark_action)
 
+        export_landmark_npz_action = QAction("landmarks (.npz)", self)
+        export_landmark_npz_action.triggered.connect(self.export_landmark_npz)
+        export_menu.addAction(export_landmark_npz_action)
+
         # import
         import_menu = file_menu.addMenu("Import")
 
@@ -151,6 +266,96 @@ class ImageViewer(QMainWindow):
         self.import_landmark_action.setEnabled(False)
         import_menu.addAction(self.import_landmark_action)
 
+        self.import_landmark_npz_action = QAction("landmarks (.npz)", self)
+        self.import_landmark_npz_action.triggered.connect(self.import_landmark_npz)
+        self.import_landmark_npz_action.setEnabled(False)
+        import_menu.addAction(self.import_landmark_npz_action)
+
+        # 체크 일괄 작업
+        select_menu = menu_bar.addMenu("select")
+        for text, function in (("check visible", self.check_visible), ("check all", self.check_all),
+                               ("uncheck all", self.uncheck_all), ("invert all", self.invert_checked)):
+            action = QAction(text, self)
+            action.triggered.connect(function)
+            select_menu.addAction(action)
+
+        # 조건 검색 / 필터 모드
+        filter_menu = menu_bar.addMenu("filter")
+        query_action = QAction("set query...", self)
+        query_action.triggered.connect(self.edit_query)
+        filter_menu.addAction(query_action)
+        self.filter_action = QAction("show matches only", self)
+        self.filter_action.setCheckable(True)
+        self.filter_action.toggled.connect(self.set_filter_mode)
+        filter_menu.addAction(self.filter_action)
+        for text, function in (("previous match", self.prev_match), ("next match", self.next_match)):
+            action = QAction(text, self)
+            action.triggered.connect(function)
+            filter_menu.addAction(action)
+
+        # 데이터셋 전체 랜드마크 검사
+        analysis_menu = menu_bar.addMenu("analysis")
+        self.qa_action = QAction("check landmarks", self)
+        self.qa_action.triggered.connect(self.run_landmark_qa)
+        analysis_menu.addAction(self.qa_action)
+        self.dedup_action = QAction("find near-duplicates", self)
+        self.dedup_action.triggered.connect(self.run_duplicate_search)
+        analysis_menu.addAction(self.dedup_action)
+        self.compare_action = QAction("compare label sets...", self)
+        self.compare_action.triggered.connect(self.run_label_comparison)
+        analysis_menu.addAction(self.compare_action)
+
+        # 여러 명이 shard 단위로 나눠 라벨링
+        queue_menu = menu_bar.addMenu("queue")
+        for text, function in (("create work queue...", self.create_work_queue),
+                               ("take next shard...", self.take_shard), ("finish shard", self.finish_shard),
+                               ("leave queue", self.leave_queue), ("queue status", self.show_queue_status)):
+            action = QAction(text, self)
+            action.triggered.connect(function)
+            queue_menu.addAction(action)
+
+        # 성능 측정
+        profile_menu = menu_bar.addMenu("profile")
+        self.profile_action = QAction("record timings", self)
+        self.profile_action.setCheckable(True)
+        self.profile_action.toggled.connect(self.enable_profiling)
+        profile_menu.addAction(self.profile_action)
+        save_trace_action = QAction("save trace...", self)
+        save_trace_action.triggered.connect(self.save_trace)
+        profile_menu.addAction(save_trace_action)
+        reset_profile_action = QAction("reset timings", self)
+        reset_profile_action.triggered.connect(profiler.reset)
+        profile_menu.addAction(reset_profile_action)
+
+    def _report_dock(self, title, model, header_widgets=()):
+        """Hidden bottom dock: summary label (and buttons) above a table of the model; returns (view, summary, dock)"""
+        view = QTableView()
+        view.setModel(model)
+        view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        view.verticalHeader().hide()
+        view.verticalHeader().setDefaultSectionSize(20)
+        view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        view.horizontalHeader().setStretchLastSection(True)
+        # 더블클릭하면 그 이미지를 단일 모드로 열기
+        view.doubleClicked.connect(lambda index: self.open_image(index.data(Qt.UserRole)))
+        summary = QLabel()
+        summary.setWordWrap(True)
+        header = QHBoxLayout()
+        header.addWidget(summary, 1)
+        for button in header_widgets:
+            header.addWidget(button)
+        widget = QWidget()
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(header)
+        layout.addWidget(view)
+        widget.setLayout(layout)
+        dock = QDockWidget(title, self)
+        dock.setWidget(widget)
+        self.addDockWidget(Qt.BottomDockWidgetArea, dock)
+        dock.hide()
+        return view, summary, dock
+
     def _init_shortcut(self):
         # shortcut
         for keys, function_name in shortcut_map.values():
@@ -165,59 +370,281 @@ class ImageViewer(QMainWindow):
     def open_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "이미지 폴더 선택")
         if folder:
-            self.dataset_folder = folder
-            self.tree_view.show()  # 폴더 선택 시 트리 뷰 표시
-            self.update_tree_view(folder)
-            self.image_list = find_all_images(folder)
-            if self.image_list:
-                # 이미지가 하나라도 있으면 단일 모드로 시작
-                self.grid_mode = False
-                self.grid_toggle_btn.setText("Grid View")
-                self.current_index = 0
-                self.current_page = 0
-                self.grid_toggle_btn.show()
-                self.nav_widget.show()
-                self.import_landmark_action.setEnabled(True)
-                self.import_check_list_action.setEnabled(True)
-            else:
-                self.grid_toggle_btn.hide()
-                self.nav_widget.hide()
+            self.load_folder(folder)
+
+    def open_last_folder(self):
+        """Reopen the dataset folder of the last session, if it still exists"""
+        folder = last_folder()
+        if folder:
+            self.load_folder(folder)
+
+    def load_folder(self, folder):
+        """Reset the viewer for a dataset folder and start scanning it (or revalidating its manifest)"""
+        self.stop_scan()
+        self.save_manifest()
+        self.leave_queue()
+        self.scan_mtimes = None
+        self.stop_watching()
+        self.stop_landmark_qa()
+        self.qa_model.set_report(None)
+        self.qa_summary.clear()
+        self.stop_duplicate_search()
+        self.dedup_model.set_report(None)
+        self.dedup_summary.clear()
+        self.redundant = None
+        self.stop_label_comparison()
+        self.clear_comparison()
+        self.dataset_folder = folder
+        self.dataset_root = normalize_path(str(Path(folder).resolve()))
+        self.tree_view.show()  # 폴더 선택 시 트리 뷰 표시
+        self.close_journal()
+        self.dataset = DatasetIndex()
+        self.update_tree_view()
+        self.landmark = LandmarkStore()
+        self.open_journal()
+        self.checked = Selection()
+        self.checked_model.reset()
+        self.query.invalidate()
+        self.set_filter_mode(False)
+        self.grid_model.set_rows(None)
+        self.image_cache.clear()
+        # 이미지가 하나라도 찾아지면 단일 모드로 시작
+        self.grid_mode = False
+        self.grid_toggle_btn.setText("Grid View")
+        self.current_index = 0
+        self.grid_toggle_btn.hide()
+        self.nav_widget.hide()
+        self.import_landmark_action.setEnabled(False)
+        self.import_landmark_npz_action.setEnabled(False)
+        self.import_check_list_action.setEnabled(False)
+        self.update_right_view()
+
+        try:
+            remember_folder(folder)
+        except OSError:
+            pass
+
+        # 폴더 스캔은 백그라운드에서 진행하고, 찾은 이미지는 바로 볼 수 있도록 목록에 추가
+        # (지난번 스캔 결과가 있으면 바뀐 폴더만 다시 읽음)
+        manifest = ScanManifest(session_folder(self.dataset_root), self.dataset_root)
+        self.scan_worker = ScanWorker(folder, manifest, self)
+        self.scan_worker.batch_found.connect(self.on_scan_batch)
+        self.scan_worker.manifest_loaded.connect(self.on_manifest_loaded)
+        self.scan_worker.scan_finished.connect(self.on_scan_finished)
+        self.cancel_scan_action.setEnabled(True)
+        self.statusBar().showMessage("scanning...")
+        self.scan_worker.start()
+
+    def on_scan_batch(self, batch):
+        """Append a batch of scanned images; the first batch is shown right away"""
+        if self.sender() is not self.scan_worker:
+            return
+        first = not self.dataset
+        self.grid_model.append_rows(batch)
+        self.query.invalidate()
+        if first:
+            self.grid_toggle_btn.show()
+            self.nav_widget.show()
             self.update_right_view()
+        else:
+            self.update_nav_indicator()
+        self.statusBar().showMessage(f"scanning... {len(self.dataset)} images")
 
-    def update_tree_view(self, path):
-        """Update tree view and set paths, hide column 0 and others"""
-        self.model.setRootPath(path)
-        index = self.model.index(path)
-        self.tree_view.setRootIndex(index)
-        for col in range(1, self.model.columnCount(index)):
-            self.tree_view.setColumnHidden(col, True)
-        self.tree_view.expandAll()
+    def on_manifest_loaded(self, dataset, position, changes):
+        """Adopt the revalidated index of the last session and go back to where it was left"""
+        if self.sender() is not self.scan_worker:
+            return
+        self.dataset = dataset
+        # 저널은 dataset 객체를 참조하므로 새 index 로 다시 엶 (아직 복구 전이라 기록 없음)
+        self.open_journal()
+        self.grid_model.reset()
+        index = self.dataset.find(os.path.join(self.dataset_root, position.get("image") or ""))
+        self.current_index = max(0, index)
+        if position.get("grid"):
+            self.grid_mode = True
+            self.grid_toggle_btn.setText("Single View")
+        self.grid_top = position.get("grid_top")
+        if self.dataset:
+            self.grid_toggle_btn.show()
+            self.nav_widget.show()
+        added, removed, rescanned = changes
+        self.statusBar().showMessage(f"reopened {len(self.dataset)} images ({rescanned} folders re-read, "
+                                     f"{added} added, {removed} removed)")
+
+    def on_scan_finished(self, cancelled):
+        """Sort the scanned list once, keeping the current image on the same file"""
+        if self.sender() is not self.scan_worker:
+            return
+        worker, self.scan_worker = self.scan_worker, None
+        self.cancel_scan_action.setEnabled(False)
+
+        # 랜드마크는 image id 기준이라 정렬 후에도 그대로 유지됨 (manifest 의 목록은 이미 정렬됨)
+        current_id = self.current_id
+        if not worker.from_manifest:
+            self.dataset.sort()
+        if self.dataset:
+            self.current_index = self.dataset.index_of_id(current_id)
+            self.import_landmark_action.setEnabled(True)
+            self.import_landmark_npz_action.setEnabled(True)
+            self.import_check_list_action.setEnabled(True)
+        self.query.invalidate()
+        self.refresh_grid_rows()
+        self.update_tree_view()
+        self.update_right_view()
+        if self.grid_mode and worker.from_manifest:
+            # 지난 세션에서 보던 그리드 위치로
+            top = self.dataset.find(os.path.join(self.dataset_root, self.grid_top or ""))
+            if top >= 0:
+                self.grid_view.scroll_to_row(self.grid_model.row_of(top))
+        if not worker.from_manifest:
+            state = "scan cancelled" if cancelled else "scan finished"
+            self.statusBar().showMessage(f"{state}: {len(self.dataset)} images")
+        # 목록이 준비된 뒤에 지난 세션의 편집을 복구 (취소된 스캔에 없는 이미지의 랜드마크는 저널이 보관)
+        self.restore_session()
+        if not cancelled:
+            self.scan_mtimes = worker.mtimes
+            if not worker.from_manifest:
+                self.save_manifest()
+            # 이후 추가/삭제/이름 변경은 바뀐 폴더만 다시 읽어 반영
+            self.watcher = DatasetWatcher(self.dataset_root, self.dataset, self.scan_mtimes, self)
+            self.watcher.changed.connect(self.on_dataset_changed)
+
+    def cancel_scan(self):
+        """Stop the running folder scan; images found so far are kept"""
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+
+    def stop_scan(self):
+        """Cancel the running scan and wait for it, discarding its remaining results"""
+        if self.scan_worker is not None:
+            worker, self.scan_worker = self.scan_worker, None
+            worker.cancel()
+            worker.wait()
+            self.cancel_scan_action.setEnabled(False)
+
+    def save_manifest(self):
+        """Store the scanned list and the viewing position so the dataset reopens without a full scan"""
+        if self.scan_mtimes is None or not self.dataset_root:
+            return
+        position = {"grid": self.grid_mode}
+        if self.dataset:
+            position["image"] = os.path.relpath(self.dataset[self.current_index], self.dataset_root)
+            visible = self.grid_view.visible_range() if self.grid_mode else None
+            if visible is not None:
+                top = self.dataset[self.grid_model.position(visible[0])]
+                position["grid_top"] = os.path.relpath(top, self.dataset_root)
+        try:
+            with profiler.span("manifest_save", images=len(self.dataset)):
+                ScanManifest(session_folder(self.dataset_root), self.dataset_root).save(
+                    self.dataset, self.scan_mtimes, position)
+        except OSError as e:
+            self.statusBar().showMessage(f"could not save the scan manifest: {e}")
+
+    def stop_watching(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher.deleteLater()
+            self.watcher = None
+
+    def on_dataset_changed(self, delta):
+        """
+        Apply added / removed / renamed images found by the watcher.
+        Ids are kept (renamed images keep theirs), so landmarks and check states stay on their files.
+        """
+        if self.sender() is not self.watcher:
+            return
+        added, removed, new_dirs, gone_dirs = delta
+        # 지워진 폴더는 부모 폴더와 자기 자신 양쪽에서 보고될 수 있어 중복 제거
+        removed = set(removed)
+        for directory in set(gone_dirs):
+            removed.update(self.dataset.path_of_id(i) for i in self.dataset.ids_under(directory))
+            if self.scan_mtimes is not None:
+                # manifest 에 지워진 폴더가 남아 있으면 다시 열 때 그 이미지가 되살아남
+                prefix = os.path.join(directory, "")
+                for d in [d for d in self.scan_mtimes if d == directory or d.startswith(prefix)]:
+                    del self.scan_mtimes[d]
+        renames, removed, added = match_renames(sorted(removed), sorted(set(added)),
+                                                self.watcher.identity_of, self.watcher.new_identity)
+
+        current_id = self.current_id
+        removed_ids = [i for i in map(self.dataset.id_of, removed) if i is not None]
+        if removed_ids:
+            self.set_checked(removed_ids, False)
+            self.dataset.remove(removed_ids)
+        for old, new in renames:
+            image_id = self.dataset.id_of(old)
+            if image_id is not None:
+                self.dataset.rename(image_id, new)
+        self.dataset.insert(added)
+
+        # 현재 이미지가 지워졌다면 같은 위치의 이미지를 보여줌
+        index = self.dataset.index_of_id(current_id) if current_id is not None else -1
+        self.current_index = index if index >= 0 else max(0, min(self.current_index, len(self.dataset) - 1))
+        if renames:
+            # 저널은 상대 경로로 기록되므로 바뀐 경로로 스냅샷을 다시 씀
+            self.checked_model.reset()
+            self.checkpoint_journal()
+        scroll = self.grid_view.verticalScrollBar().value()
+        self.query.invalidate()
+        self.refresh_grid_rows()
+        self.update_tree_view()
+        if self.grid_mode:
+            self.grid_view.verticalScrollBar().setValue(scroll)
+            self.update_nav_indicator()
+        else:
+            self.update_right_view()
+        has_images = bool(self.dataset)
+        self.grid_toggle_btn.setVisible(has_images)
+        self.nav_widget.setVisible(has_images)
+        self.statusBar().showMessage(f"dataset updated: {len(added)} added, {len(removed)} removed, "
+                                     f"{len(renames)} renamed ({len(self.dataset)} images)")
+
+    def update_tree_view(self):
+        """Rebuild the folder tree from the dataset index, keeping expanded folders open"""
+        expanded = [path for path in self.tree_model.directories()
+                    if self.tree_view.isExpanded(self.tree_model.index_of_dir(path))]
+        self.tree_model.reset(self.dataset_root)
+        for path in expanded:
+            index = self.tree_model.index_of_dir(path)
+            if index.isValid():
+                self.tree_view.expand(index)
+
+    def refresh_tree_counts(self):
+        """Landmarks or checks changed: redraw the folder counts"""
+        self.tree_model.invalidate_counts()
+        self.tree_view.viewport().update()
+
+    def refresh_grid_rows(self):
+        """Grid rows: every image, or the query matches as of now in filter mode (kept while checking)"""
+        self.grid_model.set_rows(self.query.positions().copy() if self.filter_mode else None)
 
     def expand_to_path(self, file_path):
         """Automatically extend the tree view to the image path"""
-        dir_path = os.path.dirname(file_path)
-        index = self.model.index(dir_path)
+        index = self.tree_model.index_of_dir(os.path.dirname(file_path))
         while index.isValid():
             self.tree_view.expand(index)
             index = index.parent()
 
     def display_selected_image(self, index):
         """Show selected files in tree view in single mode"""
-        path = normalize_path(self.model.filePath(index))
-        if os.path.isfile(path) and path.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp', '.gif')):
-            # 단일 모드로 전환
-            self.grid_mode = False
-            self.grid_toggle_btn.setText("Grid View")
-            normalized_list = [normalize_path(p) for p in self.image_list]
-            path_norm = normalize_path(path)
-            if path_norm in normalized_list:
-                self.current_index = normalized_list.index(path_norm)
-            else:
-                self.show_warning("오류", "해당 이미지가 이미지 리스트에 없습니다.")
-                return
-            self.display_image(path)
-            self.expand_to_path(path)
-            self.update_right_view()
+        image_id = self.tree_model.image_id(index)
+        if image_id is not None:
+            self.open_image(image_id)
+
+    def open_image(self, image_id):
+        """Show an image in single mode"""
+        index = self.dataset.index_of_id(image_id)
+        if index < 0:
+            self.show_warning("오류", "해당 이미지가 이미지 리스트에 없습니다.")
+            return
+        # 단일 모드로 전환
+        self.grid_mode = False
+        self.grid_toggle_btn.setText("Grid View")
+        self.current_index = index
+        path = self.dataset[index]
+        self.statusBar().showMessage(path)
+        self.expand_to_path(path)
+        self.update_right_view()
 
     def display_image(self, path):
         """Display and resize a single image"""
@@ -235,8 +662,12 @@ class ImageViewer(QMainWindow):
             )
             self.image_label.setPixmap(scaled_pixmap)
 
+    @traced("update_right_view")
     def update_right_view(self):
         """Update right area: configure single image or grid mode + show navigation"""
+        self.single_image_label = None
+        self.checkbox = None
+
         # 오른쪽 레이아웃 초기화
         for i in reversed(range(self.right_layout.count())):
             widget = self.right_layout.itemAt(i).widget()
@@ -244,69 +675,15 @@ class ImageViewer(QMainWindow):
                 widget.setParent(None)
 
         if self.grid_mode:
-            # 그리드 모드: 한 페이지당 최대 64개 썸네일
-            scroll = QScrollArea()
-            scroll.setWidgetResizable(True)
-            grid_widget = QWidget()
-            grid_layout = QGridLayout(grid_widget)
-            grid_layout.setSpacing(5)
-
-            page_size = 64
-            start = self.current_page * page_size
-            end = min(start + page_size, len(self.image_list))
-
-            for idx, img_path in enumerate(self.image_list[start:end]):
-                row = idx // 8
-                col = idx % 8
-
-                # 개별 이미지 + 체크박스를 담을 위젯
-                thumb_widget = QWidget()
-                thumb_layout = QVBoxLayout()
-                thumb_layout.setContentsMargins(0, 0, 0, 0)
-
-                # 체크박스 생성
-                checkbox = QCheckBox()
-                checkbox.setStyleSheet("QCheckBox { background: white; }")  # 체크박스 배경 추가
-
-                # 체크박스를 우측 상단에 배치하는 레이아웃
-                checkbox_layout = QHBoxLayout()
-                checkbox_layout.addStretch()
-                checkbox_layout.addWidget(checkbox)
-                checkbox_layout.setContentsMargins(0, 0, 0, 0)
-
-                # 기존에 체크된 상태 반영 및 기능 연결
-                checkbox.setChecked(img_path in self.checked)
-                checkbox.stateChanged.connect(lambda state, path=img_path: self.checked_list(state, path))
-
-                # 이미지 라벨 생성
-                thumb_label = QLabel()
-                thumb_label.setFixedSize(150, 150)
-                thumb_label.setAlignment(Qt.AlignCenter)
-
-                # 이미지 로드 및 설정
-                pix = QPixmap(img_path)
-                if not pix.isNull():
-                    scaled = pix.scaled(thumb_label.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                    thumb_label.setPixmap(scaled)
-
-                # 위젯 레이아웃 조합
-                thumb_layout.addLayout(checkbox_layout)  # 체크박스 추가
-                thumb_layout.addWidget(thumb_label)  # 이미지 추가
-                thumb_widget.setLayout(thumb_layout)
-
-                # 그리드에 추가
-                grid_layout.addWidget(thumb_widget, row, col)
-
-            scroll.setWidget(grid_widget)
-            self.right_layout.addWidget(scroll)
-
-            # 내비게이션 표시 (그리드 모드: "이미지 A ~ B / 전체: C")
-            indicator = f"이미지 {start + 1} ~ {end} / 전체: {len(self.image_list)}"
+            # 그리드 모드: 전체 목록을 연속 스크롤, 보이는 썸네일만 그림
+            self.right_layout.addWidget(self.grid_view)
+            self.grid_view.scroll_to_row(self.grid_model.row_of(self.current_index))
+            indicator = self.grid_indicator()
 
         else:
             # 🔹 [단일 이미지 모드]
-            if self.image_list:
-                img_path = self.image_list[self.current_index]
+            if self.dataset:
+                img_path = self.dataset[self.current_index]
 
                 # 단일 이미지 표시용 위젯
                 single_image_widget = QWidget()
@@ -323,14 +700,14 @@ class ImageViewer(QMainWindow):
                 checkbox_layout.setContentsMargins(0, 0, 0, 0)
 
                 # 기존에 체크된 상태 반영 및 기능 연결
-                self.checkbox.setChecked(img_path in self.checked)
-                self.checkbox.stateChanged.connect(lambda state, path=img_path: self.checked_list(state, path))
+                self.checkbox.setChecked(self.current_id in self.checked)
+                self.checkbox.stateChanged.connect(lambda state: self.checked_list(state, self.dataset[self.current_index]))
 
-                # 🔹 단일 이미지 QLabel
+                # 🔹 단일 이미지 뷰 (확대/이동, 보이는 tile 만 디코딩)
                 # single_image_label = QLabel()
                 # single_image_label = ClickableLabel(self)
-                single_image_label = ClickableLabelBeta(self, img_path)
-                single_image_label.setAlignment(Qt.AlignCenter)
+                single_image_label = ZoomableImageView(self, self.image_cache, img_path)
+                self.single_image_label = single_image_label
                 # single_image_label.setFixedSize(500, 500)  # 단일 이미지 크기 조정
 
                 # # 이미지 로드
@@ -346,8 +723,11 @@ class ImageViewer(QMainWindow):
 
                 self.right_layout.addWidget(single_image_widget)
 
+                self.prefetch_neighbours()
+                self.nav_preview = False
+
             # 내비게이션 표시 (단일 모드: "현재: N / 전체: 총개수")
-            indicator = f"현재: {self.current_index + 1} / 전체: {len(self.image_list)}"
+            indicator = self.single_indicator()
 
             # 내비게이션 영역 (좌/우 화살표 + 인디케이터)
         self.nav_label.setText(indicator)
@@ -363,62 +743,299 @@ class ImageViewer(QMainWindow):
         # 마지막에 Grid 토글 버튼 추가
         self.right_layout.addWidget(self.grid_toggle_btn)
 
+    def grid_indicator(self):
+        """Navigation text for grid mode: "이미지 A ~ B / 전체: C" for the visible rows"""
+        visible = self.grid_view.visible_range()
+        suffix = f" [{self.query.text}]" if self.filter_mode else ""
+        if visible is None:
+            return f"이미지 0 ~ 0 / 전체: {self.grid_model.rowCount()}{suffix}"
+        return f"이미지 {visible[0] + 1} ~ {visible[1] + 1} / 전체: {self.grid_model.rowCount()}{suffix}"
+
+    def single_indicator(self):
+        """Navigation text for single mode, with the number of matches in filter mode"""
+        indicator = f"현재: {self.current_index + 1} / 전체: {len(self.dataset)}"
+        if self.filter_mode:
+            indicator += f" [{self.query.text}: {len(self.query)}]"
+        return indicator
+
+    def update_nav_indicator(self):
+        """Refresh the navigation text without rebuilding the view"""
+        if self.grid_mode:
+            self.nav_label.setText(self.grid_indicator())
+        else:
+            self.nav_label.setText(self.single_indicator())
+
+    def open_grid_item(self, index):
+        """Double-click on a thumbnail: show it in single mode"""
+        self.grid_view.setCurrentIndex(index)
+        self.toggle_grid_mode()
+
     def checked_list(self, state, path):
+        image_id = self.dataset.id_of(path)
+        if image_id is not None:
+            self.set_checked([image_id], state)
+
+    def set_checked(self, ids, state):
+        """Check or uncheck many images at once; views are updated incrementally"""
         if state:
-            if path not in self.checked:
-                self.checked.append(path)
-                item = QListWidgetItem(path)
-                self.checked_list_widget.addItem(item)
+            self.checked_model.changed(added=self.checked.update(ids))
         else:
-            if path in self.checked:
-                self.checked.remove(path)
-                for i in range(self.checked_list_widget.count()):
-                    if self.checked_list_widget.item(i).text() == path:
-                        self.checked_list_widget.takeItem(i)
-                        break
+            self.checked_model.changed(removed=self.checked.difference_update(ids))
+        self.query.update(ids)
+        self.refresh_check_state()
+
+    def refresh_check_state(self):
+        """Sync the grid / single check boxes and the folder counts with self.checked"""
+        self.refresh_tree_counts()
+        if self.grid_mode:
+            self.grid_view.viewport().update()
+        elif self.checkbox is not None:
+            self.checkbox.blockSignals(True)
+            self.checkbox.setChecked(self.current_id in self.checked)
+            self.checkbox.blockSignals(False)
+
+    def check_visible(self):
+        """Check the thumbnails on screen (grid) or the current image (single)"""
+        if self.grid_mode:
+            visible = self.grid_view.visible_range()
+            if visible is not None:
+                self.set_checked(self.grid_model.ids(*visible), True)
+        elif self.dataset:
+            self.set_checked([self.current_id], True)
+
+    def check_all(self):
+        self.set_checked(self.dataset.ids(), True)
+
+    def uncheck_all(self):
+        self.checked_model.changed(removed=self.checked.clear())
+        self.query.update()
+        self.refresh_check_state()
+
+    def invert_checked(self):
+        added, removed = self.checked.invert(self.dataset.ids())
+        self.checked_model.changed(added, removed)
+        self.query.update()
+        self.refresh_check_state()
 
     def toggle_grid_mode(self):
         """Toggle mode when clicking Grid toggle button (single <-> grid)"""
         self.grid_mode = not self.grid_mode
         if self.grid_mode:
             self.grid_toggle_btn.setText("Single View")
-            self.current_page = self.current_index // 64 if self.image_list else 0
+            if self.filter_mode:
+                # 단일 모드에서 라벨링한 결과를 반영해 일치 목록을 다시 가져옴
+                self.refresh_grid_rows()
         else:
             self.grid_toggle_btn.setText("Grid View")
-            self.current_index = self.current_page * 64 if self.image_list else 0
+            # 그리드에서 선택된 썸네일(없으면 화면 맨 위 썸네일)부터 단일 모드로 보기
+            current = self.grid_view.currentIndex()
+            visible = self.grid_view.visible_range()
+            if current.isValid():
+                self.current_index = self.grid_model.position(current.row())
+            elif visible is not None:
+                self.current_index = self.grid_model.position(visible[0])
         self.update_right_view()
 
     def prev_clicked(self):
         """Left arrow click: Previous image (single) or previous page (grid)"""
-        if not self.image_list:
+        if not self.dataset:
             return
         if self.grid_mode:
-            if self.current_page > 0:
-                self.current_page -= 1
-                self.update_right_view()
-        else:
-            if self.current_index > 0:
-                self.current_index -= 1
-                self.update_right_view()
+            self.grid_view.scroll_page(-1)
+        elif self.filter_mode:
+            self.prev_match()
+        elif self.current_index > 0:
+            self.navigate(self.current_index - 1, -1)
 
     def next_clicked(self):
         """Right arrow click: Next image (single) or next page (grid)"""
-        if not self.image_list:
+        if not self.dataset:
+            return
+        if self.grid_mode:
+            self.grid_view.scroll_page(1)
+        elif self.filter_mode:
+            self.next_match()
+        elif self.current_index < len(self.dataset) - 1:
+            self.navigate(self.current_index + 1, 1)
+
+    def navigate(self, index, direction):
+        """
+        Go to an image in single mode. A single key press renders at once; requests arriving faster than
+        nav_settle_ms (key repeat) only move the index and are drawn once per frame as a preview.
+        """
+        now = time.monotonic()
+        repeated = now - self.last_nav_time < nav_settle_ms / 1000
+        self.last_nav_time = now
+        self.current_index = index
+        self.nav_direction = direction
+        if repeated or self.nav_frame_timer.isActive():
+            self.update_nav_indicator()
+            if not self.nav_frame_timer.isActive():
+                self.nav_frame_timer.start()
+        else:
+            self.show_current_image()
+        self.nav_settle_timer.start()
+
+    def on_navigation_settled(self):
+        if self.nav_preview:
+            self.show_current_image()
+
+    @traced("show_image")
+    def show_current_image(self, preview=False):
+        """Show the current image in the existing single view (built by update_right_view if missing)"""
+        if self.grid_mode or not self.dataset:
+            return
+        if self.single_image_label is None:
+            self.update_right_view()
+            return
+        path = self.dataset[self.current_index]
+        # 미리보기: 동기 디코딩 없이 캐시된 레벨 또는 썸네일만 사용
+        self.single_image_label.set_image(path, preview, self.thumbnail_preview(path) if preview else None)
+        self.nav_preview = preview
+        self.checkbox.blockSignals(True)
+        self.checkbox.setChecked(self.current_id in self.checked)
+        self.checkbox.blockSignals(False)
+        self.update_nav_indicator()
+        if not preview:
+            self.prefetch_neighbours()
+
+    def prefetch_neighbours(self):
+        """Decode the next images in the background (the next query matches in filter mode)"""
+        order = self.query.neighbours(self.current_index, self.nav_direction, prefetch_ahead,
+                                      prefetch_behind) if self.filter_mode else None
+        self.image_cache.prefetch(self.dataset, self.current_index, self.nav_direction, order)
+
+    def thumbnail_preview(self, path):
+        """Low-res stand-in from the thumbnail cache (memory or disk tier), or None"""
+        cache = self.grid_model.loader.cache
+        key = cache.key(path)
+        image = cache.get(key) if key else None
+        return QPixmap.fromImage(image) if image is not None else None
+
+    def prev_match(self):
+        self.jump_to_match(-1)
+
+    def next_match(self):
+        self.jump_to_match(1)
+
+    def jump_to_match(self, direction):
+        """Go to the next (1) or previous (-1) image matching the query (binary search over the matches)"""
+        if not self.dataset:
             return
         if self.grid_mode:
-            if (self.current_page + 1) * 64 < len(self.image_list):
-                self.current_page += 1
-                self.update_right_view()
+            current = self.grid_view.currentIndex()
+            visible = self.grid_view.visible_range()
+            if current.isValid():
+                position = self.grid_model.position(current.row())
+            elif visible is not None:
+                position = self.grid_model.position(visible[0]) - direction
+            else:
+                return
+        else:
+            position = self.current_index
+        target = self.query.next(position, direction)
+        if target is None:
+            self.statusBar().showMessage(f"no {'next' if direction > 0 else 'previous'} image matching "
+                                         f"'{self.query.text}'")
+            return
+        if self.grid_mode:
+            self.grid_view.scroll_to_row(self.grid_model.row_of(target))
+            self.update_nav_indicator()
+        else:
+            self.navigate(target, direction)
+
+    def edit_query(self):
+        """Ask for a new query (see query.py for the syntax)"""
+        text, ok = QInputDialog.getText(
+            self, "Query", "unlabeled, incomplete, complete, labeled, checked, duplicate, shard, glob:PATTERN, re:PATTERN\n"
+                           "(\"!\" negates, \"&\" combines)", text=self.query.text)
+        if not ok or not text.strip():
+            return
+        try:
+            self.query.set_query(text.strip())
+        except ValueError as e:
+            self.show_warning("Query", str(e))
+            return
+        matches = len(self.query)
+        self.statusBar().showMessage(f"{matches} images match '{self.query.text}'")
+        if self.filter_mode:
+            self.refresh_grid_rows()
+            self.update_right_view()
+
+    def toggle_filter_mode(self):
+        self.set_filter_mode(not self.filter_mode)
+
+    def set_filter_mode(self, enabled):
+        """Filter mode: prev / next step through the query matches and the grid shows only them"""
+        self.filter_action.blockSignals(True)
+        self.filter_action.setChecked(enabled)
+        self.filter_action.blockSignals(False)
+        if enabled == self.filter_mode:
+            return
+        self.filter_mode = enabled
+        if not self.dataset:
+            return
+        self.refresh_grid_rows()
+        self.update_right_view()
+
+    def closeEvent(self, event):
+        self.stop_scan()
+        self.save_manifest()
+        self.stop_watching()
+        self.stop_landmark_qa()
+        self.stop_duplicate_search()
+        self.stop_label_comparison()
+        self.leave_queue()
+        if self.export_worker is not None:
+            self.export_worker.cancel()
+            self.export_worker.wait()
+        if self.label_import_worker is not None:
+            self.label_import_worker.cancel()
+            self.label_import_worker.wait()
+        self.close_journal()
+        self.grid_model.loader.shutdown()
+        self.image_cache.shutdown()
+        if profiler.trace_path:
+            profiler.write_trace(profiler.trace_path)
+        super().closeEvent(event)
+
+    def enable_profiling(self, enabled):
+        """Turn timing instrumentation and the status bar latency HUD on or off"""
+        profiler.enable(enabled)
+        self.profile_action.blockSignals(True)
+        self.profile_action.setChecked(enabled)
+        self.profile_action.blockSignals(False)
+        self.profile_label.setVisible(enabled)
+        if enabled:
+            self.profile_timer.start(profile_hud_interval_ms)
+            self.update_profile_hud()
         else:
-            if self.current_index < len(self.image_list) - 1:
-                self.current_index += 1
-                self.update_right_view()
+            self.profile_timer.stop()
+
+    def update_profile_hud(self):
+        """Rolling p50/p99 latency per instrumented path"""
+        self.profile_label.setText(profiler.summary() or "p50/p99: no samples yet")
+
+    def save_trace(self):
+        """Save recorded spans as a Chrome trace (chrome://tracing, ui.perfetto.dev)"""
+        file_path, _ = QFileDialog.getSaveFileName(self, "Save trace", "trace.json", "Chrome trace (*.json)")
+        if file_path:
+            try:
+                count = profiler.write_trace(file_path)
+                QMessageBox.information(self, "Success", f"{count} events saved.")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Error saving file: {e}")
 
     def show_warning(self, title, message):
         QMessageBox.warning(self, title, message, QMessageBox.Ok)
 
     def toggle_checkbox(self):
-        if hasattr(self, 'checkbox') and self.checkbox is not None:
+        if self.grid_mode:
+            index = self.grid_view.currentIndex()
+            if index.isValid():
+                self.grid_model.toggle_check(index.row())
+            return
+        if self.checkbox is not None:
             self.checkbox.setChecked(not self.checkbox.isChecked())
 
     # function for the list
@@ -435,94 +1052,622 @@ class ImageViewer(QMainWindow):
 
         if file_path:
             try:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    for path in self.checked:
-                        f.write(path + "\n")
+                write_check_list(file_path, self.checked, self.dataset)
                 QMessageBox.information(self, "Success", "The File successfully saved!")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Error saving file: {e}")
 
-    def select_image(self, item):
-        path = item.text()
-        self.current_index = self.image_list.index(path)
-        self.current_page = self.image_list.index(path) // 64
+    def export_checked_images(self):
+        """Materialize the checked images (and optionally their landmarks and split lists) in an output tree"""
+        if not self.checked:
+            QMessageBox.warning(self, "Warning", "There's no selected files.")
+            return
+        if self.export_worker is not None:
+            return
+        ids = sorted(self.checked)
+        labeled = [image_id for image_id in ids if self.landmark.count(image_id)]
+        dialog = ExportDialog(self.dataset_folder, bool(labeled), self)
+        if not dialog.exec_():
+            return
+        output, mode, ratios, with_labels = dialog.options()
+        output = normalize_path(str(Path(output).resolve()))
+        if output == self.dataset_root or output.startswith(os.path.join(self.dataset_root, "")):
+            # 데이터셋 안에 내보내면 내보낸 파일이 다시 데이터셋에 추가됨
+            QMessageBox.warning(self, "Export", "The output folder must be outside the dataset folder.")
+            return
+
+        labels = None
+        if with_labels:
+            # 내보내는 동안 편집해도 영향이 없도록 랜드마크 복사본을 넘김
+            snapshot = LandmarkStore()
+            snapshot.update({image_id: self.landmark.get(image_id) for image_id in labeled})
+            labels = (snapshot, self.dataset)
+        paths = sorted(self.dataset.path_of_id(image_id) for image_id in ids)
+        self.export_progress = QProgressDialog("Exporting images...", "Cancel", 0, len(paths), self)
+        self.export_progress.setWindowTitle("Export")
+        self.export_progress.setMinimumDuration(300)
+        self.export_worker = ExportWorker(paths, self.dataset_root, output, mode, ratios, labels, self)
+        self.export_worker.progress.connect(self.on_export_progress)
+        self.export_worker.export_finished.connect(self.on_export_finished)
+        self.export_progress.canceled.connect(self.export_worker.cancel)
+        self.export_images_action.setEnabled(False)
+        self.export_worker.start()
+
+    def on_export_progress(self, done, total):
+        self.export_progress.setMaximum(total)
+        self.export_progress.setValue(done)
+
+    def on_export_finished(self, summary, cancelled):
+        self.export_worker = None
+        self.export_progress.reset()
+        self.export_images_action.setEnabled(True)
+        if isinstance(summary, str):
+            QMessageBox.critical(self, "Error", f"Error exporting images: {summary}")
+            return
+        state = "cancelled" if cancelled else "finished"
+        methods = ", ".join(f"{count} {method}" for method, count in sorted(summary["methods"].items()))
+        message = f"Export {state}.\n{summary['images']} images ({methods or 'none'})"
+        if summary["labels"]:
+            message += f", {summary['labels']} landmark files"
+        if summary["splits"]:
+            message += "\nsplit: " + ", ".join(f"{name} {count}" for name, count in summary["splits"].items())
+        errors = summary["errors"]
+        if errors:
+            message += f"\n{len(errors)} images could not be exported."
+        box = QMessageBox(QMessageBox.Warning if errors else QMessageBox.Information, "Export", message,
+                          QMessageBox.Ok, self)
+        if errors:
+            details = [f"{path} ({error})" for path, error in errors[:1000]]
+            if len(errors) > 1000:
+                details.append("...")
+            box.setDetailedText("\n".join(details))
+        box.exec_()
+
+    def select_image(self, index):
+        """Double-click in the checked list: show that image"""
+        self.current_index = self.dataset.index_of_id(index.data(Qt.UserRole))
         self.update_right_view()
 
-    def update_checked_list(self):
-        """show checked file list on QListWidget"""
-        self.checked_list_widget.clear()
-        for path in self.checked:
-            item = QListWidgetItem(os.path.basename(path))  # 파일명만 표시
-            item.setData(Qt.UserRole, path)  # 원본 경로 저장
-            self.checked_list_widget.addItem(item)
-
-    def remove_checked_item(self, item):
-        """remove specific file in checked file list"""
-        path = item.text()
-        if path in self.checked:
-            self.checked.remove(path)
-            self.update_checked_list()
-            self.update_right_view()
+    def remove_checked_items(self):
+        """remove the selected files from the checked file list"""
+        ids = [index.data(Qt.UserRole) for index in self.checked_list_view.selectedIndexes()]
+        self.set_checked(ids, False)
 
     def show_checked_list_menu(self, position):
         """Show context menu on right-click in checked file list"""
-        item = self.checked_list_widget.itemAt(position)
-        if item:
+        if self.checked_list_view.indexAt(position).isValid():
             menu = QMenu()
             remove_action = QAction("Delete", self)
-            remove_action.triggered.connect(lambda: self.remove_checked_item(item))
+            remove_action.triggered.connect(self.remove_checked_items)
             menu.addAction(remove_action)
-            menu.exec_(self.checked_list_widget.viewport().mapToGlobal(position))
+            menu.exec_(self.checked_list_view.viewport().mapToGlobal(position))
 
     def import_checked_list(self):
-        file_path = QFileDialog.getOpenFileName(None, "select checked list file", self.dataset_folder)
-        print(self.checked)
+        """Merge a check list file (one path per line) into the current selection"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "select checked list file", self.dataset_folder, "Text Files (*.txt);;All Files (*)"
+        )
+        if not file_path:
+            return
+        try:
+            ids, unmatched = read_check_list(file_path, self.dataset)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error loading check list: {e}")
+            return
+        self.set_checked(ids, True)
+        message = f"{len(ids)} images checked."
+        if unmatched:
+            message += f"\n{unmatched} paths are not in the dataset."
+        QMessageBox.information(self, "Success", message)
 
     # function for the labeling
-    def add_landmark(self, coords, index):
-        if index in self.landmark:
-            if len(self.landmark[index]) == 7:
-                self.show_warning("Warning", "You already have 7 landmarks.")
-                return
-            self.landmark[index].append(coords)
-        else:
-            self.landmark[index] = [coords]
+    @property
+    def current_id(self):
+        """Stable image id of the current image (landmarks are keyed by it), or None"""
+        if not self.dataset:
+            return None
+        return self.dataset.id_at(self.current_index)
+
+    def fit_image(self):
+        """Fit the single image into the view again after zooming"""
+        if self.single_image_label is not None:
+            self.single_image_label.fit()
+
+    def add_landmark(self, coords, image_id):
+        before = self.landmark.get(image_id)
+        if not self.landmark.add(image_id, coords):
+            self.show_warning("Warning", f"You already have {max_landmarks} landmarks.")
+            return
+        self.record_landmark_edit(image_id, before)
+
+    def move_landmark(self, image_id, point_index, coords):
+        self.landmark.move(image_id, point_index, coords)
+
+    def landmark_moved(self, image_id, before):
+        """Called once when a landmark drag ends"""
+        if before != self.landmark.get(image_id):
+            self.record_landmark_edit(image_id, before)
+
+    def record_landmark_edit(self, image_id, before, undoable=True):
+        self.query.update([image_id])
+        if bool(before) != (self.landmark.count(image_id) > 0):
+            # 라벨 있는 이미지 수가 바뀐 경우에만 트리 갱신
+            self.refresh_tree_counts()
+        if self.journal is not None:
+            self.journal.record(image_id, before, self.landmark.get(image_id), undoable)
+
+    def set_landmarks(self, image_id, points):
+        """Replace an image's landmarks and repaint only the affected area"""
+        before = self.landmark.get(image_id)
+        self.landmark.set(image_id, points)
+        self.query.update([image_id])
+        if bool(before) != bool(points):
+            self.refresh_tree_counts()
+        if self.single_image_label is not None:
+            self.single_image_label.invalidate_points(before + list(points))
 
     def remove_landmark(self):
-        if self.current_index in self.landmark and len(self.landmark[self.current_index]) != 0:
-            self.landmark[self.current_index].pop()
-            self.update_right_view()
+        image_id = self.current_id
+        if image_id is not None and self.landmark.count(image_id) != 0:
+            before = self.landmark.get(image_id)
+            self.landmark.pop(image_id)
+            self.record_landmark_edit(image_id, before, undoable=False)
+            # 화면 전체를 다시 만들지 않고 지워진 점 주변만 다시 그림
+            if self.single_image_label is not None:
+                self.single_image_label.invalidate_points(before)
+
+    def undo_landmark(self):
+        """Undo the latest edit of the current image; without history, remove its last point"""
+        image_id = self.current_id
+        if image_id is None:
+            return
+        points = self.journal.undo(image_id) if self.journal is not None else None
+        if points is None:
+            self.remove_landmark()
+        else:
+            self.set_landmarks(image_id, points)
+
+    def redo_landmark(self):
+        image_id = self.current_id
+        if image_id is None or self.journal is None:
+            return
+        points = self.journal.redo(image_id)
+        if points is not None:
+            self.set_landmarks(image_id, points)
+
+    def open_journal(self):
+        """Start the annotation journal of the current dataset (replayed once the scan is complete)"""
+        self.close_journal()
+        self.journal = AnnotationJournal(session_folder(self.dataset_root), self.dataset, self.dataset_root)
+        self.session_restored = False
+
+    def restore_session(self):
+        replayed = self.journal.replay(self.landmark)
+        self.session_restored = True
+        if replayed:
+            self.statusBar().showMessage(f"restored {replayed} landmark edits from the last session")
+        self.query.update()
+        self.refresh_tree_counts()
+        if self.single_image_label is not None:
+            self.single_image_label.viewport().update()
+
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.flush()
+            if self.journal.records:
+                self.checkpoint_journal()
+            self.journal = None
+
+    def checkpoint_journal(self):
+        """Fold the journal into the snapshot (only once the session has been restored)"""
+        if self.journal is not None and self.session_restored:
+            self.journal.compact(self.landmark)
+
+    def autosave(self):
+        """Periodic fsync of the journal; large journals are folded into the snapshot"""
+        if self.journal is None:
+            return
+        self.journal.flush()
+        if self.journal.records >= journal_compact_records:
+            self.checkpoint_journal()
 
     def export_landmark(self):
+        """
+        Write one .txt per labeled image under the chosen folder (same layout as the dataset).
+        Exporting again to the same folder only rewrites images changed since the last export.
+        """
         output_folder = QFileDialog.getExistingDirectory(self, "select output folder", self.dataset_folder)
         try:
             if output_folder:
-                for index in self.landmark:
-                    if len(self.landmark[index]) != 0:
-                        image_path = normalize_path(self.image_list[index])
-                        extender = image_path.split('.')[-1]
-                        save_path = image_path.replace(normalize_path(self.dataset_folder), output_folder).replace(extender, 'txt')
-
-                        # 저장할 폴더가 존재하지 않으면 생성
-                        save_dir = os.path.dirname(save_path)
-                        if not os.path.exists(save_dir):
-                            os.makedirs(save_dir)
-
-                        with open(save_path, "w", encoding="utf-8") as file:  # 'a' 모드: 기존 파일에 내용 추가
-                            file.write(' '.join(f"{x} {y}" for x, y in self.landmark[index]) + '\n')
-                QMessageBox.information(self, "Success", "The File successfully saved!")
+                incremental = self.journal is not None and self.journal.last_export == output_folder
+                ids = sorted(self.landmark.dirty) if incremental else None
+                with profiler.span("export_txt", incremental=incremental):
+                    written = self.landmark.export_txt(output_folder, self.dataset, self.dataset_root, ids)
+                self.landmark.dirty.clear()
+                if self.journal is not None:
+                    self.journal.record_export(output_folder)
+                    self.journal.flush()
+                QMessageBox.information(self, "Success", f"The File successfully saved! ({written} files written)")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error saving file: {e}")
 
-    def import_landmark(self):
-        landmark_path = QFileDialog.getExistingDirectory(None, "select label root folder", self.dataset_folder, QFileDialog.ShowDirsOnly)
-        if landmark_path:
-            landmark_paths = read_labels(landmark_path, self.dataset_folder)
-            for path in landmark_paths.keys():
+    def export_landmark_npz(self):
+        """Write all landmarks into a single .npz file"""
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export landmarks", self.dataset_folder, "NumPy archive (*.npz)"
+        )
+        if file_path:
+            try:
+                with profiler.span("save_npz"):
+                    self.landmark.save(file_path, self.dataset, self.dataset_root)
+                QMessageBox.information(self, "Success", "The File successfully saved!")
+            except Exception as e:
+                QMessageBox.critical(self, "Error", f"Error saving file: {e}")
+
+    def import_landmark_npz(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import landmarks", self.dataset_folder, "NumPy archive (*.npz)"
+        )
+        if not file_path:
+            return
+        try:
+            with profiler.span("load_npz"):
+                unmatched = self.landmark.load(file_path, self.dataset, self.dataset_root)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Error loading landmarks: {e}")
+            return
+        self.checkpoint_journal()
+        self.query.update()
+        self.refresh_tree_counts()
+        if self.single_image_label is not None:
+            self.single_image_label.viewport().update()
+        message = "The landmarks are successfully loaded!"
+        if unmatched:
+            message += f"\n{len(unmatched)} images are not in the dataset."
+        QMessageBox.information(self, "Success", message)
+
+    def run_landmark_qa(self):
+        """Check every labeled image in the background (see qa.py) and list the suspicious ones"""
+        if self.qa_worker is not None or not self.dataset:
+            return
+        ids = [i for i in self.landmark.ids().tolist() if self.dataset.index_of_id(i) >= 0]
+        if not ids:
+            self.show_warning("landmark QA", "There are no landmarks to check.")
+            return
+        self.qa_worker = LandmarkQAWorker(ids, self.landmark.points[ids], self.landmark.counts[ids],
+                                          self.dataset.paths_of_ids(ids), self)
+        self.qa_worker.report_ready.connect(self.on_landmark_qa_report)
+        self.qa_action.setEnabled(False)
+        self.statusBar().showMessage(f"checking landmarks of {len(ids)} images...")
+        self.qa_worker.start()
+
+    def stop_landmark_qa(self):
+        if self.qa_worker is not None:
+            worker, self.qa_worker = self.qa_worker, None
+            worker.cancel()
+            worker.wait()
+            self.qa_action.setEnabled(True)
+
+    def on_landmark_qa_report(self, report):
+        if self.sender() is not self.qa_worker:
+            return
+        self.qa_worker = None
+        self.qa_action.setEnabled(True)
+        self.qa_model.set_report(report)
+        self.qa_summary.setText(report.summary())
+        self.qa_dock.show()
+        self.statusBar().showMessage(f"landmark QA: {len(report)} suspicious images")
+
+    def run_duplicate_search(self):
+        """Hash every image on a process pool (cached by path and mtime) and list near-duplicate clusters"""
+        if self.dedup_worker is not None or not self.dataset:
+            return
+        if dedup_max_distance > max_search_distance:
+            self.show_warning("Near-duplicates", f"dedup_max_distance ({dedup_max_distance}) must be at most "
+                                                 f"{max_search_distance} bits.")
+            return
+        ids = self.dataset.ids().tolist()
+        cache_path = os.path.join(session_folder(self.dataset_root), "hashes.npz")
+        self.dedup_worker = DuplicateWorker(ids, self.dataset.paths_of_ids(ids), cache_path, self)
+        self.dedup_worker.progress.connect(self.on_duplicate_progress)
+        self.dedup_worker.report_ready.connect(self.on_duplicate_report)
+        self.dedup_action.setEnabled(False)
+        self.statusBar().showMessage(f"hashing {len(ids)} images...")
+        self.dedup_worker.start()
+
+    def stop_duplicate_search(self):
+        if self.dedup_worker is not None:
+            worker, self.dedup_worker = self.dedup_worker, None
+            worker.cancel()
+            worker.wait()
+            self.dedup_action.setEnabled(True)
+
+    def on_duplicate_progress(self, done, total):
+        if self.sender() is self.dedup_worker:
+            self.statusBar().showMessage(f"hashing images... {done}/{total}")
+
+    def on_duplicate_report(self, report):
+        if self.sender() is not self.dedup_worker:
+            return
+        self.dedup_worker = None
+        self.dedup_action.setEnabled(True)
+        self.dedup_model.set_report(report)
+        self.dedup_summary.setText(report.summary())
+        self.redundant = report.redundant_mask(len(self.dataset.directory_ids()))
+        self.query.update()
+        self.dedup_dock.show()
+        self.statusBar().showMessage(f"near-duplicates: {len(report.redundant())} redundant images")
+
+    def check_redundant(self):
+        """Check all but the first image of every near-duplicate cluster"""
+        if self.dedup_model.report is not None:
+            self.set_checked(self.dedup_model.report.redundant().tolist(), True)
+
+    def skip_redundant(self):
+        """Make next / previous match skip redundant frames"""
+        if self.redundant is None or "duplicate" in self.query.text:
+            return
+        self.query.set_query(f"{self.query.text} & !duplicate")
+        self.statusBar().showMessage(f"{len(self.query)} images match '{self.query.text}'")
+        if self.filter_mode:
+            self.refresh_grid_rows()
+            self.update_right_view()
+
+    def run_label_comparison(self):
+        """Pick two label folders (A, B) and list the images by disagreement"""
+        if self.compare_worker is not None or not self.dataset:
+            return
+        sources = []
+        for name in ("A", "B"):
+            folder = QFileDialog.getExistingDirectory(self, f"select label root folder {name}", self.dataset_folder,
+                                                      QFileDialog.ShowDirsOnly)
+            if not folder:
+                return
+            sources.append(folder)
+        self.compare_worker = CompareWorker(sources, self.dataset_folder, self.dataset, self.dataset_root, self)
+        self.compare_worker.report_ready.connect(self.on_label_comparison)
+        self.compare_action.setEnabled(False)
+        self.statusBar().showMessage("comparing label sets...")
+        self.compare_worker.start()
+
+    def stop_label_comparison(self):
+        if self.compare_worker is not None:
+            worker, self.compare_worker = self.compare_worker, None
+            worker.cancel()
+            worker.wait()
+            self.compare_action.setEnabled(True)
+
+    def on_label_comparison(self, store_a, store_b, comparison, problems):
+        if self.sender() is not self.compare_worker:
+            return
+        self.compare_worker = None
+        self.compare_action.setEnabled(True)
+        self.comparison = (store_a, store_b)
+        self.compare_model.set_comparison(comparison)
+        self.compare_summary.setText(comparison.summary())
+        self.compare_dock.show()
+        self.statusBar().showMessage(f"label comparison: {len(comparison)} images, {len(problems)} problems")
+        if self.single_image_label is not None:
+            self.single_image_label.viewport().update()
+        if problems:
+            box = QMessageBox(QMessageBox.Warning, "Compare label sets",
+                              f"{len(problems)} label files could not be matched or read.", QMessageBox.Ok, self)
+            box.setDetailedText("\n".join(problems[:1000] + (["..."] if len(problems) > 1000 else [])))
+            box.exec_()
+
+    def clear_comparison(self):
+        self.comparison = None
+        self.compare_model.set_comparison(None)
+        self.compare_summary.clear()
+        if self.single_image_label is not None:
+            self.single_image_label.viewport().update()
+
+    def compare_overlay(self, image_id):
+        """(points of A, points of B) of an image while two label sets are compared, else None"""
+        if self.comparison is None or image_id is None:
+            return None
+        store_a, store_b = self.comparison
+        return store_a.get(image_id), store_b.get(image_id)
+
+    def create_work_queue(self):
+        """Split the scanned dataset into shards in a shared queue folder and take the first one"""
+        if not self.dataset or self.scan_worker is not None:
+            self.show_warning("Work queue", "Open a dataset and wait for the scan to finish first.")
+            return
+        folder = QFileDialog.getExistingDirectory(self, "select work queue folder (shared disk)", self.dataset_folder)
+        if not folder:
+            return
+        shard_size, ok = QInputDialog.getInt(self, "Work queue", "images per shard", queue_shard_size, 1)
+        if not ok:
+            return
+        try:
+            shards = create_queue(folder, self.dataset, self.dataset_root, shard_size)
+        except (OSError, ValueError) as e:
+            self.show_warning("Work queue", f"Could not create the work queue.\n{e}")
+            return
+        self.statusBar().showMessage(f"work queue created: {shards} shards")
+        self.join_queue(folder)
+
+    def take_shard(self):
+        """Lease the next open shard (asking for the queue folder the first time)"""
+        if self.work_queue is None:
+            folder = QFileDialog.getExistingDirectory(self, "select work queue folder", self.dataset_folder)
+            if folder:
+                self.join_queue(folder)
+        elif self.shard is None:
+            self.next_shard()
+
+    def join_queue(self, folder):
+        if not self.dataset or self.scan_worker is not None:
+            self.show_warning("Work queue", "Open the dataset and wait for the scan to finish first.")
+            return
+        self.leave_queue()
+        try:
+            self.work_queue = WorkQueue(folder)
+        except ValueError as e:
+            self.show_warning("Work queue", str(e))
+            return
+        self.next_shard()
+
+    def next_shard(self):
+        """Lease a shard, merge what earlier sessions saved for it and show only its unfinished images"""
+        try:
+            shard = self.work_queue.acquire()
+            if shard is None:
+                QMessageBox.information(self, "Work queue", "Every shard is finished or leased by another session.")
+                return
+            ids, missing = self.work_queue.shard_ids(shard, self.dataset, self.dataset_root)
+            self.work_queue.load_labels(shard, self.landmark, self.dataset, self.dataset_root)
+        except (OSError, ValueError) as e:
+            self.show_warning("Work queue", f"Could not take a shard.\n{e}")
+            return
+        self.shard, self.shard_ids = shard, ids
+        self.shard_mask = np.zeros(len(self.dataset.directory_ids()), bool)
+        self.shard_mask[ids] = True
+        self.checkpoint_journal()
+        self.refresh_tree_counts()
+        self.query.set_query("shard & !complete")
+        self.lease_timer.start(int(self.work_queue.lease_seconds * 1000 / 3))
+        if self.filter_mode:
+            self.refresh_grid_rows()
+            self.update_right_view()
+        else:
+            self.set_filter_mode(True)
+        message = f"shard {shard + 1}/{self.work_queue.shards}: {len(ids)} images, {len(self.query)} to label"
+        if missing:
+            message += f" ({len(missing)} images of the shard are not in this dataset)"
+        self.statusBar().showMessage(message)
+
+    def save_shard(self):
+        """Write this session's landmarks of the leased shard to its own file in the queue"""
+        try:
+            self.work_queue.save_labels(self.shard, self.landmark, self.dataset, self.dataset_root, self.shard_ids)
+            return True
+        except OSError as e:
+            self.statusBar().showMessage(f"could not save shard {self.shard + 1}: {e}")
+            return False
+
+    def renew_shard(self):
+        """Heartbeat: save the shard and extend its lease; a lost lease drops the shard"""
+        if self.shard is None:
+            return
+        self.save_shard()
+        try:
+            renewed = self.work_queue.renew(self.shard)
+        except OSError as e:
+            self.statusBar().showMessage(f"could not renew the lease of shard {self.shard + 1}: {e}")
+            return
+        if not renewed:
+            shard = self.shard
+            self.drop_shard()
+            self.show_warning("Work queue", f"The lease of shard {shard + 1} expired and another session took it.\n"
+                                            "Your landmarks are saved in the queue and will be merged.")
+
+    def finish_shard(self):
+        """Mark the shard finished and take the next one"""
+        if self.shard is None:
+            return
+        if not self.save_shard():
+            self.show_warning("Work queue", "The shard could not be saved, so it is not marked finished.")
+            return
+        shard = self.shard
+        try:
+            finished = self.work_queue.release(shard, done=True)
+        except OSError as e:
+            self.show_warning("Work queue", f"Could not mark shard {shard + 1} finished.\n{e}")
+            return
+        self.drop_shard()
+        if not finished:
+            self.show_warning("Work queue", f"The lease of shard {shard + 1} expired and another session took it, "
+                                            "so it is not marked finished.\n"
+                                            "Your landmarks are saved in the queue and will be merged.")
+            return
+        self.next_shard()
+
+    def leave_queue(self):
+        """Save and give back the leased shard (it stays open for other sessions)"""
+        if self.shard is not None:
+            if self.save_shard():
                 try:
-                    index = self.image_list.index(path)
-                    self.landmark[index] = landmark_paths[path]
+                    self.work_queue.release(self.shard)
+                except OSError:
+                    pass
+            self.drop_shard()
+        self.work_queue = None
+
+    def drop_shard(self):
+        self.lease_timer.stop()
+        self.shard, self.shard_ids, self.shard_mask = None, [], None
+        # shard 조건이 남아 있으면 아무 이미지도 일치하지 않으므로 기본 조건으로 되돌림
+        self.query.set_query(default_query if "shard" in self.query.text else self.query.text)
+        if self.filter_mode and self.dataset:
+            self.refresh_grid_rows()
+            self.update_right_view()
 
-                except Exception as e:
-                    QMessageBox.critical(self, "Error", f"Error loading label: {e}")
-            QMessageBox.information(self, "Success", "The landmarks are successfully loaded!")
+    def show_queue_status(self):
+        if self.work_queue is None:
+            self.statusBar().showMessage("not in a work queue")
+            return
+        try:
+            status = self.work_queue.status()
+        except OSError as e:
+            self.show_warning("Work queue", str(e))
+            return
+        states = [state for _, state, _ in status]
+        sessions = sorted({session for _, state, session in status if state == "leased"})
+        QMessageBox.information(
+            self, "Work queue",
+            f"{states.count('done')} finished, {states.count('leased')} leased, {states.count('expired')} expired, "
+            f"{states.count('open')} open of {len(status)} shards\n"
+            f"working: {', '.join(sessions) or '-'}"
+            + (f"\nthis session: shard {self.shard + 1}" if self.shard is not None else ""))
+
+    def import_landmark(self):
+        landmark_path = QFileDialog.getExistingDirectory(None, "select label root folder", self.dataset_folder, QFileDialog.ShowDirsOnly)
+        if landmark_path and self.label_import_worker is None:
+            # 라벨 파싱은 백그라운드에서, 진행 상황은 취소 가능한 progress dialog 로 표시
+            self.label_import_progress = QProgressDialog("Loading landmarks...", "Cancel", 0, 0, self)
+            self.label_import_progress.setWindowTitle("Import landmarks")
+            self.label_import_progress.setMinimumDuration(300)
+            self.label_import_worker = LabelImportWorker(landmark_path, self.dataset_folder, self.dataset, self)
+            self.label_import_worker.progress.connect(self.on_label_import_progress)
+            self.label_import_worker.import_finished.connect(self.on_label_import_finished)
+            self.label_import_progress.canceled.connect(self.label_import_worker.cancel)
+            self.import_landmark_action.setEnabled(False)
+            self.label_import_worker.start()
+
+    def on_label_import_progress(self, done, total):
+        self.label_import_progress.setMaximum(total)
+        self.label_import_progress.setValue(done)
+
+    def on_label_import_finished(self, labels, unmatched, errors, cancelled):
+        """Apply imported landmarks and report all problems in one summary dialog"""
+        self.label_import_worker = None
+        self.label_import_progress.reset()
+        self.import_landmark_action.setEnabled(True)
+        with profiler.span("apply_labels", files=len(labels)):
+            rejected = self.landmark.update(labels)
+        errors = errors + [(self.dataset.path_of_id(image_id), f"more than {max_landmarks} landmarks")
+                           for image_id in rejected]
+        self.checkpoint_journal()
+        self.query.update()
+        self.refresh_tree_counts()
+        if self.single_image_label is not None:
+            self.single_image_label.viewport().update()
+
+        state = "cancelled" if cancelled else "finished"
+        message = f"Landmark import {state}.\n{len(labels) - len(rejected)} label files loaded."
+        if unmatched:
+            message += f"\n{len(unmatched)} label files have no matching image."
+        if errors:
+            message += f"\n{len(errors)} label files could not be read."
+        box = QMessageBox(QMessageBox.Warning if unmatched or errors else QMessageBox.Information,
+                          "Import landmarks", message, QMessageBox.Ok, self)
+        if unmatched or errors:
+            # 상세 목록은 너무 길어지지 않도록 앞부분만 표시
+            details = [f"no image: {file}" for file in unmatched[:1000]]
+            details += [f"read error: {file} ({error})" for file, error in errors[:1000]]
+            if len(unmatched) > 1000 or len(errors) > 1000:
+                details.append("...")
+            box.setDetailedText("\n".join(details))
+        box.exec_()
@@ -0,0 +1,265 @@
+import math
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QRect, QRectF, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QImageIOHandler, QPixmap
+
+from profiler import traced
+from static import image_cache_mb, prefetch_ahead, prefetch_behind, tile_size, tile_full_decode_pixels
+
+
+@traced("decode")
+def read_image(path, clip=None, size=None):
+    """Decode an image; with clip (image coordinates) only that region, scaled to size if given"""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    if clip is not None:
+        reader.setClipRect(clip)
+    if size is not None:
+        reader.setScaledSize(size)
+    return reader.read()
+
+
+class ImagePyramid:
+    """
+    Tile layout of one image: level k is the image downscaled by 2**k, cut into tile_size squares.
+    Level k covers 2**k image pixels per tile pixel, so every level is addressed in image coordinates.
+
+    Region reads need a format plugin with clip rect support (JPEG, TIFF, ...). Small images, EXIF-rotated
+    images and formats without it are read as one tile per level; for those, levels larger than
+    tile_full_decode_pixels are skipped (zooming in past that level upscales), which keeps memory bounded.
+    """
+
+    def __init__(self, path, tile=tile_size):
+        self.path = path
+        reader = QImageReader(path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        rotated = reader.transformation() != QImageIOHandler.TransformationNone
+        # 축소 크기는 회전 전 (파일에 저장된 방향) 기준으로 지정해야 함
+        self.transposed = bool(rotated and reader.transformation() & QImageIOHandler.TransformationRotate90)
+        if self.transposed:
+            size.transpose()
+        self.width, self.height = max(0, size.width()), max(0, size.height())
+        self.tiled = (not rotated and reader.supportsOption(QImageIOHandler.ClipRect)
+                      and self.width * self.height > tile_full_decode_pixels)
+        self.tile = tile if self.tiled else max(self.width, self.height, 1)
+        self.levels = 1
+        while max(self.width, self.height) > tile * 2 ** (self.levels - 1):
+            self.levels += 1
+        self.min_level = 0
+        if not self.tiled:
+            while self.min_level < self.levels - 1 and \
+                    self.width * self.height > tile_full_decode_pixels * 4 ** self.min_level:
+                self.min_level += 1
+
+    def __bool__(self):
+        return self.width > 0 and self.height > 0
+
+    def level_size(self, level):
+        f = 2 ** level
+        return -(-self.width // f), -(-self.height // f)
+
+    def level_for_scale(self, scale):
+        """Coarsest level that still has at least one pixel per screen pixel at this zoom"""
+        level = int(math.floor(math.log2(1 / scale))) if 0 < scale < 1 else 0
+        return max(self.min_level, min(level, self.levels - 1))
+
+    def tiles(self, level, rect):
+        """(col, row) of the tiles of a level that intersect rect (image coordinates)"""
+        span = self.tile * 2 ** level
+        width, height = self.level_size(level)
+        columns, rows = -(-width // self.tile), -(-height // self.tile)
+        first_col, first_row = max(0, int(rect.left() // span)), max(0, int(rect.top() // span))
+        last_col = min(columns - 1, int(math.ceil(rect.right() / span)) - 1)
+        last_row = min(rows - 1, int(math.ceil(rect.bottom() / span)) - 1)
+        return [(col, row) for row in range(first_row, last_row + 1) for col in range(first_col, last_col + 1)]
+
+    def tile_rect(self, level, col, row):
+        """Area of one tile in image coordinates"""
+        span = self.tile * 2 ** level
+        x, y = col * span, row * span
+        return QRectF(x, y, min(span, self.width - x), min(span, self.height - y))
+
+    def read_tile(self, level, col, row):
+        width, height = self.level_size(level)
+        if not self.tiled:
+            # 디코더가 해당 레벨 크기로 바로 축소해서 읽음 (원본 해상도 이미지를 만들지 않음)
+            image = read_image(self.path, size=QSize(height, width) if self.transposed else QSize(width, height))
+            if image.isNull() or (image.width(), image.height()) == (width, height):
+                return image
+            return image.scaled(width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation)
+        # 보이는 영역만 원본 해상도 기준으로 잘라서, 해당 레벨 크기로 축소해 디코딩
+        x, y = col * self.tile, row * self.tile
+        size = QSize(min(self.tile, width - x), min(self.tile, height - y))
+        return read_image(self.path, self.tile_rect(level, col, row).toAlignedRect().intersected(
+            QRect(0, 0, self.width, self.height)), size)
+
+
+class DecodeTask(QRunnable):
+    def __init__(self, cache, pyramid, key):
+        super().__init__()
+        self.cache = cache
+        self.pyramid = pyramid
+        self.key = key
+
+    def run(self):
+        # 이미 화면에서 벗어났거나 다른 이미지로 이동했다면 디코딩하지 않음
+        if not self.cache._still_wanted(self.key):
+            return
+        _, level, col, row = self.key
+        image = self.pyramid.read_tile(level, col, row)
+        self.cache.decoded.emit(self.key, image)
+
+
+class DecodedImageCache(QObject):
+    """
+    Memory-bounded LRU cache of decoded image tiles (QPixmap), keyed by (path, level, col, row).
+    `request` decodes the tiles the view shows; `prefetch` decodes the overview level of the neighbours
+    of the current image, favouring the navigation direction.
+    """
+    decoded = pyqtSignal(object, QImage)
+    tile_ready = pyqtSignal(object)  # (path, level, col, row)
+    pyramid_limit = 64
+
+    def __init__(self, parent=None, budget_mb=image_cache_mb, ahead=prefetch_ahead, behind=prefetch_behind):
+        super().__init__(parent)
+        self.budget = budget_mb * 1024 * 1024
+        self.ahead = ahead
+        self.behind = behind
+        self.view_size = QSize(800, 600)  # 단일 뷰 크기, 미리 읽을 레벨 결정에 사용
+        self._pixmaps = OrderedDict()  # key -> QPixmap (최근 사용 순)
+        self._bytes = 0
+        self._pyramids = OrderedDict()  # 경로 -> ImagePyramid
+        self._lock = threading.Lock()
+        self._visible = set()  # 현재 화면에 필요한 tile (쫓아내지 않음)
+        self._prefetch = set()
+        self._queued = set()
+        self.pool = QThreadPool(self)
+        # 디코딩은 I/O 위주이므로 작은 풀로 충분
+        self.pool.setMaxThreadCount(2)
+        self.decoded.connect(self._on_decoded)
+
+    def pyramid(self, path):
+        pyramid = self._pyramids.get(path)
+        if pyramid is None:
+            pyramid = self._pyramids[path] = ImagePyramid(path)
+            while len(self._pyramids) > self.pyramid_limit:
+                self._pyramids.popitem(last=False)
+        else:
+            self._pyramids.move_to_end(path)
+        return pyramid
+
+    def get(self, key):
+        """Cached tile pixmap, or None"""
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(key)
+        return pixmap
+
+    def load(self, pyramid, level, col, row):
+        """Return a tile, decoding it synchronously on a cache miss"""
+        key = (pyramid.path, level, col, row)
+        pixmap = self.get(key)
+        if pixmap is None:
+            pixmap = QPixmap.fromImage(pyramid.read_tile(level, col, row))
+            self._insert(key, pixmap)
+        return pixmap
+
+    def overview_level(self, pyramid):
+        """Level shown when the whole image is fitted into the view"""
+        if not pyramid:
+            return 0
+        return pyramid.level_for_scale(min(1, self.view_size.width() / pyramid.width,
+                                           self.view_size.height() / pyramid.height))
+
+    def request(self, pyramid, level, tiles):
+        """Decode the given tiles in the background; tiles requested earlier and not listed are dropped"""
+        keys = [(pyramid.path, level, col, row) for col, row in tiles]
+        with self._lock:
+            self._visible = set(keys)
+        self._queue(pyramid, keys, priority=1)
+
+    def prefetch(self, dataset, index, direction=1, order=None):
+        """
+        Decode the overview of up to `ahead` images in the navigation direction and `behind` in the other.
+        `order` overrides the neighbour indexes (e.g. the next query matches in filtered navigation).
+        """
+        if order is None:
+            order = []
+            for step in range(1, max(self.ahead, self.behind) + 1):
+                if step <= self.ahead:
+                    order.append(index + direction * step)
+                if step <= self.behind:
+                    order.append(index - direction * step)
+        jobs = []
+        for i in order:
+            if 0 <= i < len(dataset):
+                pyramid = self.pyramid(dataset[i])
+                if pyramid:
+                    level = self.overview_level(pyramid)
+                    rect = QRectF(0, 0, pyramid.width, pyramid.height)
+                    jobs.append((pyramid, [(pyramid.path, level, c, r) for c, r in pyramid.tiles(level, rect)]))
+        with self._lock:
+            self._prefetch = {key for _, keys in jobs for key in keys}
+        for pyramid, keys in jobs:
+            self._queue(pyramid, keys, priority=0)
+
+    def clear(self):
+        with self._lock:
+            self._visible = set()
+            self._prefetch = set()
+        self.pool.clear()
+        with self._lock:
+            # 시작되지 않고 버려진 작업의 key 가 남아 있으면 같은 타일을 다시 요청할 수 없음
+            self._queued.clear()
+        self._pixmaps.clear()
+        self._pyramids.clear()
+        self._bytes = 0
+
+    def shutdown(self):
+        self.clear()
+        self.pool.waitForDone()
+
+    def _queue(self, pyramid, keys, priority):
+        for key in keys:
+            if key in self._pixmaps:
+                continue
+            with self._lock:
+                if key in self._queued:
+                    continue
+                self._queued.add(key)
+            self.pool.start(DecodeTask(self, pyramid, key), priority)
+
+    def _still_wanted(self, key):
+        with self._lock:
+            wanted = key in self._visible or key in self._prefetch
+            if not wanted:
+                self._queued.discard(key)
+            return wanted
+
+    def _on_decoded(self, key, image):
+        with self._lock:
+            self._queued.discard(key)
+        if not image.isNull() and key not in self._pixmaps:
+            # QPixmap 변환은 GUI 스레드에서만 가능
+            self._insert(key, QPixmap.fromImage(image))
+            self.tile_ready.emit(key)
+
+    def _insert(self, key, pixmap):
+        if key in self._pixmaps:
+            self._bytes -= self._pixmap_bytes(self._pixmaps.pop(key))
+        self._pixmaps[key] = pixmap
+        self._bytes += self._pixmap_bytes(pixmap)
+        # 오래된 것부터 삭제하되, 화면에 보이는 tile 과 미리 읽는 tile 은 유지
+        for old in list(self._pixmaps):
+            if self._bytes <= self.budget:
+                break
+            if old == key or old in self._visible or old in self._prefetch:
+                continue
+            self._bytes -= self._pixmap_bytes(self._pixmaps.pop(old))
+
+    @staticmethod
+    def _pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(1, pixmap.depth()) // 8
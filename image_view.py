@@ -0,0 +1,286 @@
+from PyQt5.QtCore import Qt, QPointF, QRect, QRectF, QTimer
+from PyQt5.QtGui import QPainter, QPen, QColor, QTransform
+from PyQt5.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsItem, QStyleOptionGraphicsItem
+
+from profiler import traced
+from static import color_list, compare_colors, max_zoom
+
+
+class TiledImageItem(QGraphicsItem):
+    """
+    Draw an image from cached pyramid tiles; scene coordinates are image pixel coordinates.
+    A preview item never decodes: it shows whatever level is cached, else the thumbnail (if given).
+    """
+
+    def __init__(self, cache, pyramid, preview=False, thumbnail=None):
+        super().__init__()
+        self.cache = cache
+        self.pyramid = pyramid
+        self.preview = preview
+        self.thumbnail = thumbnail
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+        # 가장 작은 레벨은 바로 디코딩해 두고, 세밀한 tile 이 오기 전까지 대신 그림
+        if pyramid and not preview:
+            cache.load(pyramid, pyramid.levels - 1, 0, 0)
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.pyramid.width, self.pyramid.height)
+
+    def level(self, painter):
+        return self.pyramid.level_for_scale(QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform()))
+
+    @traced("paint")
+    def paint(self, painter, option, widget=None):
+        if not self.pyramid:
+            return
+        level = self.level(painter)
+        for col, row in self.pyramid.tiles(level, option.exposedRect):
+            target = self.pyramid.tile_rect(level, col, row)
+            pixmap = self.cache.get((self.pyramid.path, level, col, row))
+            if pixmap is None:
+                self.paint_fallback(painter, level, target)
+            else:
+                painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
+
+    def paint_fallback(self, painter, level, target):
+        """Fill a missing tile from the finest coarser level that is cached"""
+        for coarse in range(level + 1, self.pyramid.levels):
+            tiles = self.pyramid.tiles(coarse, target)
+            pixmaps = [self.cache.get((self.pyramid.path, coarse, col, row)) for col, row in tiles]
+            if all(p is not None for p in pixmaps):
+                painter.save()
+                painter.setClipRect(target)
+                for (col, row), pixmap in zip(tiles, pixmaps):
+                    painter.drawPixmap(self.pyramid.tile_rect(coarse, col, row), pixmap, QRectF(pixmap.rect()))
+                painter.restore()
+                return
+        if self.thumbnail is not None:
+            # 캐시된 레벨이 없으면 썸네일의 같은 영역을 확대해서 그림
+            sx = self.thumbnail.width() / self.pyramid.width
+            sy = self.thumbnail.height() / self.pyramid.height
+            source = QRectF(target.x() * sx, target.y() * sy, target.width() * sx, target.height() * sy)
+            painter.drawPixmap(target, self.thumbnail, source)
+
+
+class ZoomableImageView(QGraphicsView):
+    """
+    Single image view with wheel zoom and right / middle button panning.
+    Only the tiles of the visible area are decoded, at the level matching the zoom; landmarks are stored
+    in image pixel coordinates and drawn as an overlay with a fixed on-screen size.
+    """
+    hit_radius = 6  # 화면 픽셀 기준, 이 거리 안을 누르면 기존 점을 드래그로 이동
+
+    def __init__(self, parent, cache, path, preview=False, thumbnail=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.pyramid = cache.pyramid(path)
+        self.setScene(QGraphicsScene(self))
+        self.item = TiledImageItem(cache, self.pyramid, preview, thumbnail)
+        self.scene().addItem(self.item)
+        self.setSceneRect(self.item.boundingRect())
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setResizeAnchor(QGraphicsView.AnchorViewCenter)
+        self.setRenderHint(QPainter.SmoothPixmapTransform)
+        self.setFrameShape(QGraphicsView.NoFrame)
+        # 이동은 드래그로 하므로 스크롤바는 숨김 (맞춤 배율이 스크롤바 유무에 따라 바뀌지 않도록)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.fitted = True  # 사용자가 확대/축소하기 전에는 창 크기에 맞춤
+        self.dragging = None  # 드래그 중인 점 번호
+        self.drag_start = []  # 드래그 시작 시점의 점 목록
+        self.pan_start = None
+
+        # 스크롤/확대가 끝난 뒤 보이는 tile 만 요청
+        self._request_timer = QTimer(self)
+        self._request_timer.setSingleShot(True)
+        self._request_timer.setInterval(0)
+        self._request_timer.timeout.connect(self.request_visible)
+        self.horizontalScrollBar().valueChanged.connect(self._request_timer.start)
+        self.verticalScrollBar().valueChanged.connect(self._request_timer.start)
+        cache.tile_ready.connect(self.on_tile_ready)
+
+    def set_image(self, path, preview=False, thumbnail=None):
+        """Show another image in this view (no widget rebuild); see TiledImageItem for preview"""
+        self.pyramid = self.cache.pyramid(path)
+        self.scene().removeItem(self.item)
+        self.item = TiledImageItem(self.cache, self.pyramid, preview, thumbnail)
+        self.scene().addItem(self.item)
+        self.setSceneRect(self.item.boundingRect())
+        self.dragging = None
+        self.fit()
+        self.viewport().update()
+
+    def points(self):
+        main_window = self.window()
+        return main_window.landmark.get(main_window.current_id)
+
+    def zoom(self):
+        return self.transform().m11()
+
+    def fit(self):
+        """Show the whole image (never enlarged beyond 1:1)"""
+        if not self.pyramid:
+            return
+        viewport = self.viewport().size()
+        scale = min(1, viewport.width() / self.pyramid.width, viewport.height() / self.pyramid.height)
+        self.setTransform(QTransform.fromScale(scale, scale))
+        self.centerOn(self.item)
+        self.fitted = True
+        self._request_timer.start()
+
+    def request_visible(self):
+        if not self.pyramid or self.item.preview:
+            # 미리보기 중에는 디코딩 요청을 보내지 않음 (입력이 멈추면 원래 화질로 다시 그림)
+            return
+        level = self.pyramid.level_for_scale(self.zoom())
+        visible = self.mapToScene(self.viewport().rect()).boundingRect()
+        self.cache.request(self.pyramid, level, self.pyramid.tiles(level, visible))
+
+    def on_tile_ready(self, key):
+        path, level, col, row = key
+        if path == self.pyramid.path:
+            self.item.update(self.pyramid.tile_rect(level, col, row))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.cache.view_size = self.viewport().size()
+        if self.fitted:
+            self.fit()
+        self._request_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.fitted:
+            self.fit()
+
+    def wheelEvent(self, event):
+        if not self.pyramid:
+            return
+        factor = 1.25 ** (event.angleDelta().y() / 120)
+        fit = min(1, self.viewport().width() / self.pyramid.width, self.viewport().height() / self.pyramid.height)
+        factor = max(fit / 2, min(max_zoom, self.zoom() * factor)) / self.zoom()
+        self.scale(factor, factor)
+        self.fitted = False
+        self._request_timer.start()
+
+    def to_image(self, pos):
+        """Viewport position -> integer image coordinates, or None if it is outside the image"""
+        point = self.mapToScene(pos)
+        x, y = int(point.x() // 1), int(point.y() // 1)
+        if not (0 <= x < self.pyramid.width and 0 <= y < self.pyramid.height):
+            return None
+        return x, y
+
+    def to_view(self, x, y):
+        """Centre of image pixel (x, y) in viewport coordinates"""
+        return self.mapFromScene(QPointF(x + 0.5, y + 0.5))
+
+    def hit_test(self, pos):
+        for i, (x, y) in enumerate(self.points()):
+            point = self.to_view(x, y)
+            if abs(point.x() - pos.x()) <= self.hit_radius and abs(point.y() - pos.y()) <= self.hit_radius:
+                return i
+        return None
+
+    def invalidate_points(self, points):
+        """Repaint only the area covered by the given landmarks (marker, number and box)"""
+        if not points:
+            return
+        region = QRect()
+        for x, y in points:
+            # 점 + 번호 텍스트 영역
+            point = self.to_view(x, y)
+            region = region.united(QRect(point.x() - 4, point.y() - 20, 32, 26))
+        if len(points) >= 7:
+            region = region.united(self.box_rect(points).adjusted(-2, -2, 2, 2))
+        self.viewport().update(region)
+
+    def box_rect(self, points):
+        """Box spanned by landmarks 6 and 7, in viewport coordinates"""
+        return QRect(self.to_view(*points[5]), self.to_view(*points[6])).normalized()
+
+    def mousePressEvent(self, event):
+        if event.button() in (Qt.RightButton, Qt.MiddleButton):
+            self.pan_start = event.pos()
+            self.viewport().setCursor(Qt.ClosedHandCursor)
+            return
+        if event.button() == Qt.LeftButton:
+            coords = self.to_image(event.pos())  # 클릭한 위치 (이미지 좌표)
+            main_window = self.window()
+            if coords is None or main_window.current_id is None or not hasattr(main_window, 'add_landmark'):
+                return
+            self.dragging = self.hit_test(event.pos())
+            self.drag_start = self.points()
+            if self.dragging is None:
+                # 상위 최상위 창의 add_landmark 메서드를 호출
+                main_window.add_landmark(coords, main_window.current_id)
+                self.invalidate_points(self.points())
+
+    def mouseMoveEvent(self, event):
+        if self.pan_start is not None:
+            delta = event.pos() - self.pan_start
+            self.pan_start = event.pos()
+            self.horizontalScrollBar().setValue(self.horizontalScrollBar().value() - delta.x())
+            self.verticalScrollBar().setValue(self.verticalScrollBar().value() - delta.y())
+            return
+        if self.dragging is None:
+            return
+        coords = self.to_image(event.pos())
+        if coords is None:
+            return
+        main_window = self.window()
+        before = list(self.points())
+        main_window.move_landmark(main_window.current_id, self.dragging, coords)
+        self.invalidate_points(before + self.points())
+
+    def mouseReleaseEvent(self, event):
+        if self.pan_start is not None:
+            self.pan_start = None
+            self.viewport().unsetCursor()
+            return
+        if self.dragging is not None:
+            # 드래그가 끝났을 때 한 번만 편집 기록
+            main_window = self.window()
+            main_window.landmark_moved(main_window.current_id, self.drag_start)
+        self.dragging = None
+
+    def drawForeground(self, painter, rect):
+        """Draw the landmarks on top of the image, at a fixed size whatever the zoom"""
+        main_window = self.window()
+        overlay = main_window.compare_overlay(main_window.current_id) if hasattr(main_window, "compare_overlay") else None
+        if overlay is not None:
+            self.draw_comparison(painter, *overlay)
+        points = self.points()
+        if not points:
+            return
+        painter.save()
+        painter.resetTransform()
+        for i, (x, y) in enumerate(points):
+            pen = QPen(QColor(*color_list[i]))
+            pen.setWidth(3)
+            painter.setPen(pen)
+            point = self.to_view(x, y)
+            painter.drawPoint(point)  # 저장된 좌표에 점 찍기
+            painter.drawText(point.x(), point.y() - 5, str(i + 1))
+            if i == 6:
+                painter.drawRect(self.box_rect(points))
+        painter.restore()
+
+    def draw_comparison(self, painter, points_a, points_b):
+        """Two label sets being compared: A as circles, B as crosses, matching points joined by a line"""
+        painter.save()
+        painter.resetTransform()
+        painter.setRenderHint(QPainter.Antialiasing)
+        color_a, color_b = (QColor(*color) for color in compare_colors)
+        painter.setPen(QPen(color_a, 1, Qt.DotLine))
+        for (xa, ya), (xb, yb) in zip(points_a, points_b):
+            painter.drawLine(self.to_view(xa, ya), self.to_view(xb, yb))
+        painter.setPen(QPen(color_a, 2))
+        for x, y in points_a:
+            painter.drawEllipse(QPointF(self.to_view(x, y)), 6, 6)
+        painter.setPen(QPen(color_b, 2))
+        for x, y in points_b:
+            point = self.to_view(x, y)
+            painter.drawLine(point.x() - 5, point.y() - 5, point.x() + 5, point.y() + 5)
+            painter.drawLine(point.x() - 5, point.y() + 5, point.x() + 5, point.y() - 5)
+        painter.restore()
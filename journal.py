@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from static import cache_dir, max_landmarks
+
+
+def session_folder(dataset_root):
+    """Per-dataset folder for session files (journal, snapshot, ...) under the user cache directory"""
+    key = hashlib.sha1(dataset_root.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir, "sessions", key)
+
+
+class AnnotationJournal:
+    """
+    Append-only log of landmark edits for one dataset, used for autosave and crash recovery.
+
+    Every edit appends one JSON line with the image's relative path and its full point list
+    (so replay is idempotent). Lines are buffered and written + fsync'ed in batches; `compact`
+    folds the log into a snapshot .npz and truncates it. The journal also keeps the undo/redo
+    history of the session and the dirty state used by incremental export.
+    """
+    history_limit = 10000
+
+    def __init__(self, folder, dataset, dataset_root, sync_every=64):
+        self.folder = folder
+        self.dataset = dataset
+        self.dataset_root = dataset_root
+        self.sync_every = sync_every
+        self.path = os.path.join(folder, "journal.log")
+        self.snapshot_path = os.path.join(folder, "snapshot.npz")
+        self.state_path = os.path.join(folder, "state.json")
+        self.records = 0  # 마지막 compaction 이후 기록 수
+        self.last_export = None  # 마지막으로 .txt 를 내보낸 폴더
+        self._buffer = []
+        self._carried = {}  # 데이터셋에 (아직) 없는 이미지의 랜드마크 (스캔이 취소된 경우), 상대 경로 -> 점 목록
+        self._undo = []  # (image id, before, after)
+        self._redo = []
+        os.makedirs(folder, exist_ok=True)
+
+    def _relative(self, image_id):
+        return os.path.relpath(self.dataset.path_of_id(image_id), self.dataset_root)
+
+    def _image_id(self, relative):
+        return self.dataset.id_of(os.path.normcase(os.path.join(self.dataset_root, relative)))
+
+    def replay(self, store):
+        """
+        Restore the snapshot and re-apply the journal on top of it; returns the number of edits replayed.
+        Edits made before the replay (e.g. during the scan) are written out first so they are re-applied last.
+        Landmarks of images that are not in the dataset (cancelled scan) are kept for the next `compact`.
+        """
+        self.flush()
+        self.records = 0
+        self._carried = {}
+        dirty = set()
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.last_export = state.get("last_export")
+            dirty = {i for i in map(self._image_id, state.get("dirty", [])) if i is not None}
+        if os.path.exists(self.snapshot_path):
+            unmatched = store.load(self.snapshot_path, self.dataset, self.dataset_root)
+            if unmatched:
+                with np.load(self.snapshot_path) as data:
+                    rows = {relative: row for row, relative in enumerate(data["paths"].tolist())}
+                    points, counts = data["points"], data["counts"]
+                    for relative in unmatched:
+                        row = rows[relative]
+                        self._carried[relative] = [tuple(p) for p in points[row][:counts[row]].tolist()]
+
+        replayed = 0
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 비정상 종료로 마지막 줄이 잘린 경우
+                        break
+                    if "export" in record:
+                        self.last_export = record["export"]
+                        dirty.clear()
+                        continue
+                    image_id = self._image_id(record["path"])
+                    if image_id is None:
+                        self._carried[record["path"]] = [tuple(p) for p in record["points"]]
+                        self.records += 1
+                        continue
+                    store.set(image_id, [tuple(p) for p in record["points"]])
+                    dirty.add(image_id)
+                    replayed += 1
+                    self.records += 1
+        store.dirty = dirty
+        return replayed
+
+    def record(self, image_id, before, after, undoable=True):
+        """Log an edit of one image (full point lists before / after) and push it to the undo history"""
+        self._append({"path": self._relative(image_id), "points": [list(p) for p in after]})
+        if undoable:
+            self._undo.append((image_id, list(before), list(after)))
+            del self._undo[:-self.history_limit]
+            self._redo.clear()
+
+    def record_export(self, folder):
+        self.last_export = folder
+        self._append({"export": folder})
+
+    def _append(self, record):
+        self._buffer.append(json.dumps(record, ensure_ascii=False) + "\n")
+        self.records += 1
+        if len(self._buffer) >= self.sync_every:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records and fsync them"""
+        if not self._buffer:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.writelines(self._buffer)
+            f.flush()
+            os.fsync(f.fileno())
+        self._buffer.clear()
+
+    def compact(self, store):
+        """Fold everything into snapshot.npz + state.json and truncate the journal"""
+        self.flush()
+        tmp_path = self.snapshot_path + ".tmp"
+        self._save_snapshot(tmp_path, store)
+        os.replace(tmp_path, self.snapshot_path)
+        state = {"last_export": self.last_export, "dirty": [self._relative(i) for i in sorted(store.dirty)]}
+        with open(self.state_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(self.state_path + ".tmp", self.state_path)
+        # 스냅샷이 안전하게 기록된 뒤에만 저널을 비움
+        open(self.path, "w").close()
+        self.records = 0
+
+    def _save_snapshot(self, path, store):
+        """store.save, plus the carried landmarks of images that are still not in the dataset"""
+        carried = {relative: points for relative, points in self._carried.items()
+                   if points and self._image_id(relative) is None}
+        if not carried:
+            store.save(path, self.dataset, self.dataset_root)
+            return
+        ids = store.ids()
+        paths = [self._relative(i) for i in ids.tolist()] + list(carried)
+        points = np.zeros((len(carried), max_landmarks, 2), store.points.dtype)
+        counts = np.zeros(len(carried), store.counts.dtype)
+        for row, point_list in enumerate(carried.values()):
+            points[row, :len(point_list)] = point_list
+            counts[row] = len(point_list)
+        with open(path, "wb") as f:
+            np.savez(f, paths=np.array(paths, dtype=str), points=np.concatenate([store.points[ids], points]),
+                     counts=np.concatenate([store.counts[ids], counts]))
+
+    def undo(self, image_id):
+        """Points of image_id before its latest edit (None if there is nothing to undo); the undo is journaled"""
+        return self._step(image_id, self._undo, self._redo, before=True)
+
+    def redo(self, image_id):
+        return self._step(image_id, self._redo, self._undo, before=False)
+
+    def _step(self, image_id, source, target, before):
+        for i in range(len(source) - 1, -1, -1):
+            if source[i][0] == image_id:
+                entry = source.pop(i)
+                target.append(entry)
+                points = entry[1] if before else entry[2]
+                self._append({"path": self._relative(image_id), "points": [list(p) for p in points]})
+                return points
+        return None
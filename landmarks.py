@@ -0,0 +1,158 @@
+import os
+
+import numpy as np
+
+from static import max_landmarks
+
+
+class LandmarkStore:
+    """
+    Landmarks of every image in one (capacity x max_landmarks x 2) int32 array, indexed by image id.
+    counts[i] is the number of valid points of image i (points are always filled from the front),
+    `mask()` expands it to a per-point validity mask.
+    """
+
+    def __init__(self, capacity=0):
+        self.points = np.zeros((capacity, max_landmarks, 2), np.int32)
+        self.counts = np.zeros(capacity, np.uint8)
+        self.dirty = set()  # 마지막 .txt 내보내기 이후 바뀐 image id
+
+    def __len__(self):
+        """Number of images with at least one landmark"""
+        return int(np.count_nonzero(self.counts))
+
+    def __contains__(self, image_id):
+        return image_id < len(self.counts) and self.counts[image_id] > 0
+
+    def _ensure(self, image_id):
+        if image_id < len(self.counts):
+            return
+        capacity = max(image_id + 1, len(self.counts) * 2, 1024)
+        points = np.zeros((capacity, max_landmarks, 2), np.int32)
+        counts = np.zeros(capacity, np.uint8)
+        points[:len(self.points)] = self.points
+        counts[:len(self.counts)] = self.counts
+        self.points, self.counts = points, counts
+
+    def get(self, image_id):
+        """Landmarks of an image as [(x, y), ...] (empty list if none)"""
+        if image_id is None or image_id >= len(self.counts):
+            return []
+        return [tuple(p) for p in self.points[image_id, :self.counts[image_id]].tolist()]
+
+    def count(self, image_id):
+        return int(self.counts[image_id]) if image_id < len(self.counts) else 0
+
+    def set(self, image_id, points):
+        if len(points) > max_landmarks:
+            raise ValueError(f"{len(points)} landmarks (max {max_landmarks})")
+        self._ensure(image_id)
+        self.points[image_id] = 0
+        if points:
+            self.points[image_id, :len(points)] = points
+        self.counts[image_id] = len(points)
+        self.dirty.add(image_id)
+
+    def add(self, image_id, point):
+        """Append a point; returns False if the image already has max_landmarks points"""
+        self._ensure(image_id)
+        n = self.counts[image_id]
+        if n >= max_landmarks:
+            return False
+        self.points[image_id, n] = point
+        self.counts[image_id] = n + 1
+        self.dirty.add(image_id)
+        return True
+
+    def move(self, image_id, point_index, point):
+        self.points[image_id, point_index] = point
+        self.dirty.add(image_id)
+
+    def pop(self, image_id):
+        """Remove and return the last point, or None"""
+        n = self.count(image_id)
+        if n == 0:
+            return None
+        point = tuple(self.points[image_id, n - 1].tolist())
+        self.points[image_id, n - 1] = 0
+        self.counts[image_id] = n - 1
+        self.dirty.add(image_id)
+        return point
+
+    def update(self, labels):
+        """Set many images from {image id: points}; returns the ids that were rejected (too many points)"""
+        rejected = []
+        for image_id, points in labels.items():
+            try:
+                self.set(image_id, points)
+            except ValueError:
+                rejected.append(image_id)
+        return rejected
+
+    def ids(self):
+        """Ids of images that have landmarks"""
+        return np.flatnonzero(self.counts)
+
+    def items(self):
+        for image_id in self.ids().tolist():
+            yield image_id, self.get(image_id)
+
+    def mask(self):
+        """(capacity x max_landmarks) bool array, True where a point is set"""
+        return np.arange(max_landmarks)[None, :] < self.counts[:, None]
+
+    def save(self, path, dataset, dataset_root, ids=None):
+        """
+        Write all landmarks (or those of the given labeled ids) to one .npz: relative image paths, points and
+        counts of the labeled images. Paths are relative to dataset_root so the file can be reopened on another machine.
+        """
+        ids = self.ids() if ids is None else np.asarray(ids, np.int64)
+        paths = np.array([os.path.relpath(dataset.path_of_id(i), dataset_root) for i in ids.tolist()], dtype=str)
+        with open(path, "wb") as f:
+            np.savez(f, paths=paths, points=self.points[ids], counts=self.counts[ids])
+
+    def load(self, path, dataset, dataset_root):
+        """
+        Merge landmarks from a .npz written by `save`.
+        Returns the relative paths that are not in the dataset.
+        """
+        unmatched = []
+        with np.load(path) as data:
+            paths, points, counts = data["paths"], data["points"], data["counts"]
+            ids = np.full(len(paths), -1, np.int64)
+            for row, relative in enumerate(paths.tolist()):
+                image_id = dataset.id_of(os.path.normcase(os.path.join(dataset_root, relative)))
+                if image_id is None:
+                    unmatched.append(relative)
+                else:
+                    ids[row] = image_id
+            found = ids >= 0
+            if found.any():
+                self._ensure(int(ids.max()))
+                self.points[ids[found]] = points[found]
+                self.counts[ids[found]] = counts[found]
+                self.dirty.update(ids[found].tolist())
+        return unmatched
+
+    def export_txt(self, output_folder, dataset, dataset_root, ids=None):
+        """
+        Write one "x1 y1 x2 y2 ..." .txt per image, mirroring the dataset layout under output_folder.
+        Images whose landmarks were all removed get their stale .txt deleted.
+        Returns the number of files written.
+        """
+        written = 0
+        for image_id in (self.ids().tolist() if ids is None else ids):
+            image_path = dataset.path_of_id(image_id)
+            relative = os.path.splitext(os.path.relpath(image_path, dataset_root))[0] + ".txt"
+            save_path = os.path.join(output_folder, relative)
+            points = self.get(image_id)
+            if not points:
+                if os.path.exists(save_path):
+                    os.remove(save_path)
+                continue
+            # 저장할 폴더가 존재하지 않으면 생성
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            with open(save_path, "w", encoding="utf-8") as file:
+                file.write(' '.join(f"{x} {y}" for x, y in points) + '\n')
+            written += 1
+        return written
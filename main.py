@@ -1,12 +1,20 @@
 import sys
-from PyQt5.QtWidgets import QApplication
-from gui import ImageViewer
 
 
 def main():
+    if len(sys.argv) > 1:
+        # 인자가 있으면 GUI 없이 CLI 로 실행 (Qt 를 import 하지 않음)
+        from cli import main as cli_main
+        sys.exit(cli_main(sys.argv[1:]))
+
+    from PyQt5.QtWidgets import QApplication
+    from gui import ImageViewer
+
     app = QApplication(sys.argv)
     window = ImageViewer()
     window.show()
+    # 지난번에 열었던 데이터셋 폴더를 다시 엶 (scan manifest 가 있으면 전체 스캔 없이)
+    window.open_last_folder()
     sys.exit(app.exec_())
 
 
@@ -0,0 +1,117 @@
+"""
+Persistent scan result of a dataset, so reopening it does not walk the whole tree again (no Qt import).
+
+manifest.npz in the dataset's session folder holds the DatasetIndex state (sorted paths with their ids),
+the mtime of every scanned directory and the last viewing position. On reopen only the directories are
+stat'ed; those whose mtime changed are re-listed with core.scan_delta.
+"""
+import json
+import os
+
+import numpy as np
+
+from core import directory_mtimes, image_exts, scan_delta
+from dataset import DatasetIndex
+from static import cache_dir
+
+manifest_version = 1
+
+
+def pack_strings(strings):
+    """Strings -> uint8 array for np.savez (no pickling)"""
+    # 경로에는 NUL 이 들어갈 수 없으므로 구분자로 사용
+    return np.frombuffer("\0".join(strings).encode("utf-8"), np.uint8)
+
+
+def unpack_strings(blob):
+    text = blob.tobytes().decode("utf-8")
+    return text.split("\0") if text else []
+
+
+class ScanManifest:
+    """manifest.npz of one dataset root inside its session folder"""
+
+    def __init__(self, folder, root):
+        self.path = os.path.join(folder, "manifest.npz")
+        self.root = root
+
+    def save(self, dataset, mtimes, position=None):
+        """Write the index, the directory mtimes it was built from and the viewing position (atomic)"""
+        dirs, names, dir_of, order = dataset.state()
+        meta = {"version": manifest_version, "root": self.root, "position": position or {}}
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, meta=np.frombuffer(json.dumps(meta).encode("utf-8"), np.uint8),
+                     dirs=pack_strings(dirs), names=pack_strings(names),
+                     dir_of=np.frombuffer(dir_of, np.uint32), order=np.frombuffer(order, np.uint32),
+                     scan_dirs=pack_strings(mtimes), scan_mtimes=np.fromiter(mtimes.values(), np.int64, len(mtimes)))
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """(DatasetIndex, {directory: mtime}, position) as saved, or None if missing, unreadable or stale format"""
+        try:
+            with np.load(self.path) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                if meta.get("version") != manifest_version or meta.get("root") != self.root:
+                    return None
+                names = unpack_strings(data["names"])
+                dir_of, order = data["dir_of"], data["order"]
+                if len(dir_of) != len(names):
+                    return None
+                dataset = DatasetIndex.from_state(unpack_strings(data["dirs"]), names, dir_of.tolist(), order.tolist())
+                mtimes = dict(zip(unpack_strings(data["scan_dirs"]), data["scan_mtimes"].tolist()))
+        except (OSError, KeyError, ValueError, IndexError):
+            return None
+        return dataset, mtimes, meta.get("position", {})
+
+    def revalidate(self, exts=image_exts):
+        """
+        Load the manifest and bring it up to date: stat every recorded directory and re-list only the changed ones.
+        Returns (DatasetIndex, {directory: mtime}, position, (added, removed, re-listed directories)), or None
+        when there is no usable manifest (or the root itself is gone) and a full scan is needed.
+        """
+        loaded = self.load()
+        if loaded is None:
+            return None
+        dataset, mtimes, position = loaded
+        current = directory_mtimes(list(mtimes))
+        if current.get(self.root) is None:
+            return None
+        changed = [d for d, mtime in current.items() if mtime is not None and mtime != mtimes[d]]
+        known = {d: dataset.names_in(d) for d in changed}
+        added, removed, new_dirs, gone_dirs = scan_delta(changed, known, set(mtimes), exts, mtimes=mtimes)
+
+        # 사라진 폴더 (부모 폴더의 변경으로 발견됨) 의 이미지와 기록 정리
+        gone = set(gone_dirs) | {d for d, mtime in current.items() if mtime is None}
+        removed_ids = [i for i in map(dataset.id_of, removed) if i is not None]
+        for directory in gone:
+            removed_ids.extend(dataset.ids_under(directory))
+            prefix = os.path.join(directory, "")
+            for d in [d for d in mtimes if d == directory or d.startswith(prefix)]:
+                del mtimes[d]
+        dataset.remove(removed_ids)
+        dataset.insert(added)
+        return dataset, mtimes, position, (len(added), len(set(removed_ids)), len(changed))
+
+
+def _last_folder_path():
+    return os.path.join(cache_dir, "sessions", "last_folder.json")
+
+
+def last_folder():
+    """Dataset folder opened last time, or None"""
+    try:
+        with open(_last_folder_path(), "r", encoding="utf-8") as f:
+            folder = json.load(f).get("folder")
+    except (OSError, ValueError):
+        return None
+    return folder if folder and os.path.isdir(folder) else None
+
+
+def remember_folder(folder):
+    path = _last_folder_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"folder": folder}, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
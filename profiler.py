@@ -0,0 +1,145 @@
+"""
+Opt-in timing instrumentation for the hot paths (no Qt import).
+
+    from profiler import profiler, traced
+
+    @traced("decode")
+    def read_image(path): ...
+
+    with profiler.span("export_txt", files=n): ...
+
+While `profiler.enabled` is False a traced call costs one attribute check. When enabled, every span is
+kept in a rolling window per name (for the p50 / p99 status bar HUD) and as a Chrome trace event;
+`write_trace` saves the events as JSON that chrome://tracing and ui.perfetto.dev can open.
+Setting EASYBASE_PROFILE=trace.json enables it at startup and names the trace written on exit.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from static import profile_window, profile_trace_events
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_null_span = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class Profiler:
+    def __init__(self, window=profile_window, max_events=profile_trace_events):
+        self.enabled = False
+        self.trace_path = None  # 종료할 때 trace 를 저장할 경로 (환경 변수로 지정한 경우)
+        self.window = window
+        self.max_events = max_events
+        self._lock = threading.Lock()
+        self._samples = {}  # 이름 -> 최근 소요 시간 (ns)
+        self._events = []  # Chrome trace 이벤트
+        self._dropped = 0
+        self._origin = time.perf_counter_ns()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def span(self, name, **args):
+        """Context manager timing its body; a shared no-op object while disabled"""
+        if not self.enabled:
+            return _null_span
+        return _Span(self, name, args)
+
+    def record(self, name, start_ns, end_ns, args=None):
+        event = {"name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                 "ts": (start_ns - self._origin) / 1000, "dur": (end_ns - start_ns) / 1000}
+        if args:
+            event["args"] = args
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(end_ns - start_ns)
+            if len(self._events) < self.max_events:
+                self._events.append(event)
+            else:
+                self._dropped += 1
+
+    def stats(self):
+        """{name: (count, p50 ms, p99 ms)} over the rolling window"""
+        with self._lock:
+            snapshot = {name: sorted(samples) for name, samples in self._samples.items()}
+        result = {}
+        for name, samples in snapshot.items():
+            if samples:
+                n = len(samples)
+                result[name] = (n, samples[n // 2] / 1e6, samples[min(n - 1, int(n * 0.99))] / 1e6)
+        return result
+
+    def summary(self):
+        """One line for the status bar: "name p50/p99 ms" per span name"""
+        return "  ".join(f"{name} {p50:.1f}/{p99:.1f}ms" for name, (_, p50, p99) in sorted(self.stats().items()))
+
+    def write_trace(self, path):
+        """Save the recorded spans in Chrome trace format; returns the number of events"""
+        with self._lock:
+            events = list(self._events)
+            dropped = self._dropped
+        tids = {event["tid"] for event in events}
+        metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                     "args": {"name": "main" if tid == threading.main_thread().ident else f"worker-{tid}"}}
+                    for tid in tids]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms",
+                       "otherData": {"dropped_events": dropped}}, f)
+        return len(events)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._events.clear()
+            self._dropped = 0
+
+
+profiler = Profiler()
+if os.environ.get("EASYBASE_PROFILE"):
+    profiler.trace_path = os.environ["EASYBASE_PROFILE"]
+    profiler.enable()
+
+
+def traced(name):
+    """Decorator recording each call as a span called name (only while the profiler is enabled)"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.record(name, start, time.perf_counter_ns())
+        return wrapper
+    return decorate
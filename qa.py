@@ -0,0 +1,154 @@
+"""
+Dataset-wide landmark checks, vectorized over all labeled images (no Qt import).
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from core import image_size
+from static import max_landmarks, qa_outlier_z, qa_procrustes_iterations, qa_swap_ratio
+
+# 문제 종류 (bit flag)
+OUTLIER = 1  # Procrustes 정렬 후 평균 형태에서 크게 벗어난 점이 있음
+SWAPPED = 2  # 두 점의 순서를 바꾸면 평균 형태에 훨씬 잘 맞음
+NEGATIVE_BOX = 4  # 7번 점이 6번 점의 오른쪽 아래가 아님 (박스 크기가 0 이하)
+OUT_OF_IMAGE = 8  # 음수 또는 이미지 크기를 넘는 좌표
+issue_names = {OUTLIER: "outlier", SWAPPED: "swapped order", NEGATIVE_BOX: "negative box",
+               OUT_OF_IMAGE: "out of image"}
+
+
+def describe(issues):
+    """Issue bit flags -> "outlier, negative box" """
+    return ", ".join(name for flag, name in issue_names.items() if issues & flag)
+
+
+def image_sizes(paths, cancel=None, workers=16):
+    """(n x 2) int array of (width, height) read from the image headers; -1 where unknown"""
+    def read(path):
+        if cancel is not None and cancel.is_set():
+            return None
+        return image_size(path)
+
+    sizes = np.full((len(paths), 2), -1, np.int64)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for row, size in enumerate(executor.map(read, paths, chunksize=256)):
+            if size is not None:
+                sizes[row] = size
+    return sizes
+
+
+def procrustes(shapes, iterations=qa_procrustes_iterations):
+    """
+    Generalized Procrustes alignment of (n x k x 2) shapes: translation, scale and rotation (no reflection).
+    Returns (aligned shapes, mean shape), both centred with unit norm.
+    """
+    shapes = shapes - shapes.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(shapes, axis=(1, 2), keepdims=True)
+    shapes = shapes / np.where(norms > 0, norms, 1)
+    mean = np.median(shapes, axis=0)
+    aligned = shapes
+    for _ in range(max(1, iterations)):
+        mean = mean / (np.linalg.norm(mean) or 1)
+        # 2D 회전은 닫힌 형태로 계산: 평균 형태와의 내적을 최대로 하는 각도
+        dot = np.einsum("nkd,kd->n", shapes, mean)
+        cross = shapes[..., 0] @ mean[:, 1] - shapes[..., 1] @ mean[:, 0]
+        angle = np.arctan2(cross, dot)
+        cos, sin = np.cos(angle)[:, None], np.sin(angle)[:, None]
+        aligned = np.stack([shapes[..., 0] * cos - shapes[..., 1] * sin,
+                            shapes[..., 0] * sin + shapes[..., 1] * cos], axis=-1)
+        mean = aligned.mean(axis=0)
+    return aligned, mean / (np.linalg.norm(mean) or 1)
+
+
+class LandmarkReport:
+    """
+    Result of `analyze`: suspicious images, most suspicious first, and the per-point statistics.
+    ids / issues / scores / worst_point are parallel arrays; scores is the largest robust z-score of the
+    image's points (0 for incomplete labels), worst_point that point's 0-based number (-1 if unknown).
+    """
+
+    def __init__(self, ids, issues, scores, worst_point, mean_shape, spread, labeled, complete):
+        self.ids = ids
+        self.issues = issues
+        self.scores = scores
+        self.worst_point = worst_point
+        self.mean_shape = mean_shape  # 정렬된 평균 형태 (max_landmarks x 2), 완성된 라벨이 없으면 None
+        self.spread = spread  # 점별 평균 형태로부터의 RMS 거리 (정규화 좌표)
+        self.labeled = labeled
+        self.complete = complete
+
+    def __len__(self):
+        return len(self.ids)
+
+    def summary(self):
+        text = f"{self.labeled} labeled ({self.complete} complete), {len(self)} suspicious"
+        if self.spread is not None:
+            text += "; spread per point: " + " ".join(f"{i + 1}:{s:.3f}" for i, s in enumerate(self.spread.tolist()))
+        return text
+
+
+def analyze(ids, points, counts, sizes=None, outlier_z=qa_outlier_z, swap_ratio=qa_swap_ratio):
+    """
+    Check the landmarks of many images at once.
+    ids (n), points (n x max_landmarks x 2), counts (n) as stored in LandmarkStore; sizes (n x 2, -1 = unknown).
+    """
+    ids = np.asarray(ids)
+    points = np.asarray(points, np.float64)
+    counts = np.asarray(counts)
+    n = len(ids)
+    issues = np.zeros(n, np.uint8)
+    scores = np.zeros(n)
+    worst = np.full(n, -1, np.int64)
+    valid = np.arange(max_landmarks)[None, :] < counts[:, None]
+
+    # 이미지 밖 좌표 (크기를 모르면 음수 좌표만)
+    outside = (points < 0).any(axis=2)
+    if sizes is not None:
+        sizes = np.asarray(sizes)
+        known = (sizes >= 0).all(axis=1)[:, None]
+        outside |= known & ((points[..., 0] >= sizes[:, None, 0]) | (points[..., 1] >= sizes[:, None, 1]))
+    outside &= valid
+    issues[outside.any(axis=1)] |= OUT_OF_IMAGE
+
+    # 6, 7번 점 박스: 7번 점이 오른쪽 아래에 있어야 함
+    complete = counts >= max_landmarks
+    box = points[:, 6] - points[:, 5]
+    issues[complete & (box <= 0).any(axis=1)] |= NEGATIVE_BOX
+
+    mean_shape = spread = None
+    full = np.flatnonzero(complete)
+    if len(full) >= 3:
+        aligned, mean_shape = procrustes(points[full])
+        residual = np.linalg.norm(aligned - mean_shape, axis=2)  # (완성된 이미지 x 점)
+        spread = np.sqrt((residual ** 2).mean(axis=0))
+        # 점별 median / MAD 로 robust z-score (이상치 자체가 통계를 끌어올리지 않도록)
+        median = np.median(residual, axis=0)
+        mad = np.median(np.abs(residual - median), axis=0) * 1.4826
+        z = (residual - median) / np.where(mad > 0, mad, 1e-9)
+        worst[full] = z.argmax(axis=1)
+        z_max = z.max(axis=1)
+        scores[full] = np.maximum(z_max, 0)
+        issues[full[z_max > outlier_z]] |= OUTLIER
+
+        # 순서가 바뀐 점: 두 점을 맞바꾸면 오차가 swap_ratio 배 이하로 줄고, 바꾼 두 점이 모두 정상 범위인 쌍
+        # (한 점만 크게 틀린 경우는 이상치로 남김)
+        limit = median + outlier_z * np.where(mad > 0, mad, 1e-9)
+        # 점 단위로 연속된 배열로 바꿔 두고 쌍마다 1차원 연산만 수행
+        xs, ys = np.ascontiguousarray(aligned[..., 0].T), np.ascontiguousarray(aligned[..., 1].T)
+        squared = np.ascontiguousarray((residual ** 2).T)
+        for i in range(max_landmarks):
+            for j in range(i + 1, max_landmarks):
+                i_at_j = np.hypot(xs[i] - mean_shape[j, 0], ys[i] - mean_shape[j, 1])
+                j_at_i = np.hypot(xs[j] - mean_shape[i, 0], ys[j] - mean_shape[i, 1])
+                current = squared[i] + squared[j]
+                hit = ((i_at_j ** 2 + j_at_i ** 2 < swap_ratio * current)
+                       & (i_at_j <= limit[j]) & (j_at_i <= limit[i]))
+                issues[full[hit]] |= SWAPPED
+                worst[full[hit]] = i
+
+    # 확실한 오류 (순서, 박스, 범위) 를 먼저, 각각 z-score 가 큰 순서로
+    hard = (issues & (SWAPPED | NEGATIVE_BOX | OUT_OF_IMAGE)) > 0
+    suspicious = np.flatnonzero(issues)
+    order = suspicious[np.lexsort((-scores[suspicious], ~hard[suspicious]))]
+    return LandmarkReport(ids[order], issues[order], scores[order], worst[order], mean_shape, spread,
+                          n, int(complete.sum()))
@@ -0,0 +1,50 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from qa import describe
+
+
+class LandmarkReportModel(QAbstractTableModel):
+    """Rows of a qa.LandmarkReport (most suspicious first); Qt.UserRole gives the image id"""
+    headers = ("score", "issues", "point", "path")
+
+    def __init__(self, viewer, parent=None):
+        super().__init__(parent)
+        self.viewer = viewer
+        self.report = None
+
+    def set_report(self, report):
+        self.beginResetModel()
+        self.report = report
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self.report is None:
+            return 0
+        return len(self.report)
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.headers[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        image_id = int(self.report.ids[row])
+        if role == Qt.UserRole:
+            return image_id
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        column = index.column()
+        if column == 0:
+            return f"{self.report.scores[row]:.1f}"
+        if column == 1:
+            return describe(int(self.report.issues[row]))
+        if column == 2:
+            point = int(self.report.worst_point[row])
+            return str(point + 1) if point >= 0 else ""
+        return self.viewer.dataset.path_of_id(image_id)
@@ -0,0 +1,179 @@
+"""
+Image queries over the dataset index, landmark store and selection (no Qt import).
+
+A query is one or more terms joined with "&"; a leading "!" negates a term:
+
+    unlabeled        no landmarks
+    incomplete       some, but fewer than max_landmarks landmarks
+    complete         all max_landmarks landmarks
+    labeled          at least one landmark
+    checked          in the check list
+    duplicate        near-duplicate of an earlier image (all but the first of a cluster, see dedup.py)
+    shard            in the shard leased from the work queue (see workqueue.py)
+    glob:PATTERN     fnmatch on the full path (e.g. glob:*/left/*.png)
+    re:PATTERN       regular expression searched in the full path
+
+e.g. "!complete & !checked", "incomplete & re:cam0[12]" or "!complete & !duplicate".
+"""
+import fnmatch
+import re
+
+import numpy as np
+
+from static import max_landmarks
+
+
+def parse_query(text):
+    """Query text -> [(negate, kind, argument)]; raises ValueError for unknown terms"""
+    terms = []
+    for part in text.split("&"):
+        part = part.strip()
+        negate = part.startswith("!")
+        if negate:
+            part = part[1:].strip()
+        if part in ("unlabeled", "incomplete", "complete", "labeled", "checked", "duplicate", "shard"):
+            terms.append((negate, part, None))
+        elif part.startswith("glob:"):
+            # fnmatch 패턴도 미리 정규식으로 변환해 두고 경로마다 match 만 호출
+            terms.append((negate, "glob", re.compile(fnmatch.translate(part[5:]))))
+        elif part.startswith("re:"):
+            try:
+                terms.append((negate, "re", re.compile(part[3:])))
+            except re.error as e:
+                raise ValueError(f"invalid regular expression {part[3:]!r}: {e}")
+        else:
+            raise ValueError(f"unknown query term: {part!r}")
+    return terms
+
+
+class QueryIndex:
+    """
+    Sorted display positions of the images matching a query.
+    The positions are built once with numpy and then kept up to date per image (`update`), so
+    "next / previous match" is a binary search. `invalidate` after the dataset is re-ordered.
+    `source` is anything with `dataset`, `landmark`, `checked`, `redundant` and `shard_mask` attributes (the viewer).
+    """
+
+    def __init__(self, source, text="!complete"):
+        self.source = source
+        self.text = text
+        self.terms = parse_query(text)
+        self._positions = None  # 조건을 만족하는 index (오름차순), 필요할 때 다시 계산
+        self._path_masks = {}  # 경로 조건 term 번호 -> image id 별 결과
+
+    def set_query(self, text):
+        self.terms = parse_query(text)
+        self.text = text
+        self.invalidate()
+
+    def invalidate(self):
+        """The dataset changed (sorted, images added / removed / renamed); rebuild on next use"""
+        self._positions = None
+        self._path_masks.clear()
+
+    def __len__(self):
+        return len(self.positions())
+
+    def positions(self):
+        if self._positions is None:
+            dataset = self.source.dataset
+            order = np.array(np.frombuffer(dataset.ids(), np.uint32), np.int64) if len(dataset) \
+                else np.zeros(0, np.int64)
+            self._positions = np.flatnonzero(self._match(order))
+        return self._positions
+
+    def _match(self, ids):
+        """Vectorized query result for an array of image ids"""
+        counts = self.source.landmark.counts
+        n = np.zeros(len(ids), np.int64)
+        stored = ids < len(counts)
+        n[stored] = counts[ids[stored]]
+        result = np.ones(len(ids), bool)
+        for term_index, (negate, kind, argument) in enumerate(self.terms):
+            if kind == "unlabeled":
+                match = n == 0
+            elif kind == "incomplete":
+                match = (n > 0) & (n < max_landmarks)
+            elif kind == "complete":
+                match = n == max_landmarks
+            elif kind == "labeled":
+                match = n > 0
+            elif kind == "checked":
+                checked = self.source.checked
+                match = np.fromiter((i in checked for i in ids.tolist()), bool, len(ids)) \
+                    if len(ids) < 64 else np.isin(ids, np.fromiter(checked, np.int64, len(checked)))
+            elif kind in ("duplicate", "shard"):
+                # image id -> 중복 여부 / 작업 중인 shard 포함 여부 (아직 없으면 None)
+                mask = self.source.redundant if kind == "duplicate" else self.source.shard_mask
+                match = np.zeros(len(ids), bool)
+                if mask is not None:
+                    known = ids < len(mask)
+                    match[known] = mask[ids[known]]
+            else:
+                match = self._path_mask(term_index, kind, argument, ids)
+            result &= ~match if negate else match
+        return result
+
+    def _path_mask(self, term_index, kind, argument, ids):
+        dataset = self.source.dataset
+        if len(ids) < 64:
+            # 한두 장 갱신할 때는 그 경로만 검사
+            return np.array([self._path_match(kind, argument, dataset.path_of_id(i)) for i in ids.tolist()], bool)
+        mask = self._path_masks.get(term_index)
+        if mask is None:
+            mask = np.zeros(len(dataset.directory_ids()), bool)
+            ids = np.array(np.frombuffer(dataset.ids(), np.uint32)).tolist()
+            matcher = argument.match if kind == "glob" else argument.search
+            mask[ids] = list(map(bool, map(matcher, dataset.paths_of_ids(ids))))
+            self._path_masks[term_index] = mask
+        return mask[ids]
+
+    @staticmethod
+    def _path_match(kind, argument, path):
+        if kind == "glob":
+            return argument.match(path) is not None
+        return argument.search(path) is not None
+
+    def update(self, ids=None):
+        """Re-evaluate some images (all with None) after their landmarks or check state changed"""
+        if self._positions is None:
+            return
+        if ids is None or len(ids) > 1024:
+            # 대량 변경은 다음에 쓸 때 한 번에 다시 계산
+            self._positions = None
+            return
+        dataset = self.source.dataset
+        ids = np.asarray(list(ids), np.int64)
+        for image_id, match in zip(ids.tolist(), self._match(ids).tolist()):
+            position = dataset.index_of_id(image_id)
+            if position < 0:
+                continue
+            i = int(np.searchsorted(self._positions, position))
+            present = i < len(self._positions) and self._positions[i] == position
+            if match and not present:
+                self._positions = np.insert(self._positions, i, position)
+            elif present and not match:
+                self._positions = np.delete(self._positions, i)
+
+    def next(self, position, direction=1):
+        """Nearest matching index after (direction 1) or before (-1) position, or None"""
+        positions = self.positions()
+        if direction > 0:
+            i = int(np.searchsorted(positions, position, side="right"))
+            return int(positions[i]) if i < len(positions) else None
+        i = int(np.searchsorted(positions, position, side="left")) - 1
+        return int(positions[i]) if i >= 0 else None
+
+    def neighbours(self, position, direction, ahead, behind):
+        """Up to `ahead` matches in the navigation direction and `behind` in the other, nearest first"""
+        positions = self.positions()
+        after = int(np.searchsorted(positions, position, side="right"))
+        before = int(np.searchsorted(positions, position, side="left"))
+        forward = positions[after:after + (ahead if direction > 0 else behind)].tolist()
+        backward = positions[max(0, before - (behind if direction > 0 else ahead)):before][::-1].tolist()
+        if direction < 0:
+            forward, backward = backward, forward
+        order = []
+        for step in range(max(len(forward), len(backward))):
+            order.extend(side[step] for side in (forward, backward) if step < len(side))
+        return order
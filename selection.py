@@ -0,0 +1,74 @@
+from core import normalize_path
+
+
+class Selection:
+    """
+    Ordered set of checked image ids (dict-backed, so membership and add/remove are O(1)).
+    Bulk methods return the ids that actually changed, so views can be updated incrementally.
+    """
+
+    def __init__(self, ids=()):
+        self._ids = dict.fromkeys(ids)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __bool__(self):
+        return bool(self._ids)
+
+    def __contains__(self, image_id):
+        return image_id in self._ids
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def update(self, ids):
+        """Add ids (repeats count once); returns the newly added ones"""
+        added = [i for i in dict.fromkeys(ids) if i not in self._ids]
+        self._ids.update(dict.fromkeys(added))
+        return added
+
+    def difference_update(self, ids):
+        """Remove ids (repeats count once); returns the ones that were selected"""
+        removed = [i for i in dict.fromkeys(ids) if i in self._ids]
+        for i in removed:
+            del self._ids[i]
+        return removed
+
+    def invert(self, ids):
+        """Flip the state of the given ids; returns (added, removed)"""
+        ids = list(ids)
+        removed = self.difference_update([i for i in ids if i in self._ids])
+        removed_set = set(removed)
+        added = self.update([i for i in ids if i not in removed_set])
+        return added, removed
+
+    def clear(self):
+        removed = list(self._ids)
+        self._ids.clear()
+        return removed
+
+
+def read_check_list(path, dataset):
+    """
+    Stream a check list file (one image path per line).
+    Returns (image ids found in the dataset, number of lines that did not match).
+    """
+    ids, unmatched = [], 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            image_id = dataset.id_of(normalize_path(line))
+            if image_id is None:
+                unmatched += 1
+            else:
+                ids.append(image_id)
+    return ids, unmatched
+
+
+def write_check_list(path, ids, dataset):
+    with open(path, "w", encoding="utf-8") as f:
+        for image_id in ids:
+            f.write(dataset.path_of_id(image_id) + "\n")
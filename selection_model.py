@@ -0,0 +1,52 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class CheckedListModel(QAbstractListModel):
+    """
+    Model for the checked image list in the left panel.
+    Rows mirror the viewer's Selection and are updated incrementally through `changed`.
+    """
+    # 한 번에 이보다 많이 지워지면 행 단위 삭제 대신 전체 갱신
+    reset_threshold = 256
+
+    def __init__(self, viewer, parent=None):
+        super().__init__(parent)
+        self.viewer = viewer
+        self._rows = list(viewer.checked)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        image_id = self._rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return self.viewer.dataset.path_of_id(image_id)
+        if role == Qt.UserRole:
+            return image_id
+        return None
+
+    def reset(self):
+        self.beginResetModel()
+        self._rows = list(self.viewer.checked)
+        self.endResetModel()
+
+    def changed(self, added=(), removed=()):
+        """Apply a Selection change: drop removed rows, append added ones"""
+        if len(removed) > self.reset_threshold:
+            # 대량 변경은 한 번에 다시 읽음 (added 도 이미 selection 에 반영되어 있음)
+            self.reset()
+            return
+        for image_id in removed:
+            row = self._rows.index(image_id)
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self._rows[row]
+            self.endRemoveRows()
+        if added:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            self._rows.extend(added)
+            self.endInsertRows()
@@ -1,2 +1,3 @@
 from .landmark_color import color_list
-from .shortcut import *
\ No newline at end of file
+from .shortcut import *
+from .config import *
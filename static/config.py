@@ -0,0 +1,75 @@
+import os
+
+# 그리드 썸네일 크기 (width, height)
+thumbnail_size = (150, 150)
+# 썸네일 디코딩에 사용할 워커 스레드 수
+thumbnail_threads = max(2, (os.cpu_count() or 4) - 1)
+
+# 썸네일/세션 캐시 위치 (XDG_CACHE_HOME 우선)
+cache_dir = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "EasyBase")
+# 디스크 썸네일 캐시 용량 한도 (MB), 초과 시 오래 사용하지 않은 항목부터 삭제
+thumbnail_cache_mb = 1024
+# 메모리 썸네일 캐시 용량 한도 (MB)
+thumbnail_memory_mb = 128
+
+# 단일 모드 디코딩 이미지 캐시 용량 한도 (MB)
+image_cache_mb = 512
+# 단일 모드에서 이동 방향으로 미리 디코딩할 이미지 수 / 반대 방향으로 유지할 이미지 수
+prefetch_ahead = 4
+prefetch_behind = 1
+# 단일 모드 tile 크기 (px) 와 부분 디코딩 없이 한 번에 읽을 최대 픽셀 수, 최대 확대 배율
+tile_size = 512
+tile_full_decode_pixels = 4096 * 4096
+max_zoom = 16
+
+# 단일 모드에서 키를 누르고 있을 때: 화면 갱신 간격 (ms), 입력이 이 시간 동안 없으면 원래 화질로 그림 (ms)
+nav_frame_ms = 16
+nav_settle_ms = 150
+
+# 이미지 한 장당 랜드마크 개수 (6, 7번 점은 박스의 두 꼭짓점)
+max_landmarks = 7
+
+# 다음/이전 일치 이미지로 이동할 때 쓰는 기본 조건 (query.py 참고)
+default_query = "!complete"
+
+# 랜드마크 검사 (qa.py): 이상치 robust z-score 기준, Procrustes 반복 횟수,
+# 두 점을 바꿨을 때 오차가 이 비율 이하로 줄면 순서가 바뀐 것으로 판단
+qa_outlier_z = 6.0
+qa_procrustes_iterations = 3
+qa_swap_ratio = 0.5
+
+# 체크한 이미지 내보내기 (export.py): 기본 방법 (auto / hardlink / reflink / copy), 작업 스레드 수,
+# train / val / test 비율과 분할에 쓰는 seed
+export_mode = "auto"
+export_workers = 16
+export_splits = (0.8, 0.1, 0.1)
+export_seed = 0
+
+# 두 라벨 세트 비교 (compare.py): 일치로 보는 최대 거리 (px), 단일 모드에서 A / B 세트를 그리는 색
+compare_agree_px = 5
+compare_colors = ((0, 200, 255), (255, 0, 200))
+
+# 여러 명이 나눠 라벨링하는 작업 큐 (workqueue.py): shard 하나의 이미지 수, 갱신하지 않으면 만료되는 lease 시간 (분)
+queue_shard_size = 500
+queue_lease_minutes = 30
+
+# 중복 이미지 찾기 (dedup.py): hash 를 계산할 디코딩 크기 (8 의 배수), 프로세스 수,
+# cluster 에 쓰는 hash (ahash / dhash / phash) 와 같은 cluster 로 볼 최대 bit 차이
+# (최대 11: dedup.max_search_distance, 더 크면 multi-index 검색이 쌍을 놓칠 수 있어 거부됨)
+dedup_decode_size = 32
+dedup_workers = max(1, (os.cpu_count() or 2) - 1)
+dedup_hash = "phash"
+dedup_max_distance = 6
+
+# 데이터셋 폴더 변경 감지 후 바뀐 폴더만 다시 읽기까지 기다리는 시간 (ms)
+watch_debounce_ms = 500
+
+# 랜드마크 저널 fsync 주기 (ms) 와 스냅샷으로 합치는 기준 기록 수
+autosave_interval_ms = 2000
+journal_compact_records = 20000
+
+# 성능 측정 (profiler): 이름별 p50/p99 계산에 쓰는 최근 기록 수, trace 파일에 남길 최대 이벤트 수
+profile_window = 1000
+profile_trace_events = 500000
+# 상태바 지연 시간 표시 갱신 주기 (ms)
+profile_hud_interval_ms = 500
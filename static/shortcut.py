@@ -1,11 +1,25 @@
 undo_button = ["Ctrl+z"]
+redo_button = ["Ctrl+y", "Ctrl+Shift+z"]
 prev_button = ["a", "Left"]
 next_button = ["d", "Right"]
 checkbox_button = ["Space"]
+cancel_scan_button = ["Esc"]
+fit_button = ["0"]
+prev_match_button = ["Ctrl+a", "Ctrl+Left"]
+next_match_button = ["Ctrl+d", "Ctrl+Right"]
+query_button = ["Ctrl+f"]
+filter_button = ["Ctrl+Shift+f"]
 
 shortcut_map = {
-    "undo_button": (undo_button, "remove_landmark"),
+    "undo_button": (undo_button, "undo_landmark"),
+    "redo_button": (redo_button, "redo_landmark"),
     "prev_button": (prev_button, "prev_clicked"),
     "next_button": (next_button, "next_clicked"),
     "checkbox_button": (checkbox_button, "toggle_checkbox"),
+    "cancel_scan_button": (cancel_scan_button, "cancel_scan"),
+    "fit_button": (fit_button, "fit_image"),
+    "prev_match_button": (prev_match_button, "prev_match"),
+    "next_match_button": (next_match_button, "next_match"),
+    "query_button": (query_button, "edit_query"),
+    "filter_button": (filter_button, "toggle_filter_mode"),
 }
\ No newline at end of file
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from dedup import max_search_distance, near_pairs, popcount
+
+
+def brute_force(hashes, max_distance):
+    i, j = np.triu_indices(len(hashes), 1)
+    close = popcount(hashes[i] ^ hashes[j]) <= max_distance
+    return set(zip(i[close].tolist(), j[close].tolist()))
+
+
+def test_recall_matches_brute_force():
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 2 ** 63, 40, dtype=np.uint64)
+    hashes = [base]
+    for flips in (2, 5, 8, 11, 14):
+        # 무작위 bit 를 뒤집은 사본
+        noise = np.zeros(len(base), np.uint64)
+        for _ in range(flips):
+            noise |= np.uint64(1) << rng.integers(0, 64, len(base)).astype(np.uint64)
+        hashes.append(base ^ noise)
+    hashes = np.concatenate(hashes)
+    for max_distance in range(max_search_distance + 1):
+        i, j = near_pairs(hashes, max_distance)
+        assert set(zip(i.tolist(), j.tolist())) == brute_force(hashes, max_distance)
+
+
+def test_distance_beyond_exact_search_is_rejected():
+    # 16 bit chunk 마다 3 bit 씩 (12 bit) 다르면 4 chunk 를 2 bit 까지 찾아서는 찾을 수 없음
+    a = 0x0123456789abcdef
+    b = a ^ sum(0b111 << (16 * chunk) for chunk in range(4))
+    with pytest.raises(ValueError):
+        near_pairs(np.array([a, b], np.uint64), 12)
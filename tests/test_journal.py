@@ -0,0 +1,60 @@
+import os
+
+from dataset import DatasetIndex
+from journal import AnnotationJournal
+from landmarks import LandmarkStore
+
+root = os.path.normcase(os.path.abspath("/data"))
+paths = [os.path.join(root, "a", f"{i}.png") for i in range(3)]
+
+
+def open_session(folder, dataset_paths):
+    dataset = DatasetIndex(dataset_paths)
+    return dataset, AnnotationJournal(str(folder), dataset, root)
+
+
+def edit(journal, store, image_id, points):
+    journal.record(image_id, store.get(image_id), points)
+    store.set(image_id, points)
+
+
+def test_edit_buffered_during_scan_survives_replay(tmp_path):
+    dataset, journal = open_session(tmp_path, paths)
+    store = LandmarkStore()
+    edit(journal, store, dataset.id_of(paths[0]), [(1, 1)])
+    journal.compact(store)
+
+    # 다음 세션: 스캔 중 (replay 전) 편집은 아직 buffer 에만 있음
+    dataset, journal = open_session(tmp_path, paths)
+    store = LandmarkStore()
+    edit(journal, store, dataset.id_of(paths[0]), [(5, 5), (6, 6)])
+    assert not os.path.exists(journal.path) or os.path.getsize(journal.path) == 0
+    journal.replay(store)
+    assert store.get(dataset.id_of(paths[0])) == [(5, 5), (6, 6)]
+    journal.compact(store)
+
+    dataset, journal = open_session(tmp_path, paths)
+    store = LandmarkStore()
+    journal.replay(store)
+    assert store.get(dataset.id_of(paths[0])) == [(5, 5), (6, 6)]
+
+
+def test_compact_after_cancelled_scan_keeps_unscanned_images(tmp_path):
+    dataset, journal = open_session(tmp_path, paths)
+    store = LandmarkStore()
+    edit(journal, store, dataset.id_of(paths[1]), [(2, 2)])
+    journal.compact(store)
+    edit(journal, store, dataset.id_of(paths[2]), [(3, 3)])
+    journal.flush()
+
+    # 스캔이 중간에 취소되어 첫 이미지만 목록에 있음
+    dataset, journal = open_session(tmp_path, paths[:1])
+    store = LandmarkStore()
+    journal.replay(store)
+    edit(journal, store, dataset.id_of(paths[0]), [(1, 1)])
+    journal.compact(store)
+
+    dataset, journal = open_session(tmp_path, paths)
+    store = LandmarkStore()
+    journal.replay(store)
+    assert [store.get(dataset.id_of(path)) for path in paths] == [[(1, 1)], [(2, 2)], [(3, 3)]]
@@ -0,0 +1,34 @@
+import os
+
+from core import directory_identities, match_renames
+
+
+def test_only_the_same_file_is_a_rename(tmp_path):
+    for name in ("a", "camA", "camB"):
+        (tmp_path / name).mkdir()
+    (tmp_path / "a" / "2.png").write_bytes(b"old")
+    (tmp_path / "camA" / "img001.png").write_bytes(b"frame A")
+    (tmp_path / "a" / "3.png").write_bytes(b"moved")
+    old = {}
+    for name in ("a", "camA"):
+        old.update(directory_identities(os.path.normcase(str(tmp_path / name))))
+
+    # 지운 뒤 관계없는 파일을 쓴 경우와 다른 카메라의 같은 이름, 그리고 실제 이동
+    os.remove(tmp_path / "a" / "2.png")
+    (tmp_path / "a" / "unrelated_new_capture.png").write_bytes(b"new capture")
+    os.remove(tmp_path / "camA" / "img001.png")
+    (tmp_path / "camB" / "img001.png").write_bytes(b"frame B")
+    os.rename(tmp_path / "a" / "3.png", tmp_path / "camB" / "3.png")
+    new = {}
+    for name in ("a", "camB"):
+        new.update(directory_identities(os.path.normcase(str(tmp_path / name))))
+
+    def path(*parts):
+        return os.path.normcase(str(tmp_path.joinpath(*parts)))
+
+    removed = [path("a", "2.png"), path("camA", "img001.png"), path("a", "3.png")]
+    added = [path("a", "unrelated_new_capture.png"), path("camB", "img001.png"), path("camB", "3.png")]
+    renames, removed, added = match_renames(removed, added, old.get, new.get)
+    assert renames == [(path("a", "3.png"), path("camB", "3.png"))]
+    assert removed == [path("a", "2.png"), path("camA", "img001.png")]
+    assert added == [path("a", "unrelated_new_capture.png"), path("camB", "img001.png")]
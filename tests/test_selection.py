@@ -0,0 +1,23 @@
+import os
+
+from dataset import DatasetIndex
+from selection import Selection, read_check_list
+
+root = os.path.normcase(os.path.abspath("/data"))
+paths = [os.path.join(root, f"{i}.png") for i in range(3)]
+
+
+def test_check_list_with_repeated_path(tmp_path):
+    dataset = DatasetIndex(paths)
+    check_list = tmp_path / "checked.txt"
+    check_list.write_text("\n".join([paths[1], paths[1], paths[2]]) + "\n", encoding="utf-8")
+    ids, unmatched = read_check_list(str(check_list), dataset)
+    assert unmatched == 0
+
+    selection = Selection()
+    assert selection.update(ids) == [1, 2]
+    assert list(selection) == [1, 2]
+    assert selection.difference_update([1, 1]) == [1]
+    assert list(selection) == [2]
+    assert selection.invert([0, 0, 2]) == ([0], [2])
+    assert list(selection) == [0]
@@ -0,0 +1,38 @@
+import os
+import time
+
+from PyQt5.QtCore import QCoreApplication
+
+from core import normalize_path, scan_images
+from dataset import DatasetIndex
+from watcher import DatasetWatcher
+
+app = QCoreApplication.instance() or QCoreApplication([])
+
+
+def wait_for(condition, timeout=5.0):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.01)
+    return condition()
+
+
+def test_folder_empty_at_scan_time_is_watched(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "empty").mkdir()
+    for name in ("1.png", "2.png"):
+        (tmp_path / "a" / name).write_bytes(b"png")
+    root = normalize_path(str(tmp_path.resolve()))
+    mtimes = {}
+    dataset = DatasetIndex(path for batch in scan_images(root, mtimes=mtimes) for path in batch)
+    watcher = DatasetWatcher(root, dataset, mtimes)
+    deltas = []
+    watcher.changed.connect(deltas.append)
+    try:
+        assert os.path.normcase(str(tmp_path / "empty")) in watcher.watched
+        (tmp_path / "empty" / "new.png").write_bytes(b"png")
+        assert wait_for(lambda: deltas)
+        assert deltas[0][0] == [os.path.normcase(str(tmp_path / "empty" / "new.png"))]
+    finally:
+        watcher.stop()
@@ -0,0 +1,219 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader
+
+from static import thumbnail_size, thumbnail_threads, cache_dir, thumbnail_cache_mb, thumbnail_memory_mb
+from core import normalize_path
+from profiler import traced
+
+
+@traced("thumbnail")
+def read_thumbnail(path, size):
+    """Decode an image directly at (at most) the given size, keeping aspect ratio"""
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    original = reader.size()
+    if original.isValid() and (original.width() > size.width() or original.height() > size.height()):
+        # JPEG 등은 디코딩 단계에서 축소되므로 원본 전체를 메모리에 올리지 않음
+        reader.setScaledSize(original.scaled(size, Qt.KeepAspectRatio))
+    return reader.read()
+
+
+class ThumbnailCache:
+    """
+    Two-tier thumbnail cache: a hot in-memory LRU tier in front of a size-bounded on-disk LRU tier.
+    Entries are keyed by (normalized path, mtime, file size, thumbnail size), so edited files miss automatically.
+    """
+
+    def __init__(self, folder, size, disk_mb=thumbnail_cache_mb, memory_mb=thumbnail_memory_mb):
+        self.folder = folder
+        self.size = size
+        self.disk_budget = disk_mb * 1024 * 1024
+        self.memory_budget = memory_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> QImage
+        self._memory_bytes = 0
+        self._disk = None  # 파일명 -> 바이트 수 (오래된 순서), 처음 사용할 때 로드
+        self._disk_bytes = 0
+
+    def key(self, path):
+        """Cache key for the file as it is on disk now, or None if it cannot be stat'ed"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        raw = f"{normalize_path(path)}|{st.st_mtime_ns}|{st.st_size}|{self.size.width()}x{self.size.height()}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get_memory(self, key):
+        with self._lock:
+            image = self._memory.get(key)
+            if image is not None:
+                self._memory.move_to_end(key)
+            return image
+
+    def get(self, key):
+        """Look up the memory tier, then the disk tier (promoting disk hits to memory)"""
+        image = self.get_memory(key)
+        if image is not None:
+            return image
+        with self._lock:
+            self._load_disk_index()
+            name = self._find_disk(key)
+            if name is None:
+                return None
+            self._disk.move_to_end(name)
+        file_path = os.path.join(self.folder, name)
+        image = QImage(file_path)
+        if image.isNull():
+            with self._lock:
+                self._forget(name)
+            return None
+        try:
+            # 세션 간 LRU 순서를 유지하기 위해 접근 시각 갱신
+            os.utime(file_path)
+        except OSError:
+            pass
+        self._put_memory(key, image)
+        return image
+
+    def put(self, key, image):
+        if image.isNull():
+            return
+        self._put_memory(key, image)
+        # 투명도가 있는 이미지만 PNG, 나머지는 용량이 작은 JPEG 로 저장
+        fmt = "png" if image.hasAlphaChannel() else "jpg"
+        name = os.path.join(key[:2], f"{key}.{fmt}")
+        file_path = os.path.join(self.folder, name)
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+            if not image.save(tmp_path, fmt.upper(), 85):
+                return
+            os.replace(tmp_path, file_path)
+            file_size = os.path.getsize(file_path)
+        except OSError:
+            return
+        with self._lock:
+            self._load_disk_index()
+            self._forget(name)
+            self._disk[name] = file_size
+            self._disk_bytes += file_size
+            self._evict_disk()
+
+    def clear_memory(self):
+        """Drop the in-memory tier (the disk tier is kept)"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def _find_disk(self, key):
+        for fmt in ("jpg", "png"):
+            name = os.path.join(key[:2], f"{key}.{fmt}")
+            if name in self._disk:
+                return name
+        return None
+
+    def _put_memory(self, key, image):
+        with self._lock:
+            if key in self._memory:
+                self._memory_bytes -= self._memory.pop(key).sizeInBytes()
+            self._memory[key] = image
+            self._memory_bytes += image.sizeInBytes()
+            while self._memory_bytes > self.memory_budget and len(self._memory) > 1:
+                _, old = self._memory.popitem(last=False)
+                self._memory_bytes -= old.sizeInBytes()
+
+    def _load_disk_index(self):
+        """Scan the cache folder once, ordering entries from least to most recently used"""
+        if self._disk is not None:
+            return
+        entries = []
+        if os.path.isdir(self.folder):
+            for sub in os.scandir(self.folder):
+                if not sub.is_dir():
+                    continue
+                for entry in os.scandir(sub.path):
+                    if entry.name.endswith((".jpg", ".png")):
+                        st = entry.stat()
+                        entries.append((st.st_mtime, os.path.join(sub.name, entry.name), st.st_size))
+        entries.sort()
+        self._disk = OrderedDict((name, size) for _, name, size in entries)
+        self._disk_bytes = sum(self._disk.values())
+
+    def _forget(self, name):
+        size = self._disk.pop(name, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.disk_budget and self._disk:
+            name, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except OSError:
+                pass
+
+
+class ThumbnailTask(QRunnable):
+    def __init__(self, loader, generation, path, key):
+        super().__init__()
+        self.loader = loader
+        self.generation = generation
+        self.path = path
+        self.key = key
+
+    def run(self):
+        # 사용자가 이미 다른 페이지로 이동했다면 디코딩하지 않음
+        if self.generation != self.loader.generation:
+            return
+        cache = self.loader.cache
+        image = cache.get(self.key) if self.key else None
+        if image is None:
+            image = read_thumbnail(self.path, self.loader.size)
+            if self.key:
+                cache.put(self.key, image)
+        if self.generation != self.loader.generation:
+            return
+        self.loader.loaded.emit(self.generation, self.path, image)
+
+
+class ThumbnailLoader(QObject):
+    """Decode thumbnails on a background thread pool and report them through `loaded`"""
+    loaded = pyqtSignal(int, str, QImage)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.size = QSize(*thumbnail_size)
+        self.cache = ThumbnailCache(os.path.join(cache_dir, "thumbnails"), self.size)
+        self.generation = 0
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(thumbnail_threads)
+
+    def request(self, paths):
+        """Cancel pending jobs and queue the given paths; returns the new generation"""
+        self.cancel()
+        generation = self.generation
+        for path in paths:
+            key = self.cache.key(path)
+            image = self.cache.get_memory(key) if key else None
+            if image is not None:
+                # 메모리 캐시에 있으면 스레드를 거치지 않고 바로 전달
+                self.loaded.emit(generation, path, image)
+            else:
+                self.pool.start(ThumbnailTask(self, generation, path, key))
+        return generation
+
+    def cancel(self):
+        """Drop queued jobs; running jobs finish but their results are ignored"""
+        self.generation += 1
+        self.pool.clear()
+
+    def shutdown(self):
+        self.cancel()
+        self.pool.waitForDone()
@@ -0,0 +1,212 @@
+import os
+
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractItemModel, QModelIndex
+
+
+class _DirNode:
+    __slots__ = ("name", "path", "parent", "row", "dirs", "files", "file_rows", "dir_id", "counts")
+
+    def __init__(self, path, parent=None):
+        self.name = os.path.basename(path) or path
+        self.path = path
+        self.parent = parent
+        self.row = 0
+        self.dirs = []  # 하위 폴더 노드 (이름 순)
+        self.files = None  # 파일 image id (이름 순), 펼칠 때 채움
+        self.file_rows = None  # image id -> row
+        self.dir_id = None
+        self.counts = (0, 0, 0)  # 하위 폴더 포함 (이미지, 라벨 있는 이미지, 체크된 이미지)
+
+
+class DatasetTreeModel(QAbstractItemModel):
+    """
+    Folder tree of the viewer's dataset index (no file system access).
+    The folder skeleton is built from the index; a folder's files are added when it is expanded
+    (fetchMore). Folders show image / labeled / checked counts, recomputed lazily after `invalidate_counts`.
+    """
+
+    def __init__(self, viewer, parent=None):
+        super().__init__(parent)
+        self.viewer = viewer
+        self._root = _DirNode("")
+        self._nodes = {}  # 폴더 경로 -> 노드
+        self._counts_valid = False
+
+    def reset(self, root_path):
+        """Rebuild the folder skeleton under root_path from the viewer's dataset"""
+        self.beginResetModel()
+        self._root = _DirNode(root_path)
+        self._nodes = {root_path: self._root}
+        dataset = self.viewer.dataset
+        images = self._dir_image_counts()
+        prefix = os.path.join(root_path, "")
+        for dir_id, directory in enumerate(dataset.directories()):
+            if dir_id >= len(images) or not images[dir_id] or \
+                    (directory != root_path and not directory.startswith(prefix)):
+                continue
+            self._node(directory).dir_id = dir_id
+        for node in self._nodes.values():
+            node.dirs.sort(key=lambda child: child.name)
+            for row, child in enumerate(node.dirs):
+                child.row = row
+        self._counts_valid = False
+        self.endResetModel()
+
+    def _node(self, directory):
+        """Folder node, creating it and its ancestors up to the root"""
+        node = self._nodes.get(directory)
+        if node is None:
+            parent = self._node(os.path.dirname(directory))
+            node = self._nodes[directory] = _DirNode(directory, parent)
+            parent.dirs.append(node)
+        return node
+
+    def _index_arrays(self):
+        """(image ids in display order, directory id of every image id) as numpy copies"""
+        dataset = self.viewer.dataset
+        # array 버퍼를 오래 잡고 있으면 dataset 이 커질 수 없으므로 바로 복사
+        order = np.array(np.frombuffer(dataset.ids(), np.uint32)) if len(dataset) else np.zeros(0, np.uint32)
+        dir_of = dataset.directory_ids()
+        dir_of = np.array(np.frombuffer(dir_of, np.uint32)) if len(dir_of) else np.zeros(0, np.uint32)
+        return order, dir_of
+
+    def _dir_image_counts(self):
+        order, dir_of = self._index_arrays()
+        return np.bincount(dir_of[order], minlength=len(self.viewer.dataset.directories()))
+
+    def invalidate_counts(self):
+        """Landmarks or checks changed; counts are recomputed on the next paint"""
+        self._counts_valid = False
+
+    def _update_counts(self):
+        """Per-folder totals in one vectorized pass over the index"""
+        dataset = self.viewer.dataset
+        self._counts_valid = True
+        if not len(dataset):
+            return
+        order, dir_of = self._index_arrays()
+        listed = np.zeros(len(dir_of), bool)
+        listed[order] = True
+
+        def per_dir(ids):
+            ids = ids[(ids < len(listed))]
+            ids = ids[listed[ids]]
+            return np.bincount(dir_of[ids], minlength=len(dataset.directories()))
+
+        images = per_dir(order)
+        labeled = per_dir(self.viewer.landmark.ids())
+        checked = per_dir(np.fromiter(self.viewer.checked, np.int64, len(self.viewer.checked)))
+
+        def total(node):
+            counts = np.zeros(3, np.int64)
+            if node.dir_id is not None:
+                counts += (images[node.dir_id], labeled[node.dir_id], checked[node.dir_id])
+            for child in node.dirs:
+                counts += total(child)
+            node.counts = tuple(counts.tolist())
+            return counts
+
+        total(self._root)
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        # 자식 index 의 internal pointer 는 부모 폴더 노드
+        return self.createIndex(row, column, self._node_of(parent))
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer()
+        if node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node.parent)
+
+    def _node_of(self, index):
+        """Folder node an index stands for (the root for an invalid index), or None for a file"""
+        if not index.isValid():
+            return self._root
+        parent = index.internalPointer()
+        return parent.dirs[index.row()] if index.row() < len(parent.dirs) else None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        node = self._node_of(parent)
+        if node is None:
+            return 0
+        return len(node.dirs) + (len(node.files) if node.files is not None else 0)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self._node_of(parent)
+        return node is not None and (bool(node.dirs) or node.dir_id is not None)
+
+    def canFetchMore(self, parent):
+        node = self._node_of(parent)
+        return node is not None and node.files is None and node.dir_id is not None
+
+    def fetchMore(self, parent):
+        """Add a folder's files the first time it is expanded"""
+        node = self._node_of(parent)
+        if node is None or node.files is not None:
+            return
+        dataset = self.viewer.dataset
+        names = sorted(dataset.names_in(node.path))
+        if not names:
+            node.files = []
+            return
+        self.beginInsertRows(parent, len(node.dirs), len(node.dirs) + len(names) - 1)
+        node.files = [dataset.id_of(os.path.join(node.path, name)) for name in names]
+        node.file_rows = {image_id: row for row, image_id in enumerate(node.files, len(node.dirs))}
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = self._node_of(index)
+        if node is None:
+            image_id = self.image_id(index)
+            if role == Qt.DisplayRole:
+                return os.path.basename(self.viewer.dataset.path_of_id(image_id))
+            if role == Qt.ToolTipRole:
+                return self.viewer.dataset.path_of_id(image_id)
+            return None
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            if not self._counts_valid:
+                self._update_counts()
+            images, labeled, checked = node.counts
+            if role == Qt.ToolTipRole:
+                return f"{node.path}\n{images} images, {labeled} labeled, {checked} checked"
+            return f"{node.name}  ({labeled}/{images}, ✓{checked})"
+        return None
+
+    def image_id(self, index):
+        """Image id of a file row, or None for folders"""
+        if not index.isValid() or self._node_of(index) is not None:
+            return None
+        parent = index.internalPointer()
+        return parent.files[index.row() - len(parent.dirs)]
+
+    def directories(self):
+        """Folder paths in the tree"""
+        return list(self._nodes)
+
+    def index_of_dir(self, directory):
+        node = self._nodes.get(directory)
+        if node is None or node is self._root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node.parent)
+
+    def index_of_image(self, image_id):
+        """Index of a file row (its folder's files are fetched if needed), or an invalid index"""
+        node = self._nodes.get(os.path.dirname(self.viewer.dataset.path_of_id(image_id)))
+        if node is None:
+            return QModelIndex()
+        if node.files is None:
+            self.fetchMore(self.index_of_dir(node.path))
+        row = node.file_rows.get(image_id) if node.file_rows else None
+        return QModelIndex() if row is None else self.createIndex(row, 0, node)
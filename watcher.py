@@ -0,0 +1,148 @@
+import os
+
+import numpy as np
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from workers import DeltaScanWorker, FileIdentityWorker
+from static import watch_debounce_ms
+
+
+class DatasetWatcher(QObject):
+    """
+    Watch every directory of a scanned dataset and report changes without a full rescan.
+    Change notifications are collected for `watch_debounce_ms`, then only the changed directories are
+    re-listed on a worker thread and the difference is emitted through `changed`.
+    The mtimes of re-listed directories are written to `mtimes` (the scan manifest's, if given).
+
+    The file identity (core.file_identity) of every listed image is kept by image id, so a removed and an
+    added path count as a rename only when they are the same file (see core.match_renames). The identities
+    are read on a worker thread after the scan; until then every change is a removal plus an addition.
+    """
+    changed = pyqtSignal(object)  # (added, removed, new dirs, gone dirs)
+
+    def __init__(self, root, dataset, mtimes=None, parent=None):
+        super().__init__(parent)
+        self.root = root
+        self.dataset = dataset
+        self.mtimes = mtimes
+        self.watched = set()
+        self.failed = 0  # 감시 한도 등으로 등록하지 못한 폴더 수
+        self._dirty = set()
+        self._worker = None
+        self._identity = np.zeros(0, np.int64)  # image id -> file identity 의 hash (0: 모름)
+        self.new_identities = {}  # 처리 중인 변경에서 읽은 파일의 identity (경로 -> identity)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self.on_directory_changed)
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(watch_debounce_ms)
+        self._timer.timeout.connect(self.scan_dirty)
+
+        # 스캔한 모든 폴더 (비어 있던 폴더 포함) 와 이미지가 있는 폴더의 상위 폴더 (새 하위 폴더 생성 감지용)
+        dirs = {self.root} | set(mtimes or ())
+        for directory in dataset.directories():
+            while directory.startswith(self.root) and directory not in dirs:
+                dirs.add(directory)
+                directory = os.path.dirname(directory)
+        self.watch(dirs)
+        self._identity_worker = FileIdentityWorker(sorted(self.watched), self)
+        self._identity_worker.identities_found.connect(self.remember_identities)
+        self._identity_worker.finished.connect(self.on_identities_done)
+        self._identity_worker.start()
+
+    def on_identities_done(self):
+        if self.sender() is self._identity_worker:
+            self._identity_worker = None
+        self.sender().deleteLater()
+
+    @staticmethod
+    def _key(identity):
+        return hash(identity) or 1
+
+    def remember_identities(self, identities):
+        """Store the identities of listed files ({path: identity}) under their image ids"""
+        ids, keys = [], []
+        for path, identity in identities.items():
+            image_id = self.dataset.id_of(path)
+            if image_id is not None:
+                ids.append(image_id)
+                keys.append(self._key(identity))
+        if not ids:
+            return
+        if max(ids) >= len(self._identity):
+            grown = np.zeros(max(max(ids) + 1, 2 * len(self._identity)), np.int64)
+            grown[:len(self._identity)] = self._identity
+            self._identity = grown
+        self._identity[ids] = keys
+
+    def identity_of(self, path):
+        """Identity key of a listed image when it was last seen, or None"""
+        image_id = self.dataset.id_of(path)
+        if image_id is None or image_id >= len(self._identity) or not self._identity[image_id]:
+            return None
+        return int(self._identity[image_id])
+
+    def new_identity(self, path):
+        """Identity key of a file found by the change being applied, or None"""
+        identity = self.new_identities.get(path)
+        return None if identity is None else self._key(identity)
+
+    def watch(self, dirs):
+        dirs = [d for d in dirs if d not in self.watched]
+        if dirs:
+            failed = set(self._watcher.addPaths(dirs))
+            self.failed += len(failed)
+            self.watched.update(d for d in dirs if d not in failed)
+
+    def unwatch(self, dirs):
+        gone = [d for d in self.watched if any(d == g or d.startswith(os.path.join(g, "")) for g in dirs)]
+        if gone:
+            self._watcher.removePaths(gone)
+            self.watched.difference_update(gone)
+
+    def on_directory_changed(self, path):
+        self._dirty.add(os.path.normcase(path))
+        self._timer.start()
+
+    def scan_dirty(self):
+        if self._worker is not None:
+            # 이전 변경을 아직 처리 중이면 끝난 뒤에 다시 시도
+            self._timer.start()
+            return
+        dirs, self._dirty = sorted(self._dirty), set()
+        known = {d: self.dataset.names_in(d) for d in dirs}
+        self._worker = DeltaScanWorker(dirs, known, set(self.watched), self)
+        self._worker.delta_found.connect(self.on_delta_found)
+        # 변경마다 새로 만드는 스레드이므로 끝나면 해제
+        self._worker.finished.connect(self._worker.deleteLater)
+        self._worker.start()
+
+    def on_delta_found(self, delta):
+        if self.sender() is not self._worker:
+            return
+        worker, self._worker = self._worker, None
+        if self.mtimes is not None:
+            # 작업 스레드가 끝난 뒤 GUI 스레드에서만 갱신
+            self.mtimes.update(worker.mtimes)
+        added, removed, new_dirs, gone_dirs = delta
+        self.unwatch(gone_dirs)
+        self.watch(new_dirs)
+        self.new_identities = worker.identities
+        if added or removed or gone_dirs:
+            self.changed.emit(delta)
+        # 변경이 반영된 뒤 (새 파일에 id 가 생긴 뒤) 기록
+        self.remember_identities(worker.identities)
+        self.new_identities = {}
+
+    def stop(self):
+        self._timer.stop()
+        if self._identity_worker is not None:
+            worker, self._identity_worker = self._identity_worker, None
+            worker.cancel()
+            worker.wait()
+        if self._worker is not None:
+            worker, self._worker = self._worker, None
+            worker.wait()
+        if self.watched:
+            self._watcher.removePaths(list(self.watched))
+            self.watched.clear()
@@ -0,0 +1,228 @@
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from core import directory_identities, scan_images, read_labels, scan_delta
+from compare import compare, load_label_sets
+from dedup import HashCache, compute_hashes, find_duplicates
+from export import export_dataset
+from profiler import profiler
+from qa import analyze, image_sizes
+
+
+class ScanWorker(QThread):
+    """
+    Scan a dataset folder in the background, emitting image paths in batches as they are found.
+    With a manifest (see manifest.py) that is still usable, the saved index is revalidated instead and
+    emitted once through `manifest_loaded`.
+    """
+    batch_found = pyqtSignal(object)
+    manifest_loaded = pyqtSignal(object, object, object)  # DatasetIndex, 위치, (추가, 삭제, 다시 읽은 폴더 수)
+    scan_finished = pyqtSignal(bool)  # True 이면 사용자가 취소한 경우
+
+    def __init__(self, folder, manifest=None, parent=None):
+        super().__init__(parent)
+        self.folder = folder
+        self.manifest = manifest
+        self.mtimes = {}  # 스캔한 폴더 -> mtime (다음 manifest 에 저장)
+        self.from_manifest = False
+        self._cancel = threading.Event()
+
+    def run(self):
+        if self.manifest is not None:
+            with profiler.span("manifest_load", folder=self.folder):
+                result = self.manifest.revalidate()
+            if result is not None:
+                dataset, self.mtimes, position, changes = result
+                self.from_manifest = True
+                self.manifest_loaded.emit(dataset, position, changes)
+                self.scan_finished.emit(False)
+                return
+        with profiler.span("scan", folder=self.folder):
+            for batch in scan_images(self.folder, cancel=self._cancel, mtimes=self.mtimes):
+                self.batch_found.emit(batch)
+        self.scan_finished.emit(self._cancel.is_set())
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class LabelImportWorker(QThread):
+    """Parse a label folder on a worker pool and match it against the dataset"""
+    progress = pyqtSignal(int, int)
+    import_finished = pyqtSignal(object, object, object, bool)  # labels, unmatched, errors, cancelled
+
+    def __init__(self, label_root, dataset_folder, dataset, parent=None):
+        super().__init__(parent)
+        self.label_root = label_root
+        self.dataset_folder = dataset_folder
+        self.dataset = dataset
+        self._cancel = threading.Event()
+
+    def run(self):
+        with profiler.span("import_labels", folder=self.label_root):
+            labels, unmatched, errors = read_labels(
+                self.label_root, self.dataset_folder, self.dataset, cancel=self._cancel, progress=self.progress.emit
+            )
+        self.import_finished.emit(labels, unmatched, errors, self._cancel.is_set())
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class DeltaScanWorker(QThread):
+    """
+    Re-list changed directories only (see core.scan_delta); `mtimes` gets the re-listed directories and
+    `identities` the file identities of their images.
+    """
+    delta_found = pyqtSignal(object)  # (added, removed, new dirs, gone dirs)
+
+    def __init__(self, dirs, known, watched, parent=None):
+        super().__init__(parent)
+        self.dirs = dirs
+        self.known = known
+        self.watched = watched
+        self.mtimes = {}
+        self.identities = {}
+
+    def run(self):
+        with profiler.span("delta_scan", dirs=len(self.dirs)):
+            delta = scan_delta(self.dirs, self.known, self.watched, mtimes=self.mtimes, identities=self.identities)
+        self.delta_found.emit(delta)
+
+
+class FileIdentityWorker(QThread):
+    """Record the file identity (core.file_identity) of every image in the given directories, in batches"""
+    identities_found = pyqtSignal(object)  # {path: identity}
+
+    def __init__(self, dirs, parent=None, batch_size=5000):
+        super().__init__(parent)
+        self.dirs = dirs
+        self.batch_size = batch_size
+        self._cancel = threading.Event()
+
+    def run(self):
+        batch = {}
+        with profiler.span("file_identities", dirs=len(self.dirs)):
+            for directory in self.dirs:
+                if self._cancel.is_set():
+                    return
+                batch.update(directory_identities(directory))
+                if len(batch) >= self.batch_size:
+                    self.identities_found.emit(batch)
+                    batch = {}
+        if batch:
+            self.identities_found.emit(batch)
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class LandmarkQAWorker(QThread):
+    """Read the image sizes from the file headers and run the landmark checks (see qa.analyze)"""
+    report_ready = pyqtSignal(object)
+
+    def __init__(self, ids, points, counts, paths, parent=None):
+        super().__init__(parent)
+        # 검사 중에도 편집할 수 있도록 랜드마크는 복사본을 받음
+        self.ids = ids
+        self.points = points
+        self.counts = counts
+        self.paths = paths
+        self._cancel = threading.Event()
+
+    def run(self):
+        with profiler.span("landmark_qa", images=len(self.ids)):
+            sizes = image_sizes(self.paths, cancel=self._cancel)
+            if self._cancel.is_set():
+                return
+            report = analyze(self.ids, self.points, self.counts, sizes)
+        self.report_ready.emit(report)
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class CompareWorker(QThread):
+    """Load two label sets at the same time and compare them (see compare.py)"""
+    report_ready = pyqtSignal(object, object, object, object)  # A, B (LandmarkStore), LabelComparison, 문제 목록
+
+    def __init__(self, sources, dataset_folder, dataset, dataset_root, parent=None):
+        super().__init__(parent)
+        self.sources = sources
+        self.dataset_folder = dataset_folder
+        self.dataset = dataset
+        self.dataset_root = dataset_root
+        self._cancel = threading.Event()
+
+    def run(self):
+        with profiler.span("compare_labels", sources=len(self.sources)):
+            (store_a, problems_a), (store_b, problems_b) = load_label_sets(
+                self.sources, self.dataset_folder, self.dataset, self.dataset_root, self._cancel)
+            if self._cancel.is_set():
+                return
+            comparison = compare(store_a, store_b, self.dataset.ids())
+        problems = [f"A {problem}" for problem in problems_a] + [f"B {problem}" for problem in problems_b]
+        self.report_ready.emit(store_a, store_b, comparison, problems)
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class DuplicateWorker(QThread):
+    """Perceptual-hash images on a process pool (cached) and cluster near-duplicates (see dedup.py)"""
+    progress = pyqtSignal(int, int)
+    report_ready = pyqtSignal(object)
+
+    def __init__(self, ids, paths, cache_path, parent=None):
+        super().__init__(parent)
+        self.ids = ids
+        self.paths = paths
+        self.cache_path = cache_path
+        self._cancel = threading.Event()
+
+    def run(self):
+        cache = HashCache(self.cache_path)
+        with profiler.span("hash_images", images=len(self.paths)):
+            hashes, valid = compute_hashes(self.paths, cache, cancel=self._cancel, progress=self.progress.emit)
+        try:
+            # 취소해도 계산한 hash 는 다음 번을 위해 저장
+            cache.save()
+        except OSError:
+            pass
+        if self._cancel.is_set():
+            return
+        with profiler.span("find_duplicates", images=len(self.paths)):
+            report = find_duplicates(self.ids, hashes, valid)
+        self.report_ready.emit(report)
+
+    def cancel(self):
+        self._cancel.set()
+
+
+class ExportWorker(QThread):
+    """Export images (and their landmarks / split lists) into an output tree (see export.export_dataset)"""
+    progress = pyqtSignal(int, int)
+    export_finished = pyqtSignal(object, bool)  # 결과 dict (실패하면 오류 메시지 str), 취소 여부
+
+    def __init__(self, paths, dataset_root, output, mode, ratios=None, labels=None, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.dataset_root = dataset_root
+        self.output = output
+        self.mode = mode
+        self.ratios = ratios
+        self.labels = labels  # (LandmarkStore, DatasetIndex) 또는 None, 랜드마크는 복사본을 받음
+        self._cancel = threading.Event()
+
+    def run(self):
+        try:
+            with profiler.span("export_images", images=len(self.paths), mode=self.mode):
+                summary = export_dataset(self.paths, self.dataset_root, self.output, self.mode, self.ratios,
+                                         labels=self.labels, cancel=self._cancel, progress=self.progress.emit)
+        except (OSError, ValueError) as e:
+            summary = str(e)
+        self.export_finished.emit(summary, self._cancel.is_set())
+
+    def cancel(self):
+        self._cancel.set()
@@ -0,0 +1,246 @@
+"""
+Work queue for several annotators sharing one dataset on a shared disk, without a server (no Qt import).
+
+    QUEUE/queue.json                   number of shards and images
+    QUEUE/shards/0007.txt              image paths of shard 7, relative to the dataset root
+    QUEUE/leases/0007.lock             session working on shard 7 and when its lease expires
+    QUEUE/done/0007.json               shard 7 is finished
+    QUEUE/labels/0007.<session>.npz    landmarks of shard 7 saved by that session
+
+Locks are created with O_EXCL, so only one session can lease a shard. A lease that is not renewed
+before it expires may be taken over: the stale lock is renamed away first (only one session wins the
+rename) and then created again. Every session writes only its own label files, so saving never
+overwrites another annotator's work; merging applies a shard's files oldest first and the finishing
+session's file last. Expiry compares wall clock times, so the machines' clocks should be in sync.
+"""
+import getpass
+import glob
+import json
+import os
+import re
+import socket
+import time
+
+from core import normalize_path
+from landmarks import LandmarkStore
+from static import queue_lease_minutes
+
+queue_version = 1
+
+
+def default_session():
+    """user@host, usable in file names"""
+    try:
+        user = getpass.getuser()
+    except (KeyError, OSError):
+        user = "user"
+    return re.sub(r"[^\w.@-]", "_", f"{user}@{socket.gethostname()}")
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def create_queue(folder, dataset, dataset_root, shard_size):
+    """
+    Split the dataset (in display order, so a shard stays within few folders) into shards of shard_size
+    images. Raises FileExistsError if folder already holds a queue. Returns the number of shards.
+    """
+    if os.path.exists(os.path.join(folder, "queue.json")):
+        raise FileExistsError(f"{folder} already contains a work queue")
+    for sub in ("shards", "leases", "done", "labels"):
+        os.makedirs(os.path.join(folder, sub), exist_ok=True)
+    prefix = os.path.join(dataset_root, "")
+    shards = 0
+    for start in range(0, len(dataset), shard_size):
+        with open(os.path.join(folder, "shards", f"{shards:04d}.txt"), "w", encoding="utf-8") as f:
+            for path in dataset[start:start + shard_size]:
+                relative = path[len(prefix):] if path.startswith(prefix) else os.path.relpath(path, dataset_root)
+                f.write(relative.replace(os.sep, "/") + "\n")
+        shards += 1
+    _write_json(os.path.join(folder, "queue.json"),
+                {"version": queue_version, "shards": shards, "shard_size": shard_size, "images": len(dataset)})
+    return shards
+
+
+class WorkQueue:
+    """A queue folder seen from one session (see the module docstring for the layout)"""
+
+    def __init__(self, folder, session=None, lease_seconds=queue_lease_minutes * 60):
+        info = _read_json(os.path.join(folder, "queue.json"))
+        if info is None or info.get("version") != queue_version:
+            raise ValueError(f"{folder} is not a work queue")
+        self.folder = folder
+        self.shards = info["shards"]
+        self.session = session or default_session()
+        self.lease_seconds = lease_seconds
+
+    def _path(self, kind, shard, suffix):
+        return os.path.join(self.folder, kind, f"{shard:04d}{suffix}")
+
+    def shard_paths(self, shard, dataset_root):
+        """Absolute image paths of a shard under this machine's dataset root"""
+        with open(self._path("shards", shard, ".txt"), "r", encoding="utf-8") as f:
+            return [normalize_path(os.path.join(dataset_root, line.rstrip("\n"))) for line in f if line.strip()]
+
+    def shard_ids(self, shard, dataset, dataset_root):
+        """Image ids of a shard in this session's dataset index; returns (ids, paths not in the dataset)"""
+        ids, missing = [], []
+        for path in self.shard_paths(shard, dataset_root):
+            image_id = dataset.id_of(path)
+            if image_id is None:
+                missing.append(path)
+            else:
+                ids.append(image_id)
+        return ids, missing
+
+    def is_done(self, shard):
+        return os.path.exists(self._path("done", shard, ".json"))
+
+    def lease(self, shard):
+        """Lease record {"session", "expires", ...} of a shard, or None"""
+        return _read_json(self._path("leases", shard, ".lock"))
+
+    def _lease_record(self):
+        return {"session": self.session, "host": socket.gethostname(), "pid": os.getpid(),
+                "expires": time.time() + self.lease_seconds}
+
+    def _expired(self, shard):
+        lease = self.lease(shard)
+        if lease is None:
+            # 기록을 쓰는 중인 (또는 쓰다가 멈춘) 빈 lock 은 파일 시각으로 판단
+            try:
+                return os.path.getmtime(self._path("leases", shard, ".lock")) + self.lease_seconds < time.time()
+            except OSError:
+                return False
+        return lease.get("expires", 0) < time.time()
+
+    def _try_lock(self, shard):
+        lock = self._path("leases", shard, ".lock")
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+        except FileExistsError:
+            if not self._expired(shard):
+                return False
+            stale = f"{lock}.{self.session}.{os.getpid()}.expired"
+            try:
+                # 만료된 lock 은 이름을 바꿔 치운 세션 하나만 다시 만들 수 있음
+                os.rename(lock, stale)
+            except OSError:
+                return False
+            record = _read_json(stale)
+            if record is not None and record.get("expires", 0) >= time.time():
+                # 그 사이 다른 세션이 새로 만든 lock 을 치웠으면 되돌려 놓음
+                try:
+                    os.link(stale, lock)
+                except OSError:
+                    pass
+                os.remove(stale)
+                return False
+            os.remove(stale)
+            return self._try_lock(shard)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._lease_record(), f)
+        return True
+
+    def acquire(self):
+        """Lease the next shard to work on (this session's own unfinished lease first); returns it or None"""
+        open_shards = [shard for shard in range(self.shards) if not self.is_done(shard)]
+        for shard in open_shards:
+            lease = self.lease(shard)
+            if lease is not None and lease.get("session") == self.session and self.renew(shard):
+                return shard
+        for shard in open_shards:
+            if self._try_lock(shard):
+                return shard
+        return None
+
+    def renew(self, shard):
+        """Extend this session's lease; False if it expired and another session took the shard, or it is done"""
+        if self.is_done(shard):
+            return False
+        lock = self._path("leases", shard, ".lock")
+        lease = self.lease(shard)
+        if lease is None or lease.get("session") != self.session:
+            return False
+        if lease.get("expires", 0) < time.time():
+            # 만료된 뒤에는 다른 세션과 같은 방법으로 다시 얻어야 함 (그 사이 다른 세션이 가져갔을 수 있음)
+            return self._try_lock(shard)
+        _write_json(lock, self._lease_record())
+        return True
+
+    def release(self, shard, done=False):
+        """
+        Give the shard back (done=True: mark it finished so nobody leases it again).
+        Returns False, without marking it done, if this session no longer holds the lease.
+        """
+        if done:
+            if not self.renew(shard):
+                return False
+            _write_json(self._path("done", shard, ".json"), {"session": self.session, "time": time.time()})
+        lease = self.lease(shard)
+        if lease is not None and lease.get("session") == self.session:
+            try:
+                os.remove(self._path("leases", shard, ".lock"))
+            except FileNotFoundError:
+                pass
+        return True
+
+    def save_labels(self, shard, store, dataset, dataset_root, ids):
+        """Write this session's landmarks of the shard's images (atomically, to its own file)"""
+        path = self._path("labels", shard, f".{self.session}.npz")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        store.save(tmp_path, dataset, dataset_root, [i for i in ids if i in store])
+        os.replace(tmp_path, path)
+
+    def label_files(self, shard):
+        """Label files of a shard in merge order: oldest first, the finishing session's file last"""
+        files = sorted(glob.glob(glob.escape(self._path("labels", shard, "")) + ".*.npz"), key=os.path.getmtime)
+        done = _read_json(self._path("done", shard, ".json"))
+        if done is not None:
+            finished = self._path("labels", shard, f".{done['session']}.npz")
+            files.sort(key=lambda path: path == finished)
+        return files
+
+    def load_labels(self, shard, store, dataset, dataset_root):
+        """Merge every saved label file of a shard into store; returns the paths not in the dataset"""
+        unmatched = []
+        for path in self.label_files(shard):
+            unmatched.extend(store.load(path, dataset, dataset_root))
+        return unmatched
+
+    def status(self):
+        """[(shard, state, session)] with state "open", "leased", "expired" or "done" """
+        now = time.time()
+        result = []
+        for shard in range(self.shards):
+            done = _read_json(self._path("done", shard, ".json")) if self.is_done(shard) else None
+            lease = self.lease(shard)
+            if done is not None:
+                result.append((shard, "done", done.get("session")))
+            elif lease is not None:
+                result.append((shard, "leased" if lease.get("expires", 0) >= now else "expired", lease.get("session")))
+            else:
+                result.append((shard, "open", None))
+        return result
+
+
+def merge_queue(folder, dataset, dataset_root):
+    """All shards' landmarks in one LandmarkStore; returns (store, paths not in the dataset)"""
+    queue = WorkQueue(folder)
+    store = LandmarkStore(len(dataset.directory_ids()))
+    unmatched = []
+    for shard in range(queue.shards):
+        unmatched.extend(queue.load_labels(shard, store, dataset, dataset_root))
+    return store, unmatched